@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Texture atlas export of UnicodeHexMono glyphs for GPU renderers.
+
+Rasterizes the glyph layouts at chosen pixel sizes into paged atlas images
+plus a flat binary index (codepoint -> page, x, y) that a client maps into
+memory and binary-searches, so startup is one mmap instead of opening and
+rasterizing the font files.
+
+Every glyph is a frame with its digits knocked out, and each digit always
+sits at the same position in its slot. So per size, only the template parts
+are rasterized (with the raster_check rasterizer: even-odd, 4x4 samples): the
+frame of each layout and each of the 16 digits in each slot. A glyph is the
+frame's sample counts minus those of its digits, computed on whole bitmaps as
+integers with one byte per pixel, which gives the same pixels as rasterizing
+its full outline. U+FFFD and .notdef have no digits and are rasterized once.
+
+Pages never span planes: the index is derived from the codepoint plan alone
+and written for every plane, while pages are rendered only for the planes
+asked for (--planes). Missing planes can be rendered later into the same
+directory, or on demand with render_page().
+
+Output per size, in dist/atlas/<size>px/:
+- page-NNNN.png: 8-bit grayscale coverage (255 = ink), cells of size x size
+  pixels separated by a 1 pixel empty gutter, the last page of a plane cut
+  to its used rows
+- index.bin: little-endian; a 32-byte header
+
+      magic 'UHMATLAS', version u16, cell width u16, cell height u16,
+      baseline u16 (pixels from the cell top), page width u16,
+      page height u16, page count u32, record count u32, record offset u32
+
+  followed by one 12-byte record per codepoint, sorted by codepoint:
+  codepoint u32, page u16, x u16, y u16 (cell top-left in pixels), 2 pad bytes
+
+Usage:
+    python3 atlas.py [--sizes 16,32] [--planes 0,1] [--page-size 4096] [--jobs N] [-o DIR]
+    python3 atlas.py --lookup U+1F600 [--sizes 16] [-o DIR]
+"""
+
+import argparse
+import bisect
+import concurrent.futures
+import functools
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+
+import config
+import glyphs
+import raster_check
+from build_journal import atomic_output
+from codepoints import CodepointSet, parse_codepoint_ranges
+
+
+INDEX_MAGIC = b'UHMATLAS'
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct('<8sHHHHHHIII')
+INDEX_RECORD = struct.Struct('<IHHHxx')
+INDEX_FILENAME = 'index.bin'
+
+# Empty pixels between cells and around the page, so filtered sampling does not bleed
+CELL_GUTTER = 1
+
+# Largest plane number
+LAST_PLANE = 16
+
+
+def get_cell_width(size):
+    """Return the glyph bitmap width at a pixel size (the advance, as in raster_check)."""
+    return math.ceil(config.GLYPH_WIDTH * size / config.EM_SIZE)
+
+
+def get_size_dir(output_dir, size):
+    """Return the directory of the atlas at one pixel size."""
+    return os.path.join(output_dir, f"{size}px")
+
+
+def get_page_filename(page):
+    """Return the file name of an atlas page."""
+    return f"page-{page:04d}.png"
+
+
+# ============================================================================
+# Page Plan
+# ============================================================================
+
+class AtlasPlan:
+    """
+    Placement of every codepoint of one pixel size in the atlas pages.
+
+    Each plane starts on a new page; within a plane, codepoints fill cells
+    left to right, top to bottom. The plan depends only on the size, page
+    size, so pages can be rendered independently of each other.
+    """
+
+    def __init__(self, size, page_size=config.ATLAS_PAGE_SIZE):
+        codepoints = CodepointSet.valid_codepoints()
+        self.size = size
+        self.page_size = page_size
+        self.cell_width = get_cell_width(size)
+        self.cell_height = size
+        self.columns = (page_size - CELL_GUTTER) // (self.cell_width + CELL_GUTTER)
+        self.rows = (page_size - CELL_GUTTER) // (self.cell_height + CELL_GUTTER)
+        if self.columns < 1 or self.rows < 1:
+            raise ValueError(f"A {page_size} px page cannot hold {size} px cells")
+        self.cells_per_page = self.columns * self.rows
+
+        # Pages of each plane: (plane, codepoints, first page)
+        self.planes = []
+        page_count = 0
+        for plane in range(LAST_PLANE + 1):
+            plane_codepoints = codepoints.restrict(plane << 16, (plane << 16) | 0xFFFF)
+            if plane_codepoints:
+                self.planes.append((plane, plane_codepoints, page_count))
+                page_count += -(-len(plane_codepoints) // self.cells_per_page)
+        self.page_count = page_count
+
+    def cell_position(self, cell):
+        """Return the (x, y) pixel position of a cell within its page."""
+        row, column = divmod(cell % self.cells_per_page, self.columns)
+        return (CELL_GUTTER + column * (self.cell_width + CELL_GUTTER),
+                CELL_GUTTER + row * (self.cell_height + CELL_GUTTER))
+
+    def pages_of_plane(self, plane):
+        """Return the page numbers holding a plane (empty if it has no codepoints)."""
+        for number, codepoints, first_page in self.planes:
+            if number == plane:
+                return list(range(first_page, first_page + -(-len(codepoints) // self.cells_per_page)))
+        return []
+
+    def page_codepoints(self, page):
+        """Return the codepoints on a page, in cell order."""
+        for _, codepoints, first_page in self.planes:
+            offset = (page - first_page) * self.cells_per_page
+            if 0 <= offset < len(codepoints):
+                return codepoints[offset:offset + self.cells_per_page]
+        raise IndexError(f"Atlas page {page} does not exist")
+
+    def iter_records(self):
+        """Yield (codepoint, page, x, y) for every codepoint, in codepoint order."""
+        for _, codepoints, first_page in self.planes:
+            for cell, codepoint in enumerate(codepoints):
+                x, y = self.cell_position(cell)
+                yield codepoint, first_page + cell // self.cells_per_page, x, y
+
+
+# ============================================================================
+# Glyph Templates
+# ============================================================================
+
+def _rasterize_outline(draw, size, *args):
+    """Rasterize what a drawing function draws, as one big integer of sample counts."""
+    pen = raster_check.RasterPen(size)
+    draw(pen, *args)
+    return int.from_bytes(raster_check.rasterize_samples(pen.edges, size)[2], 'big')
+
+
+@functools.lru_cache(maxsize=None)
+def compile_raster_template(layout, size):
+    """
+    Rasterize the parts of a layout at one pixel size.
+
+    Args:
+        layout: One of the glyphs.LAYOUT_* constants
+        size: Pixel size (em height)
+
+    Returns:
+        Dict with 'frame' (sample counts of the frame, or of the whole glyph
+        for layouts without digits) and 'digits': one dict per slot mapping
+        each hex digit to its sample counts. Counts are integers holding one
+        byte per pixel, rows top to bottom.
+    """
+    if layout == glyphs.LAYOUT_REPLACEMENT:
+        return {'frame': _rasterize_outline(glyphs.draw_replacement_outline, size), 'digits': []}
+    if layout not in glyphs.DIGIT_LAYOUTS:
+        return {'frame': _rasterize_outline(glyphs.draw_notdef_outline, size), 'digits': []}
+
+    template = glyphs.compile_layout_template(layout)
+    return {
+        'frame': _rasterize_outline(glyphs.replay_contours, size, template['frame']),
+        'digits': [
+            {digit: _rasterize_outline(glyphs.replay_contours, size, contours)
+             for digit, contours in slot_digits.items()}
+            for slot_digits in template['digits']
+        ],
+    }
+
+
+def render_glyph(codepoint, size):
+    """
+    Return the 8-bit coverage of a codepoint's glyph (cell_width x size bytes).
+
+    Equal to raster_check.rasterize() of the full outline: the digits lie
+    inside the filled frame, so with the even-odd rule each digit sample
+    removes exactly one frame sample.
+    """
+    layout = glyphs.get_layout(codepoint)
+    template = compile_raster_template(layout, size)
+    samples = template['frame']
+    if template['digits']:
+        for slot_digits, digit in zip(template['digits'], glyphs.get_layout_digits(layout, codepoint)):
+            samples -= slot_digits[digit]
+    return samples.to_bytes(get_cell_width(size) * size, 'big').translate(raster_check.COVERAGE_LEVELS)
+
+
+# ============================================================================
+# Pages and Index
+# ============================================================================
+
+def render_page(plan, page):
+    """
+    Render one atlas page.
+
+    Args:
+        plan: AtlasPlan
+        page: Page number
+
+    Returns:
+        Tuple (width, height, bytes): 8-bit grayscale rows, top to bottom;
+        the height is cut to the rows of cells in use
+    """
+    codepoints = plan.page_codepoints(page)
+    width = plan.page_size
+    cell_width, cell_height = plan.cell_width, plan.cell_height
+    gutter = bytes(CELL_GUTTER)
+    used_rows = -(-len(codepoints) // plan.columns)
+    height = CELL_GUTTER + used_rows * (cell_height + CELL_GUTTER)
+
+    pixels = bytearray()
+    gutter_row = bytes(width) * CELL_GUTTER
+    pixels += gutter_row
+    for row in range(used_rows):
+        cells = [render_glyph(cp, plan.size)
+                 for cp in codepoints[row * plan.columns:(row + 1) * plan.columns]]
+        for y in range(cell_height):
+            line = gutter + gutter.join(cell[y * cell_width:(y + 1) * cell_width] for cell in cells) + gutter
+            pixels += line.ljust(width, b'\0')
+        pixels += gutter_row
+    return width, height, bytes(pixels)
+
+
+def _png_chunk(tag, data):
+    return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+
+
+def encode_png(width, height, pixels):
+    """Encode 8-bit grayscale rows as a PNG file (no filtering)."""
+    raw = b''.join(b'\0' + pixels[y * width:(y + 1) * width] for y in range(height))
+    return (b'\x89PNG\r\n\x1a\n'
+            + _png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 0, 0, 0, 0))
+            + _png_chunk(b'IDAT', zlib.compress(raw, 6))
+            + _png_chunk(b'IEND', b''))
+
+
+def _write_page(size, page_size, page, path):
+    """Worker: render one atlas page and write it as PNG."""
+    plan = _worker_plan(size, page_size)
+    data = encode_png(*render_page(plan, page))
+    with atomic_output(path) as tmp_path:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+    return page, len(plan.page_codepoints(page))
+
+
+@functools.lru_cache(maxsize=None)
+def _worker_plan(size, page_size):
+    return AtlasPlan(size, page_size)
+
+
+def write_index(path, plan):
+    """Write the binary codepoint index of a plan."""
+    records = [INDEX_RECORD.pack(*record) for record in plan.iter_records()]
+    header = INDEX_HEADER.pack(
+        INDEX_MAGIC, INDEX_VERSION, plan.cell_width, plan.cell_height,
+        round(config.ASCENT * plan.size / config.EM_SIZE), plan.page_size, plan.page_size,
+        plan.page_count, len(records), INDEX_HEADER.size,
+    )
+    with atomic_output(path) as tmp_path:
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            f.write(b''.join(records))
+
+
+class AtlasIndex:
+    """
+    Memory-mapped atlas index (the reference client of index.bin).
+
+    Usage:
+        with AtlasIndex('dist/atlas/16px/index.bin') as index:
+            page, x, y = index.lookup(0x1F600)
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.cell_width, self.cell_height, self.baseline, self.page_width,
+         self.page_height, self.page_count, self.count, self._offset) = INDEX_HEADER.unpack_from(self._map)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            self.close()
+            raise ValueError(f"{path}: not a version {INDEX_VERSION} atlas index")
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, position):
+        if not 0 <= position < self.count:
+            raise IndexError("atlas index record out of range")
+        return INDEX_RECORD.unpack_from(self._map, self._offset + position * INDEX_RECORD.size)[0]
+
+    def lookup(self, codepoint):
+        """Return (page, x, y) of a codepoint's cell, or None if the atlas lacks it."""
+        position = bisect.bisect_left(self, codepoint)
+        if position == self.count or self[position] != codepoint:
+            return None
+        return INDEX_RECORD.unpack_from(self._map, self._offset + position * INDEX_RECORD.size)[1:]
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def export_atlas(output_dir, size, page_size=config.ATLAS_PAGE_SIZE, planes=None, jobs=None):
+    """
+    Write the index and the pages of some planes of the atlas at one size.
+
+    Args:
+        output_dir: Atlas directory (pages go to its <size>px subdirectory)
+        size: Pixel size (em height)
+        page_size: Page width and maximum height in pixels
+        planes: Plane numbers whose pages to render (None: all)
+        jobs: Worker processes (None: one per CPU)
+
+    Returns:
+        Number of pages written
+    """
+    plan = AtlasPlan(size, page_size)
+    size_dir = get_size_dir(output_dir, size)
+    os.makedirs(size_dir, exist_ok=True)
+    write_index(os.path.join(size_dir, INDEX_FILENAME), plan)
+    print(f"✓ {size} px: index of {sum(len(cps) for _, cps, _ in plan.planes):,} codepoints, "
+          f"{plan.page_count} pages of {plan.columns}x{plan.rows} cells")
+
+    pages = [page for plane in (range(LAST_PLANE + 1) if planes is None else planes)
+             for page in plan.pages_of_plane(plane)]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(_write_page, size, page_size, page,
+                               os.path.join(size_dir, get_page_filename(page)))
+                   for page in pages]
+        for future in concurrent.futures.as_completed(futures):
+            page, count = future.result()
+            print(f"  ✓ {get_page_filename(page)} ({count:,} glyphs)")
+    return len(pages)
+
+
+# ============================================================================
+# Command Line
+# ============================================================================
+
+def parse_int_list(value, low, high, what):
+    """Parse a comma-separated list of integers within low..high."""
+    try:
+        numbers = sorted({int(part) for part in value.split(',') if part.strip()})
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated {what}, got {value!r}")
+    if not numbers or numbers[0] < low or numbers[-1] > high:
+        raise argparse.ArgumentTypeError(f"{what} must be between {low} and {high}")
+    return tuple(numbers)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export glyph texture atlases with a binary codepoint index.")
+    parser.add_argument("--sizes", default=config.ATLAS_SIZES, metavar="LIST",
+                        type=lambda value: parse_int_list(value, 4, 255, "pixel sizes"),
+                        help=f"pixel sizes (default: {','.join(map(str, config.ATLAS_SIZES))})")
+    parser.add_argument("--planes", metavar="LIST",
+                        type=lambda value: parse_int_list(value, 0, LAST_PLANE, "planes"),
+                        help="render only the pages of these planes, e.g. 0,1 (the index always covers all)")
+    parser.add_argument("--page-size", type=int, default=config.ATLAS_PAGE_SIZE, metavar="PX",
+                        help=f"page width and maximum height (default: {config.ATLAS_PAGE_SIZE})")
+    parser.add_argument("--jobs", type=int, metavar="N", help="worker processes (default: one per CPU)")
+    parser.add_argument("-o", "--output-dir", default=config.ATLAS_DIR, metavar="DIR",
+                        help=f"output directory (default: {config.ATLAS_DIR})")
+    parser.add_argument("--lookup", metavar="CODEPOINT",
+                        help="print the page and position of a codepoint in existing indexes")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    if args.lookup:
+        codepoint = parse_codepoint_ranges(args.lookup)[0]
+        found = 0
+        for size in args.sizes:
+            index_path = os.path.join(get_size_dir(args.output_dir, size), INDEX_FILENAME)
+            if not os.path.exists(index_path):
+                print(f"{size} px: not exported ({index_path} does not exist)")
+                continue
+            found += 1
+            with AtlasIndex(index_path) as index:
+                cell = index.lookup(codepoint)
+            if cell is None:
+                print(f"{size} px: U+{codepoint:04X} is not in the atlas")
+            else:
+                page, x, y = cell
+                print(f"{size} px: U+{codepoint:04X} -> {get_page_filename(page)} at ({x}, {y})")
+        if not found:
+            print(f"ERROR: no atlas index in {args.output_dir}/ for {', '.join(f'{size} px' for size in args.sizes)}")
+            sys.exit(1)
+        return
+
+    start = time.time()
+    pages = 0
+    for size in args.sizes:
+        pages += export_atlas(args.output_dir, size, args.page_size, args.planes, args.jobs)
+    print(f"\n✓ {pages} pages written to {args.output_dir}/ ({time.time() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
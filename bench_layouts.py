@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark for glyph layout drawing.
+
+Compares the direct drawing path (draw_frame + draw_layout_digits, which
+recomputes slot geometry and digit cells for every codepoint) against replaying
+precompiled layout templates (draw_layout_template). Glyphs are drawn into a
+counting pen, so this measures only the Python drawing cost and runs without
+FontForge.
+
+Usage:
+    python3 bench_layouts.py [--count N]
+"""
+
+import argparse
+import time
+
+import glyphs
+
+
+# A representative codepoint range for every digit layout
+SAMPLE_RANGES = {
+    glyphs.LAYOUT_2DIGIT: (0x0000, 0x00FF),
+    glyphs.LAYOUT_2X2: (0x0100, 0xD7FF),
+    glyphs.LAYOUT_5DIGIT_SPLIT: (0x10000, 0xFFFFD),
+    glyphs.LAYOUT_PLANE16: (0x100000, 0x10FFFD),
+}
+
+
+class CountingPen:
+    """Pen that only counts drawing calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def moveTo(self, point):
+        self.calls += 1
+
+    def lineTo(self, point):
+        self.calls += 1
+
+    def curveTo(self, *points):
+        self.calls += 1
+
+    def closePath(self):
+        self.calls += 1
+
+
+def _sample_codepoints(layout, count):
+    """Return count codepoints spread evenly over a layout's sample range."""
+    start, end = SAMPLE_RANGES[layout]
+    step = max(1, (end - start + 1) // count)
+    return [start + (i * step) % (end - start + 1) for i in range(count)]
+
+
+def draw_direct(pen, layout, codepoint):
+    """Draw a glyph by recomputing its geometry (the pre-template path)."""
+    glyphs.draw_frame(pen, layout)
+    glyphs.draw_layout_digits(pen, layout, codepoint)
+
+
+def benchmark(draw, layout, codepoints):
+    """
+    Draw every codepoint and return (glyphs per second, pen calls).
+    """
+    pen = CountingPen()
+    started = time.perf_counter()
+    for cp in codepoints:
+        draw(pen, layout, cp)
+    elapsed = time.perf_counter() - started
+    return len(codepoints) / elapsed, pen.calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark direct vs template glyph drawing.")
+    parser.add_argument("--count", type=int, default=20000,
+                        help="glyphs drawn per layout and method (default: 20000)")
+    args = parser.parse_args()
+
+    # Compile templates up front: that is a one-off cost per build, not per glyph
+    started = time.perf_counter()
+    for layout in SAMPLE_RANGES:
+        glyphs.compile_layout_template(layout)
+    compile_ms = (time.perf_counter() - started) * 1000
+
+    print("=" * 70)
+    print(f"Layout drawing benchmark ({args.count:,} glyphs per layout)")
+    print(f"Template compilation: {compile_ms:.1f} ms for {len(SAMPLE_RANGES)} layouts")
+    print("=" * 70)
+    print(f"{'Layout':<10} {'Direct (glyphs/s)':>20} {'Template (glyphs/s)':>20} {'Speedup':>9}")
+    print("-" * 70)
+
+    for layout in SAMPLE_RANGES:
+        codepoints = _sample_codepoints(layout, args.count)
+        direct_rate, direct_calls = benchmark(draw_direct, layout, codepoints)
+        template_rate, template_calls = benchmark(glyphs.draw_layout_template, layout, codepoints)
+
+        # Both paths must produce the same drawing calls
+        if direct_calls != template_calls:
+            raise SystemExit(f"ERROR: {layout} template drew {template_calls} calls, "
+                             f"direct drew {direct_calls}")
+
+        print(f"{layout:<10} {direct_rate:>20,.0f} {template_rate:>20,.0f} "
+              f"{template_rate / direct_rate:>8.1f}x")
+
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
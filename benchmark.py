@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Stage-level build benchmark for UnicodeHexMono.
+
+Runs the font build pipeline stage by stage on a configurable subset of the
+planned chunks and records, per stage:
+- Wall time and glyphs per second
+- Peak RSS of the process after the stage
+- Contour and point counts (draw stage)
+- Output bytes (generate and WOFF2 stages)
+
+Stages, in pipeline order:
+    collect   - generator.plan_chunks() (codepoint collection and chunking)
+    draw      - glyph creation (glyphs.create_glyph or fonttools_backend.build_font)
+    validate  - glyphs.validate_font_glyphs (FontForge backend only)
+    generate  - OTF/TTF output (font.generate or TTFont.save)
+    woff2     - WOFF2 conversion
+
+Results are written as JSON; the compare command flags stages that got slower,
+use more memory or write more bytes than a stored baseline. The cff-sizes
+command reports OTF/WOFF2 sizes of plain vs subroutinized CFF output.
+
+Usage:
+    fontforge -script benchmark.py run [--chunks 1,2] [--limit N] [--until STAGE] [-o results.json]
+    python3 benchmark.py run --backend fonttools [options]
+    python3 benchmark.py compare baseline.json results.json [--threshold 10]
+    python3 benchmark.py cff-sizes [--chunks 1,2] [--limit N]
+"""
+
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+import config
+import glyphs
+import generator
+import build_cache
+
+
+STAGES = ('collect', 'draw', 'validate', 'generate', 'woff2')
+
+# Version of the results file layout
+RESULTS_FORMAT = 1
+
+# Metrics where a larger value in the current run is a regression
+COMPARED_METRICS = ('wall_time_s', 'peak_rss_bytes', 'output_bytes')
+
+
+# ============================================================================
+# Measurement
+# ============================================================================
+
+class OutlineStatsPen:
+    """Pen that counts contours and points (on- and off-curve)."""
+
+    def __init__(self):
+        self.contours = 0
+        self.points = 0
+
+    def moveTo(self, point):
+        self.contours += 1
+        self.points += 1
+
+    def lineTo(self, point):
+        self.points += 1
+
+    def curveTo(self, *points):
+        self.points += len(points)
+
+    def closePath(self):
+        pass
+
+
+def _peak_rss_bytes():
+    """Return the peak resident set size of this process so far, in bytes."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _count_outlines(codepoints, composite):
+    """
+    Count the contours and points stored for a chunk's glyphs (plus .notdef).
+
+    In composite mode every shared component is counted once, as it is stored
+    once in the font; codepoint glyphs only hold references to them.
+    """
+    pen = OutlineStatsPen()
+    glyphs.draw_notdef_outline(pen)
+    seen_components = set()
+
+    for cp in codepoints:
+        components = glyphs.get_composite_components(cp) if composite else None
+        if components is None:
+            glyphs.draw_glyph_outline(pen, cp)
+            continue
+        for name, draw in components:
+            if name not in seen_components:
+                seen_components.add(name)
+                draw(pen)
+
+    return pen.contours, pen.points
+
+
+class StageRecorder:
+    """Accumulates per-stage measurements across chunks."""
+
+    def __init__(self):
+        self.stages = {}
+
+    def measure(self, stage, glyph_count, func):
+        """
+        Run func() as one step of a stage and record its wall time and peak RSS.
+
+        Returns:
+            The return value of func
+        """
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+
+        record = self.stages.setdefault(stage, {
+            'wall_time_s': 0.0,
+            'glyphs': 0,
+            'contours': None,
+            'points': None,
+            'output_bytes': None,
+        })
+        record['wall_time_s'] += elapsed
+        record['glyphs'] += glyph_count
+        record['peak_rss_bytes'] = _peak_rss_bytes()
+        return result
+
+    def add(self, stage, field, value):
+        """Add to a counter (contours, points, output_bytes) of a recorded stage."""
+        record = self.stages[stage]
+        record[field] = (record[field] or 0) + value
+
+    def results(self):
+        """Return the stage records in pipeline order, with glyphs per second."""
+        results = {}
+        for stage in STAGES:
+            if stage not in self.stages:
+                continue
+            record = dict(self.stages[stage])
+            wall_time = record['wall_time_s']
+            record['glyphs_per_s'] = record['glyphs'] / wall_time if wall_time > 0 else None
+            results[stage] = record
+        return results
+
+
+# ============================================================================
+# Pipeline Stages
+# ============================================================================
+
+def _run_chunk_fontforge(recorder, chunk, composite, output_dir, until):
+    """Run the FontForge pipeline on one chunk, stopping after the `until` stage."""
+    codepoints = chunk['codepoints']
+    count = len(codepoints)
+    stop = STAGES.index(until)
+
+    def draw():
+        font = generator.create_font_object()
+        for cp in codepoints:
+            glyphs.create_glyph(font, cp, composite=composite)
+        glyphs.create_notdef_glyph(font)
+        return font
+
+    font = recorder.measure('draw', count, draw)
+    contours, points = _count_outlines(codepoints, composite)
+    recorder.add('draw', 'contours', contours)
+    recorder.add('draw', 'points', points)
+
+    if stop >= STAGES.index('validate'):
+        recorder.measure('validate', count, lambda: glyphs.validate_font_glyphs(font))
+
+    if stop >= STAGES.index('generate'):
+        outline_format = config.COMPOSITE_OUTPUT_FORMAT if composite else config.OUTPUT_FORMAT
+        outline_path = os.path.join(output_dir, f"chunk{chunk['number']}.{outline_format}")
+        recorder.measure('generate', count, lambda: font.generate(
+            outline_path, flags=('opentype', 'omit-instructions', 'dummy-dsig')))
+        recorder.add('generate', 'output_bytes', os.path.getsize(outline_path))
+
+    font.close()
+
+    if stop >= STAGES.index('woff2'):
+        woff2_path = os.path.join(output_dir, f"chunk{chunk['number']}.woff2")
+        if recorder.measure('woff2', count, lambda: generator.convert_to_woff2(outline_path, woff2_path)):
+            recorder.add('woff2', 'output_bytes', os.path.getsize(woff2_path))
+        else:
+            print("⚠ fonttools not installed - WOFF2 stage not measured")
+
+
+def _run_chunk_fonttools(recorder, chunk, composite, output_dir, until, subroutines=False):
+    """Run the fontTools pipeline on one chunk, stopping after the `until` stage."""
+    import fonttools_backend
+    from fontTools.ttLib import woff2
+
+    codepoints = chunk['codepoints']
+    count = len(codepoints)
+    stop = STAGES.index(until)
+
+    font = recorder.measure('draw', count,
+                            lambda: fonttools_backend.build_font(codepoints, composite=composite,
+                                                                 subroutines=subroutines))
+    contours, points = _count_outlines(codepoints, composite)
+    recorder.add('draw', 'contours', contours)
+    recorder.add('draw', 'points', points)
+
+    # validate_font_glyphs works on FontForge fonts; FontBuilder output needs no cleanup
+
+    if stop >= STAGES.index('generate'):
+        data = io.BytesIO()
+        recorder.measure('generate', count, lambda: font.save(data))
+        recorder.add('generate', 'output_bytes', len(data.getvalue()))
+
+    if stop >= STAGES.index('woff2'):
+        woff2_path = os.path.join(output_dir, f"chunk{chunk['number']}.woff2")
+        recorder.measure('woff2', count, lambda: woff2.compress(io.BytesIO(data.getvalue()), woff2_path))
+        recorder.add('woff2', 'output_bytes', os.path.getsize(woff2_path))
+
+
+def _select_chunks(chunk_numbers, limit, all_chunks=None):
+    """Return copies of the planned chunks with the given numbers, truncated to `limit` codepoints."""
+    if all_chunks is None:
+        all_chunks = generator.plan_chunks()
+    chunks = []
+    for number in chunk_numbers:
+        if not 1 <= number <= len(all_chunks):
+            raise SystemExit(f"ERROR: chunk {number} does not exist (1-{len(all_chunks)})")
+        chunk = dict(all_chunks[number - 1])
+        if limit is not None:
+            chunk['codepoints'] = chunk['codepoints'][:limit]
+        chunks.append(chunk)
+    return chunks
+
+
+def run_benchmark(chunk_numbers, limit=None, until='woff2', backend=config.BACKEND,
+                  composite=config.COMPOSITE_GLYPHS, subroutines=False):
+    """
+    Benchmark the build pipeline on a subset of the planned chunks.
+
+    Args:
+        chunk_numbers: 1-based numbers of the chunks to build (see generator.plan_chunks)
+        limit: Build only the first N codepoints of each chunk, or None for all
+        until: Last stage to run
+        backend: 'fontforge' or 'fonttools'
+        composite: Build composite glyphs
+        subroutines: Build CFF glyphs from global subroutines (fonttools backend)
+
+    Returns:
+        Results dict (settings, environment and per-stage measurements)
+    """
+    recorder = StageRecorder()
+    all_chunks = recorder.measure('collect', 0, generator.plan_chunks)
+    recorder.stages['collect']['glyphs'] = sum(len(chunk['codepoints']) for chunk in all_chunks)
+
+    chunks = _select_chunks(chunk_numbers, limit, all_chunks)
+
+    if until != 'collect':
+        output_dir = tempfile.mkdtemp(prefix='unicodehexmono-bench-')
+        try:
+            for chunk in chunks:
+                print(f"Benchmarking chunk {chunk['number']}/{chunk['total']} "
+                      f"({len(chunk['codepoints']):,} glyphs)...")
+                if backend == generator.BACKEND_FONTTOOLS:
+                    _run_chunk_fonttools(recorder, chunk, composite, output_dir, until, subroutines)
+                else:
+                    _run_chunk_fontforge(recorder, chunk, composite, output_dir, until)
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+    return {
+        'format': RESULTS_FORMAT,
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'settings': {
+            'backend': backend,
+            'composite': composite,
+            'subroutines': subroutines,
+            'chunks': list(chunk_numbers),
+            'limit': limit,
+            'until': until,
+            'glyphs': sum(len(chunk['codepoints']) for chunk in chunks),
+        },
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'tools': build_cache._tool_versions(),
+        },
+        'stages': recorder.results(),
+    }
+
+
+# ============================================================================
+# Reporting and Comparison
+# ============================================================================
+
+def _format_bytes(value):
+    """Format a byte count for the results table."""
+    if value is None:
+        return "-"
+    for unit in ('B', 'KB', 'MB'):
+        if value < 1024:
+            return f"{value:,.0f} {unit}" if unit == 'B' else f"{value:,.1f} {unit}"
+        value /= 1024
+    return f"{value:,.1f} GB"
+
+
+def print_results(results):
+    """Print a table of per-stage measurements."""
+    settings = results['settings']
+    print("=" * 78)
+    print(f"Build benchmark: backend={settings['backend']} composite={settings['composite']} "
+          f"chunks={settings['chunks']} glyphs={settings['glyphs']:,}")
+    print("=" * 78)
+    print(f"{'Stage':<10} {'Time (s)':>9} {'Glyphs/s':>11} {'Peak RSS':>11} "
+          f"{'Contours':>10} {'Points':>10} {'Output':>11}")
+    print("-" * 78)
+    for stage, record in results['stages'].items():
+        rate = f"{record['glyphs_per_s']:,.0f}" if record['glyphs_per_s'] else "-"
+        contours = f"{record['contours']:,}" if record['contours'] is not None else "-"
+        points = f"{record['points']:,}" if record['points'] is not None else "-"
+        print(f"{stage:<10} {record['wall_time_s']:>9.3f} {rate:>11} "
+              f"{_format_bytes(record['peak_rss_bytes']):>11} {contours:>10} {points:>10} "
+              f"{_format_bytes(record['output_bytes']):>11}")
+    print("=" * 78)
+
+
+def compare_results(baseline, current, threshold):
+    """
+    Compare two results dicts.
+
+    Args:
+        baseline: Stored baseline results
+        current: New results
+        threshold: Allowed increase, in percent, before a metric is a regression
+
+    Returns:
+        List of regression descriptions (empty if none)
+    """
+    if baseline['settings'] != current['settings']:
+        print("⚠ Benchmark settings differ; comparison may not be meaningful")
+        print(f"  baseline: {baseline['settings']}")
+        print(f"  current:  {current['settings']}")
+
+    regressions = []
+    print(f"{'Stage':<10} {'Metric':<16} {'Baseline':>14} {'Current':>14} {'Change':>9}")
+    print("-" * 67)
+    for stage in STAGES:
+        if stage not in baseline['stages'] or stage not in current['stages']:
+            continue
+        for metric in COMPARED_METRICS:
+            old = baseline['stages'][stage].get(metric)
+            new = current['stages'][stage].get(metric)
+            if old is None or new is None or old == 0:
+                continue
+            change = (new - old) / old * 100
+            spec = ',.3f' if metric == 'wall_time_s' else ',.0f'
+            flag = ""
+            if change > threshold:
+                flag = "  ⚠ REGRESSION"
+                regressions.append(f"{stage} {metric}: {old:{spec}} -> {new:{spec}} (+{change:.1f}%)")
+            print(f"{stage:<10} {metric:<16} {old:>14{spec}} {new:>14{spec}} {change:>+8.1f}%{flag}")
+
+    return regressions
+
+
+def cff_size_report(chunk_numbers, limit=None):
+    """
+    Print OTF and WOFF2 sizes of plain vs subroutinized CFF fonts.
+
+    Both variants are built with the fonttools backend from the same chunks;
+    only the charstring encoding differs.
+
+    Returns:
+        Dict mapping 'plain' and 'subroutines' to {'otf': bytes, 'woff2': bytes}
+    """
+    import fonttools_backend
+    from fontTools.ttLib import woff2
+
+    totals = {'plain': {'otf': 0, 'woff2': 0}, 'subroutines': {'otf': 0, 'woff2': 0}}
+    print("=" * 78)
+    print(f"CFF size report ({'first ' + format(limit, ',') if limit else 'all'} codepoints "
+          f"of chunks {chunk_numbers})")
+    print("=" * 78)
+    print(f"{'Chunk':<7} {'Glyphs':>8} {'Plain OTF':>12} {'Subrs OTF':>12} "
+          f"{'Plain WOFF2':>12} {'Subrs WOFF2':>12}")
+    print("-" * 78)
+
+    for chunk in _select_chunks(chunk_numbers, limit):
+        sizes = {}
+        for variant in totals:
+            font = fonttools_backend.build_font(chunk['codepoints'],
+                                                subroutines=(variant == 'subroutines'))
+            data = fonttools_backend.serialize_font(font)
+            compressed = io.BytesIO()
+            woff2.compress(io.BytesIO(data), compressed)
+            sizes[variant] = {'otf': len(data), 'woff2': len(compressed.getvalue())}
+            for file_format in ('otf', 'woff2'):
+                totals[variant][file_format] += sizes[variant][file_format]
+        print(f"{chunk['number']:<7} {len(chunk['codepoints']):>8,} "
+              f"{_format_bytes(sizes['plain']['otf']):>12} {_format_bytes(sizes['subroutines']['otf']):>12} "
+              f"{_format_bytes(sizes['plain']['woff2']):>12} {_format_bytes(sizes['subroutines']['woff2']):>12}")
+
+    print("-" * 78)
+    for file_format in ('otf', 'woff2'):
+        plain = totals['plain'][file_format]
+        subrs = totals['subroutines'][file_format]
+        print(f"{file_format.upper():<6} total: {_format_bytes(plain)} -> {_format_bytes(subrs)} "
+              f"({(subrs - plain) / plain * 100:+.1f}%)")
+    print("=" * 78)
+    return totals
+
+
+# ============================================================================
+# Command Line
+# ============================================================================
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Stage-level build benchmark.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="run the benchmark and write JSON results")
+    run.add_argument("--chunks", default="1,2",
+                     help="comma-separated 1-based chunk numbers to build (default: 1,2)")
+    run.add_argument("--limit", type=int, default=5000, metavar="N",
+                     help="build only the first N codepoints of each chunk, 0 for all (default: 5000)")
+    run.add_argument("--until", choices=STAGES, default='woff2',
+                     help="last pipeline stage to run (default: woff2)")
+    run.add_argument("--backend", choices=generator.BACKENDS, default=config.BACKEND,
+                     help=f"font backend (default: {config.BACKEND})")
+    run.add_argument("--composite", action="store_true", default=config.COMPOSITE_GLYPHS,
+                     help="build composite glyphs")
+    run.add_argument("--cff-subroutines", action="store_true", default=config.CFF_SUBROUTINES,
+                     help="build CFF glyphs from global subroutines (fonttools backend)")
+    run.add_argument("--output", "-o", metavar="FILE",
+                     help="write results to this JSON file")
+
+    compare = commands.add_parser('compare', help="compare results against a baseline")
+    compare.add_argument("baseline", help="baseline results JSON")
+    compare.add_argument("current", help="new results JSON")
+    compare.add_argument("--threshold", type=float, default=10.0, metavar="PCT",
+                         help="allowed increase in percent before flagging (default: 10)")
+
+    sizes = commands.add_parser('cff-sizes', help="compare plain and subroutinized CFF file sizes")
+    sizes.add_argument("--chunks", default="1,2",
+                       help="comma-separated 1-based chunk numbers to build (default: 1,2)")
+    sizes.add_argument("--limit", type=int, default=5000, metavar="N",
+                       help="build only the first N codepoints of each chunk, 0 for all (default: 5000)")
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    if args.command == 'compare':
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        with open(args.current, 'r', encoding='utf-8') as f:
+            current = json.load(f)
+        regressions = compare_results(baseline, current, args.threshold)
+        if regressions:
+            print(f"\n⚠ {len(regressions)} regression(s) above {args.threshold:g}%:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print("\n✓ No regressions")
+        return
+
+    chunk_numbers = [int(number) for number in args.chunks.split(',') if number.strip()]
+    if args.command == 'cff-sizes':
+        cff_size_report(chunk_numbers, limit=args.limit or None)
+        return
+
+    results = run_benchmark(chunk_numbers, limit=args.limit or None, until=args.until,
+                            backend=args.backend, composite=args.composite,
+                            subroutines=args.cff_subroutines)
+    print_results(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,671 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pixel-exact bitmap glyphs for UnicodeHexMono at small sizes.
+
+At 12-16 px the outline glyphs rasterize into a grey blur, although the hex
+digits are defined on a 3x5 grid (utils.DIGIT_PATTERNS). This module draws
+every layout on the pixel grid instead:
+- Each digit cell is one pixel (two pixels tall for the big 2-digit layout),
+  knocked out of a filled frame with 1-pixel borders and rounded corners
+- Plane 16 keeps its divider and U+FFFD its diagonal cross, so every layout
+  stays recognizable
+- The design is 13 pixels tall and is scaled by whole pixels for larger strikes
+
+Per strike size, each layout is compiled once into a template: the frame rows
+and, per digit slot, the rows of all 16 digits as integer bit masks. A glyph
+bitmap is then a few XORs of precomputed rows.
+
+Outputs:
+- EBDT/EBLC bitmap strikes embedded in fonts of the fonttools backend
+  (main.py --bitmap-strikes), which rasterizers blit instead of scaling the
+  outlines at those pixel sizes
+- BDF and PCF files for X11 terminals (this script)
+
+Usage:
+    python3 bitmaps.py [--sizes 13,14,16] [--range RANGES | --codepoints FILE] [--no-pcf] [-o DIR]
+
+X11 core fonts use 16-bit character codes, so PCF files cover the BMP only;
+BDF files take any --range (default: U+0000-FFFF).
+"""
+
+import argparse
+import collections
+import functools
+import math
+import os
+import struct
+
+import config
+import glyphs
+import utils
+from build_journal import atomic_output
+from codepoints import CodepointSet, load_codepoints_file, parse_codepoint_ranges
+
+
+# Height of the pixel design (frame of the two-row layouts) at scale 1
+DESIGN_HEIGHT = 13
+
+# Smallest strike: two 5-pixel digit rows, the gap between them and the frame
+MIN_STRIKE_SIZE = DESIGN_HEIGHT
+
+# Resolution written to BDF/PCF files (pixel sizes are what matters to terminals)
+RESOLUTION_DPI = 75
+
+Bitmap = collections.namedtuple('Bitmap', 'width height x_offset y_offset rows')
+Bitmap.__doc__ = """
+A glyph bitmap.
+
+width, height: Bitmap size in pixels
+x_offset: Left side bearing in pixels
+y_offset: Bottom of the bitmap relative to the baseline (negative below it)
+rows: One int per row, top to bottom; bit (width - 1 - x) is pixel x
+"""
+
+
+# ============================================================================
+# Pixel Design
+# ============================================================================
+
+def _layout_design(layout):
+    """
+    Return the scale-1 pixel design of a layout.
+
+    Returns:
+        Dict with 'width' and 'height' of the frame, 'slots' as (x, y, cell
+        width, cell height) per digit slot in get_layout_digits() order (x, y
+        of the top-left cell from the top-left of the frame), 'knockouts'
+        (extra unlit pixels) and 'outline' (frame border only, for .notdef)
+    """
+    design = {'knockouts': (), 'outline': False}
+
+    if layout == glyphs.LAYOUT_2DIGIT:
+        # Two big digits, cells 1x2 pixels
+        design.update(width=9, height=12, slots=((1, 1, 1, 2), (5, 1, 1, 2)))
+    elif layout == glyphs.LAYOUT_2X2:
+        design.update(width=9, height=13, slots=((1, 1, 1, 1), (5, 1, 1, 1),
+                                                 (1, 7, 1, 1), (5, 7, 1, 1)))
+    elif layout == glyphs.LAYOUT_5DIGIT_SPLIT:
+        # Plane digit vertically centered left of the 2x2 grid
+        design.update(width=13, height=13, slots=((1, 4, 1, 1), (5, 1, 1, 1), (9, 1, 1, 1),
+                                                  (5, 7, 1, 1), (9, 7, 1, 1)))
+    elif layout == glyphs.LAYOUT_PLANE16:
+        # Divider between the digit columns
+        design.update(width=11, height=13,
+                      slots=((1, 1, 1, 1), (7, 1, 1, 1), (1, 7, 1, 1), (7, 7, 1, 1)),
+                      knockouts=tuple((5, y) for y in range(1, 12)))
+    elif layout == glyphs.LAYOUT_REPLACEMENT:
+        # Diagonal cross over the inner area (x 1-7, y 1-11)
+        knockouts = []
+        for y in range(1, 12):
+            x = 1 + round((y - 1) * 6 / 10)
+            knockouts += [(x, y), (8 - x, y)]
+        design.update(width=9, height=13, slots=(), knockouts=tuple(knockouts))
+    else:
+        design.update(width=9, height=13, slots=(), outline=True)
+    return design
+
+
+def _design_pixels(design):
+    """Return the lit frame pixels of a design as a set of (x, y)."""
+    width, height = design['width'], design['height']
+    if design['outline']:
+        lit = {(x, y) for x in range(width) for y in range(height)
+               if x in (0, width - 1) or y in (0, height - 1)}
+    else:
+        lit = {(x, y) for x in range(width) for y in range(height)}
+
+    # Rounded corners
+    lit -= {(0, 0), (width - 1, 0), (0, height - 1), (width - 1, height - 1)}
+    lit -= set(design['knockouts'])
+    return lit
+
+
+def _digit_pixels(digit, x, y, cell_width, cell_height):
+    """Return the pixels of a hex digit whose top-left cell is at (x, y)."""
+    pixels = set()
+    for col, row in utils.DIGIT_PATTERNS[digit]:
+        # Pattern rows count from the bottom (row 4 is the top row)
+        top = y + (4 - row) * cell_height
+        left = x + col * cell_width
+        pixels.update((left + dx, top + dy) for dx in range(cell_width) for dy in range(cell_height))
+    return pixels
+
+
+def get_strike_scale(size):
+    """Return the whole-pixel scale of the design at a strike size (2x from 26 px, 3x from 39 px)."""
+    if size < MIN_STRIKE_SIZE:
+        raise ValueError(f"Bitmap strikes need at least {MIN_STRIKE_SIZE} px "
+                         f"(two 5-pixel digit rows plus frame), got {size}")
+    return max(1, size // DESIGN_HEIGHT)
+
+
+def get_strike_metrics(size):
+    """Return (ascent, descent) in pixels of a strike, splitting the em like ASCENT/DESCENT."""
+    ascent = round(size * config.ASCENT / config.EM_SIZE)
+    return ascent, size - ascent
+
+
+def _rows(pixels, width, height, scale):
+    """Convert a set of (x, y) pixels into scaled row bit masks."""
+    rows = []
+    for y in range(height):
+        mask = 0
+        for x in range(width):
+            if (x, y) in pixels:
+                mask |= ((1 << scale) - 1) << ((width - 1 - x) * scale)
+        rows += [mask] * scale
+    return tuple(rows)
+
+
+@functools.lru_cache(maxsize=None)
+def compile_strike_template(layout, size):
+    """
+    Compile a layout into bitmap rows for one strike size.
+
+    Args:
+        layout: One of the glyphs.LAYOUT_* constants
+        size: Strike size in pixels per em
+
+    Returns:
+        Dict with 'width', 'height', 'x_offset', 'y_offset' (see Bitmap),
+        'frame' rows and 'digits': one dict per slot mapping each hex digit
+        to the rows it knocks out of the frame
+    """
+    scale = get_strike_scale(size)
+    ascent, descent = get_strike_metrics(size)
+    design = _layout_design(layout)
+    width, height = design['width'] * scale, design['height'] * scale
+
+    # Center horizontally in the advance; vertically on the outline frame's center
+    x_offset = (size - width) // 2
+    center = (config.GLYPH_Y_OFFSET + config.BOX_SIZE / 2) * size / config.EM_SIZE
+    top = min(ascent, max(round(center + height / 2), height - descent))
+
+    digits = []
+    for x, y, cell_width, cell_height in design['slots']:
+        digits.append({
+            digit: _rows(_digit_pixels(digit, x, y, cell_width, cell_height),
+                         design['width'], design['height'], scale)
+            for digit in utils.DIGIT_PATTERNS
+        })
+
+    return {
+        'width': width,
+        'height': height,
+        'x_offset': x_offset,
+        'y_offset': top - height,
+        'frame': _rows(_design_pixels(design), design['width'], design['height'], scale),
+        'digits': digits,
+    }
+
+
+def render_bitmap(codepoint, size):
+    """
+    Return the bitmap of a codepoint at a strike size.
+
+    Args:
+        codepoint: Unicode codepoint value
+        size: Strike size in pixels per em (at least MIN_STRIKE_SIZE)
+
+    Returns:
+        Bitmap
+    """
+    layout = glyphs.get_layout(codepoint)
+    template = compile_strike_template(layout, size)
+    rows = list(template['frame'])
+    if template['digits']:
+        for slot_digits, digit in zip(template['digits'], glyphs.get_layout_digits(layout, codepoint)):
+            for i, mask in enumerate(slot_digits[digit]):
+                rows[i] ^= mask
+    return Bitmap(template['width'], template['height'], template['x_offset'], template['y_offset'], rows)
+
+
+def get_glyph_name(codepoint):
+    """Return the glyph name of a codepoint (same names as the font backends)."""
+    return f"uni{codepoint:04X}" if codepoint <= 0xFFFF else f"u{codepoint:04X}"
+
+
+# ============================================================================
+# Embedded Strikes (EBDT/EBLC)
+# ============================================================================
+
+def _pack_bit_aligned(bitmap):
+    """Pack bitmap rows without row padding (EBDT image format 5)."""
+    bits = 0
+    for row in bitmap.rows:
+        bits = (bits << bitmap.width) | row
+    count = bitmap.width * bitmap.height
+    padding = -count % 8
+    return (bits << padding).to_bytes((count + padding) // 8, 'big')
+
+
+def _big_glyph_metrics(template, size):
+    """BigGlyphMetrics record of a layout template."""
+    return struct.pack('>BBbbBbbB', template['height'], template['width'],
+                       template['x_offset'], template['y_offset'] + template['height'], size,
+                       -(template['width'] // 2), 0, size)
+
+
+def build_strike_tables(glyph_order, cmap, sizes):
+    """
+    Build EBDT and EBLC tables with one bitmap strike per size.
+
+    Every run of consecutive glyphs with the same layout becomes one index
+    subtable of format 2 (constant image size and metrics) pointing at bit-
+    aligned images (format 5), so each glyph costs only its pixel bits.
+    Glyphs without a codepoint (.notdef, components) get no bitmap and are
+    scaled from their outlines.
+
+    Args:
+        glyph_order: Glyph names in glyph ID order
+        cmap: Dict of codepoint -> glyph name
+        sizes: Strike sizes in pixels per em (at least MIN_STRIKE_SIZE)
+
+    Returns:
+        Tuple (EBDT bytes, EBLC bytes)
+    """
+    codepoint_of = {name: cp for cp, name in cmap.items()}
+    glyph_layouts = [glyphs.get_layout(codepoint_of[name]) if name in codepoint_of else None
+                     for name in glyph_order]
+
+    # Runs of glyph IDs with the same layout: (first, last, layout)
+    runs = []
+    for glyph_id, layout in enumerate(glyph_layouts):
+        if layout is None:
+            continue
+        if runs and runs[-1][2] == layout and runs[-1][1] == glyph_id - 1:
+            runs[-1][1] = glyph_id
+        else:
+            runs.append([glyph_id, glyph_id, layout])
+
+    ebdt = bytearray(struct.pack('>HH', 2, 0))
+    strikes = []
+    for size in sorted(sizes):
+        if size > 255:
+            raise ValueError(f"Bitmap strikes are limited to 255 px, got {size}")
+        ascent, descent = get_strike_metrics(size)
+        subtables = []
+        templates = []
+        for first, last, layout in runs:
+            template = compile_strike_template(layout, size)
+            templates.append(template)
+            image_offset = len(ebdt)
+            for glyph_id in range(first, last + 1):
+                ebdt += _pack_bit_aligned(render_bitmap(codepoint_of[glyph_order[glyph_id]], size))
+            image_size = math.ceil(template['width'] * template['height'] / 8)
+            subtable = struct.pack('>HHII', 2, 5, image_offset, image_size) + _big_glyph_metrics(template, size)
+            subtables.append((first, last, subtable))
+
+        # SbitLineMetrics: ascender, descender, widthMax, caretSlopeNumerator,
+        # caretSlopeDenominator, caretOffset, minOriginSB, minAdvanceSB,
+        # maxBeforeBL, minAfterBL, pad1, pad2
+        line_metrics = struct.pack(
+            '>bbBbbbbbbbbb', ascent, -descent,
+            max((t['width'] for t in templates), default=0), 1, 0, 0,
+            min((t['x_offset'] for t in templates), default=0),
+            min((size - t['x_offset'] - t['width'] for t in templates), default=0),
+            max((t['y_offset'] + t['height'] for t in templates), default=0),
+            min((t['y_offset'] for t in templates), default=0), 0, 0,
+        )
+        strikes.append((size, subtables, line_metrics))
+
+    # EBLC: header, BitmapSize records, then per strike its IndexSubTableArray + subtables
+    eblc_header = struct.pack('>HHI', 2, 0, len(strikes))
+    offset = len(eblc_header) + 48 * len(strikes)
+    size_records = []
+    index_data = bytearray()
+    for size, subtables, line_metrics in strikes:
+        array_size = 8 * len(subtables)
+        array = bytearray()
+        tables = bytearray()
+        for first, last, subtable in subtables:
+            array += struct.pack('>HHI', first, last, array_size + len(tables))
+            tables += subtable
+        first_glyph = subtables[0][0] if subtables else 0
+        last_glyph = subtables[-1][1] if subtables else 0
+        size_records.append(
+            struct.pack('>IIII', offset, array_size + len(tables), len(subtables), 0)
+            + line_metrics + line_metrics
+            + struct.pack('>HHBBBb', first_glyph, last_glyph, size, size, 1, 1)  # bitDepth 1, horizontal
+        )
+        index_data += array + tables
+        offset += array_size + len(tables)
+
+    return bytes(ebdt), eblc_header + b''.join(size_records) + bytes(index_data)
+
+
+# ============================================================================
+# BDF / PCF
+# ============================================================================
+
+def get_font_properties(size):
+    """
+    Return the X11 font properties of a strike, as an ordered dict.
+
+    Includes the XLFD name as 'FONT'; string values are str, numeric ones int.
+    """
+    ascent, descent = get_strike_metrics(size)
+    point_size = round(size * 720 / RESOLUTION_DPI)  # decipoints
+    xlfd = (f"-misc-{config.FONT_FAMILY}-Medium-R-Normal--{size}-{point_size}-"
+            f"{RESOLUTION_DPI}-{RESOLUTION_DPI}-C-{size * 10}-ISO10646-1")
+    return collections.OrderedDict([
+        ('FONT', xlfd),
+        ('FOUNDRY', 'misc'),
+        ('FAMILY_NAME', config.FONT_FAMILY),
+        ('WEIGHT_NAME', 'Medium'),
+        ('SLANT', 'R'),
+        ('SETWIDTH_NAME', 'Normal'),
+        ('ADD_STYLE_NAME', ''),
+        ('PIXEL_SIZE', size),
+        ('POINT_SIZE', point_size),
+        ('RESOLUTION_X', RESOLUTION_DPI),
+        ('RESOLUTION_Y', RESOLUTION_DPI),
+        ('SPACING', 'C'),
+        ('AVERAGE_WIDTH', size * 10),
+        ('CHARSET_REGISTRY', 'ISO10646'),
+        ('CHARSET_ENCODING', '1'),
+        ('FONT_ASCENT', ascent),
+        ('FONT_DESCENT', descent),
+        ('DEFAULT_CHAR', 0xFFFD),
+        ('COPYRIGHT', config.FONT_COPYRIGHT),
+        ('FONT_VERSION', config.FONT_VERSION),
+    ])
+
+
+def write_bdf(path, size, codepoints):
+    """
+    Write a BDF font of one strike size.
+
+    Args:
+        path: Output .bdf path
+        size: Strike size in pixels
+        codepoints: CodepointSet (invalid codepoints are skipped)
+    """
+    codepoints = codepoints.intersection(CodepointSet.valid_codepoints())
+    properties = get_font_properties(size)
+    if 0xFFFD not in codepoints:
+        del properties['DEFAULT_CHAR']
+    ascent, descent = get_strike_metrics(size)
+
+    with atomic_output(path) as tmp_path:
+        with open(tmp_path, 'w', encoding='ascii', newline='\n') as f:
+            f.write("STARTFONT 2.1\n")
+            f.write(f"FONT {properties['FONT']}\n")
+            f.write(f"SIZE {size} {RESOLUTION_DPI} {RESOLUTION_DPI}\n")
+            f.write(f"FONTBOUNDINGBOX {size} {size} 0 {-descent}\n")
+            f.write(f"STARTPROPERTIES {len(properties) - 1}\n")
+            for name, value in properties.items():
+                if name == 'FONT':
+                    continue
+                f.write(f'{name} "{value}"\n' if isinstance(value, str) else f"{name} {value}\n")
+            f.write("ENDPROPERTIES\n")
+            f.write(f"CHARS {len(codepoints)}\n")
+
+            lines = []
+            for codepoint in codepoints:
+                bitmap = render_bitmap(codepoint, size)
+                row_bytes = (bitmap.width + 7) // 8
+                shift = row_bytes * 8 - bitmap.width
+                lines.append(f"STARTCHAR {get_glyph_name(codepoint)}\nENCODING {codepoint}\n"
+                             f"SWIDTH 1000 0\nDWIDTH {size} 0\n"
+                             f"BBX {bitmap.width} {bitmap.height} {bitmap.x_offset} {bitmap.y_offset}\n"
+                             "BITMAP\n")
+                lines.extend(f"{row << shift:0{row_bytes * 2}X}\n" for row in bitmap.rows)
+                lines.append("ENDCHAR\n")
+                if len(lines) >= 65536:
+                    f.write(''.join(lines))
+                    lines = []
+            f.write(''.join(lines))
+            f.write("ENDFONT\n")
+
+
+# PCF table types and format flags (see the X11 libXfont pcfread.c / pcf-format docs)
+PCF_PROPERTIES = 1 << 0
+PCF_ACCELERATORS = 1 << 1
+PCF_METRICS = 1 << 2
+PCF_BITMAPS = 1 << 3
+PCF_BDF_ENCODINGS = 1 << 5
+PCF_SWIDTHS = 1 << 6
+PCF_GLYPH_NAMES = 1 << 7
+PCF_BDF_ACCELERATORS = 1 << 8
+
+PCF_BYTE_MASK = 1 << 2   # Most significant byte first
+PCF_BIT_MASK = 1 << 3    # Most significant bit first
+PCF_GLYPH_PAD_INDEX = 2  # Rows padded to 1 << 2 = 4 bytes (the X server default)
+
+# Every table: big-endian, MSB-first bits, 4-byte glyph rows
+PCF_FORMAT = PCF_BYTE_MASK | PCF_BIT_MASK | PCF_GLYPH_PAD_INDEX
+
+
+def _pcf_metrics(metrics):
+    """Pack (left bearing, right bearing, width, ascent, descent) as an uncompressed PCF metric."""
+    return struct.pack('>hhhhhH', *metrics, 0)
+
+
+def _pcf_pad(data):
+    """Pad a table to a multiple of 4 bytes."""
+    return data + b'\0' * (-len(data) % 4)
+
+
+def build_pcf(size, codepoints):
+    """
+    Build a PCF font of one strike size.
+
+    Args:
+        size: Strike size in pixels
+        codepoints: CodepointSet within U+0000-FFFF (invalid codepoints are skipped)
+
+    Returns:
+        PCF file bytes
+
+    Raises:
+        ValueError: For codepoints above U+FFFF (PCF encodings are 16-bit)
+    """
+    codepoints = codepoints.intersection(CodepointSet.valid_codepoints())
+    if codepoints and codepoints[-1] > 0xFFFF:
+        raise ValueError("PCF fonts can only encode U+0000-FFFF")
+    properties = get_font_properties(size)
+    if 0xFFFD not in codepoints:
+        del properties['DEFAULT_CHAR']
+    ascent, descent = get_strike_metrics(size)
+
+    # Properties: (name offset, is string, value) records, then the string pool
+    strings = bytearray()
+
+    def add_string(text):
+        offset = len(strings)
+        strings.extend(text.encode('ascii') + b'\0')
+        return offset
+
+    records = bytearray()
+    for name, value in properties.items():
+        name_offset = add_string(name)
+        if isinstance(value, str):
+            records += struct.pack('>iBi', name_offset, 1, add_string(value))
+        else:
+            records += struct.pack('>iBi', name_offset, 0, value)
+    properties_table = (struct.pack('<i', PCF_FORMAT) + struct.pack('>i', len(properties)) + records
+                        + b'\0' * (-len(properties) % 4) + struct.pack('>i', len(strings)) + bytes(strings))
+
+    # Metrics and bitmaps
+    metrics = []
+    offsets = []
+    bitmap_sizes = [0, 0, 0, 0]
+    bitmap_data = bytearray()
+    pad_bytes = 1 << PCF_GLYPH_PAD_INDEX
+    for codepoint in codepoints:
+        bitmap = render_bitmap(codepoint, size)
+        metrics.append((bitmap.x_offset, bitmap.x_offset + bitmap.width, size,
+                        bitmap.y_offset + bitmap.height, -bitmap.y_offset))
+        for pad_index in range(4):
+            pad = 1 << pad_index
+            bitmap_sizes[pad_index] += bitmap.height * ((bitmap.width + 8 * pad - 1) // (8 * pad)) * pad
+        row_bytes = (bitmap.width + 8 * pad_bytes - 1) // (8 * pad_bytes) * pad_bytes
+        shift = row_bytes * 8 - bitmap.width
+        offsets.append(len(bitmap_data))
+        for row in bitmap.rows:
+            bitmap_data += (row << shift).to_bytes(row_bytes, 'big')
+
+    metrics_table = (struct.pack('<i', PCF_FORMAT) + struct.pack('>i', len(metrics))
+                     + b''.join(_pcf_metrics(m) for m in metrics))
+    bitmaps_table = (struct.pack('<i', PCF_FORMAT) + struct.pack('>i', len(metrics))
+                     + struct.pack(f'>{len(offsets)}i', *offsets) + struct.pack('>4i', *bitmap_sizes)
+                     + bytes(bitmap_data))
+
+    # Accelerators: bounds over all glyphs
+    min_bounds = tuple(min(m[i] for m in metrics) for i in range(5)) if metrics else (0,) * 5
+    max_bounds = tuple(max(m[i] for m in metrics) for i in range(5)) if metrics else (0,) * 5
+    max_overlap = max((m[1] - m[2] for m in metrics), default=0)
+    ink_inside = all(m[0] >= 0 and m[1] <= m[2] and m[3] <= ascent and m[4] <= descent for m in metrics)
+    accelerators_table = (struct.pack('<i', PCF_FORMAT)
+                          + struct.pack('>8B', int(max_overlap <= 0), 0, 0, 1, int(ink_inside), 0, 0, 0)
+                          + struct.pack('>iii', ascent, descent, max_overlap)
+                          + _pcf_metrics(min_bounds) + _pcf_metrics(max_bounds))
+
+    # Encodings: a (byte1, byte2) table of glyph indices
+    if metrics:
+        min_byte1 = codepoints[0] >> 8
+        max_byte1 = codepoints[-1] >> 8
+    else:
+        min_byte1 = max_byte1 = 0
+    min_byte2, max_byte2 = 0, 0xFF
+    columns = max_byte2 - min_byte2 + 1
+    indices = [0xFFFF] * (columns * (max_byte1 - min_byte1 + 1))
+    for glyph_index, codepoint in enumerate(codepoints):
+        indices[((codepoint >> 8) - min_byte1) * columns + (codepoint & 0xFF) - min_byte2] = glyph_index
+    default_char = properties.get('DEFAULT_CHAR', 0xFFFF)
+    encodings_table = (struct.pack('<i', PCF_FORMAT)
+                       + struct.pack('>hhhhH', min_byte2, max_byte2, min_byte1, max_byte1, default_char)
+                       + struct.pack(f'>{len(indices)}H', *indices))
+
+    swidths_table = (struct.pack('<i', PCF_FORMAT) + struct.pack('>i', len(metrics))
+                     + struct.pack(f'>{len(metrics)}i', *([1000] * len(metrics))))
+
+    names = bytearray()
+    name_offsets = []
+    for codepoint in codepoints:
+        name_offsets.append(len(names))
+        names += get_glyph_name(codepoint).encode('ascii') + b'\0'
+    glyph_names_table = (struct.pack('<i', PCF_FORMAT) + struct.pack('>i', len(name_offsets))
+                         + struct.pack(f'>{len(name_offsets)}i', *name_offsets)
+                         + struct.pack('>i', len(names)) + bytes(names))
+
+    tables = [
+        (PCF_PROPERTIES, properties_table),
+        (PCF_ACCELERATORS, accelerators_table),
+        (PCF_METRICS, metrics_table),
+        (PCF_BITMAPS, bitmaps_table),
+        (PCF_BDF_ENCODINGS, encodings_table),
+        (PCF_SWIDTHS, swidths_table),
+        (PCF_GLYPH_NAMES, glyph_names_table),
+        (PCF_BDF_ACCELERATORS, accelerators_table),
+    ]
+
+    # Header: magic, table count, table of contents (type, format, size, offset), little-endian
+    offset = 8 + 16 * len(tables)
+    toc = bytearray()
+    body = bytearray()
+    for table_type, data in tables:
+        data = _pcf_pad(data)
+        toc += struct.pack('<iiii', table_type, PCF_FORMAT, len(data), offset)
+        body += data
+        offset += len(data)
+    return b'\1fcp' + struct.pack('<i', len(tables)) + bytes(toc) + bytes(body)
+
+
+def write_pcf(path, size, codepoints):
+    """Write a PCF font of one strike size (see build_pcf)."""
+    data = build_pcf(size, codepoints)
+    with atomic_output(path) as tmp_path:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+
+
+def generate_bitmap_fonts(output_dir, sizes, codepoints, pcf=True):
+    """
+    Write a BDF (and PCF) font per strike size.
+
+    Args:
+        output_dir: Output directory
+        sizes: Strike sizes in pixels
+        codepoints: CodepointSet for the BDF files; PCF files get its BMP part
+        pcf: Also write PCF files
+
+    Returns:
+        List of written file paths
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    bmp = codepoints.restrict(0x0000, 0xFFFF)
+    if pcf and len(bmp) < len(codepoints):
+        print(f"⚠ PCF files cover U+0000-FFFF only ({len(codepoints) - len(bmp):,} codepoints in BDF only)")
+
+    for size in sizes:
+        stem = os.path.join(output_dir, f"{config.FONT_NAME}-{size}")
+        write_bdf(f"{stem}.bdf", size, codepoints)
+        written.append(f"{stem}.bdf")
+        print(f"✓ {stem}.bdf ({os.path.getsize(stem + '.bdf') / 1024:.0f} KB)")
+        if pcf and bmp:
+            write_pcf(f"{stem}.pcf", size, bmp)
+            written.append(f"{stem}.pcf")
+            print(f"✓ {stem}.pcf ({os.path.getsize(stem + '.pcf') / 1024:.0f} KB)")
+    return written
+
+
+# ============================================================================
+# Command Line
+# ============================================================================
+
+def parse_sizes(value):
+    """Parse a '--sizes 13,14,16' value into a tuple of strike sizes."""
+    try:
+        sizes = tuple(sorted({int(part) for part in value.split(',') if part.strip()}))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated pixel sizes, got {value!r}")
+    if not sizes or sizes[0] < MIN_STRIKE_SIZE or sizes[-1] > 255:
+        raise argparse.ArgumentTypeError(f"strike sizes must be between {MIN_STRIKE_SIZE} and 255 px")
+    return sizes
+
+
+def parse_range(value):
+    """Parse a '--range' value into a CodepointSet."""
+    try:
+        return parse_codepoint_ranges(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Write pixel-exact BDF and PCF bitmap fonts.")
+    parser.add_argument("--sizes", type=parse_sizes, default=config.BITMAP_FONT_SIZES, metavar="LIST",
+                        help=f"strike sizes in pixels (default: {','.join(map(str, config.BITMAP_FONT_SIZES))})")
+    parser.add_argument("--range", type=parse_range, action="append", dest="ranges", metavar="RANGES",
+                        help="codepoints to include, e.g. U+0000-FFFF (repeatable; default: U+0000-FFFF)")
+    parser.add_argument("--codepoints", metavar="FILE",
+                        help="file of codepoints and ranges to include ('#' starts a comment)")
+    parser.add_argument("--no-pcf", action="store_true", help="write BDF files only")
+    parser.add_argument("-o", "--output-dir", default=config.BITMAP_DIR, metavar="DIR",
+                        help=f"output directory (default: {config.BITMAP_DIR})")
+    args = parser.parse_args()
+
+    ranges = [r for selection in args.ranges or () for r in selection.ranges]
+    if args.codepoints:
+        try:
+            ranges += load_codepoints_file(args.codepoints).ranges
+        except (OSError, ValueError) as e:
+            parser.error(f"--codepoints: {e}")
+    args.selection = CodepointSet(ranges) if ranges else CodepointSet([(0x0000, 0xFFFF)])
+    return args
+
+
+def main():
+    args = parse_args()
+    codepoints = args.selection.intersection(CodepointSet.valid_codepoints())
+    print(f"Writing {len(codepoints):,} glyphs at {', '.join(map(str, args.sizes))} px to {args.output_dir}/")
+    generate_bitmap_fonts(args.output_dir, args.sizes, codepoints, pcf=not args.no_pcf)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Content-addressed build cache for UnicodeHexMono font chunks.
+
+Every planned chunk gets a key that hashes everything its output depends on:
+- The codepoints it contains
+- The config values used by its glyph layouts (plus font metadata and metrics)
+- The source code of the modules that write the files, and the digit patterns;
+  the drawing functions of each layout only count for chunks with that layout
+- The build mode (regular or composite), the backend and the FontForge/fonttools versions
+
+Generated files are stored under the cache directory by key. When a later build
+plans a chunk with the same key, its files are copied back into dist/ instead of
+being regenerated. Changing TWO_DIGIT_SIZE, for example, only changes the key of
+the ASCII chunk.
+"""
+
+import functools
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import shutil
+
+import config
+import utils
+import glyphs
+import reproducible
+from build_journal import atomic_output
+from codepoints import CodepointSet
+
+
+# Config values every chunk depends on (metadata, metrics, frame and .notdef)
+COMMON_CONFIG_KEYS = (
+    'FONT_NAME', 'FONT_FAMILY', 'FONT_STYLE', 'FONT_FULLNAME', 'FONT_VERSION',
+    'FONT_COPYRIGHT', 'EM_SIZE', 'ASCENT', 'DESCENT', 'GLYPH_WIDTH', 'BOX_SIZE',
+    'BOX_MARGIN', 'BOX_STROKE_WIDTH', 'CORNER_RADIUS', 'GLYPH_Y_OFFSET',
+    'OUTPUT_FORMAT', 'COMPOSITE_OUTPUT_FORMAT', 'CFF_SUBROUTINES',
+    'COLR_GLYPHS', 'BITMAP_STRIKES',
+)
+
+# Additional config values read by each layout
+LAYOUT_CONFIG_KEYS = {
+    glyphs.LAYOUT_2DIGIT: ('TWO_DIGIT_SIZE', 'GRID_SPACING'),
+    glyphs.LAYOUT_2X2: ('DIGIT_SIZE', 'GRID_SPACING'),
+    glyphs.LAYOUT_5DIGIT_SPLIT: ('DIGIT_SIZE', 'PLANE_DIGIT_SIZE', 'PLANE_SECTION_SPACING',
+                                 'SUPPLEMENTARY_GRID_SPACING'),
+    glyphs.LAYOUT_PLANE16: ('DIGIT_SIZE', 'GRID_SPACING', 'CORNER_RADIUS_PLANE16'),
+    glyphs.LAYOUT_REPLACEMENT: ('REPLACEMENT_CHAR_PADDING',),
+    glyphs.LAYOUT_NOTDEF: (),
+}
+
+# Modules whose code decides the bytes of every file. Their whole source is part
+# of the key, so a new helper cannot be left out; the layout drawing functions
+# (LAYOUT_FUNCTIONS) are cut out and only count for chunks that use the layout
+OUTPUT_MODULES = ('glyphs', 'utils', 'codepoints', 'reproducible', 'generator')
+
+# Additional modules of the fonttools backend (imported lazily: fontTools may be
+# missing) and of its embedded bitmap strikes (with BITMAP_STRIKES)
+FONTTOOLS_BACKEND_MODULE = 'fonttools_backend'
+BITMAP_STRIKE_MODULE = 'bitmaps'
+
+# Additional drawing functions called by each layout
+LAYOUT_FUNCTIONS = {
+    glyphs.LAYOUT_2DIGIT: (glyphs.draw_hex_code_2digit,),
+    glyphs.LAYOUT_2X2: (glyphs.draw_hex_code_2x2,),
+    glyphs.LAYOUT_5DIGIT_SPLIT: (glyphs.draw_hex_code_5digit_split,),
+    glyphs.LAYOUT_PLANE16: (glyphs.draw_hex_code_2x2_filled, utils.draw_thick_line),
+    glyphs.LAYOUT_REPLACEMENT: (glyphs.draw_replacement_character, glyphs.draw_replacement_outline,
+                                utils.draw_thick_line),
+    glyphs.LAYOUT_NOTDEF: (),
+}
+
+ENTRY_FILENAME = 'entry.json'
+
+
+def _codepoint_ranges(codepoints):
+    """Collapse a sorted codepoint sequence into (start, end) ranges."""
+    if isinstance(codepoints, CodepointSet):
+        return [list(r) for r in codepoints.ranges]
+    ranges = []
+    for cp in codepoints:
+        if ranges and cp == ranges[-1][1] + 1:
+            ranges[-1][1] = cp
+        else:
+            ranges.append([cp, cp])
+    return ranges
+
+
+def _tool_versions():
+    """Return versions of the font tools that write the cached files."""
+    versions = {}
+    try:
+        import fontforge
+        versions['fontforge'] = fontforge.version()
+    except ImportError:
+        versions['fontforge'] = None
+    try:
+        import fontTools
+        versions['fonttools'] = fontTools.version
+    except ImportError:
+        # Without fonttools no WOFF2 is written, so those entries must not be reused
+        versions['fonttools'] = None
+    return versions
+
+
+@functools.lru_cache(maxsize=None)
+def _module_source(name):
+    """
+    Return the source of an output module without its layout drawing functions.
+
+    Each function in LAYOUT_FUNCTIONS is replaced by its name, so editing one
+    layout only changes the keys of the chunks that use it.
+    """
+    source = inspect.getsource(importlib.import_module(name))
+    for functions in LAYOUT_FUNCTIONS.values():
+        for fn in functions:
+            if fn.__module__ == name:
+                source = source.replace(inspect.getsource(fn), f"<layout function {fn.__qualname__}>\n")
+    return source
+
+
+def chunk_cache_key(chunk, composite, backend=config.BACKEND, extra_functions=()):
+    """
+    Compute the cache key of a planned chunk.
+
+    Args:
+        chunk: Chunk dict from generator.plan_chunks()
+        composite: Whether the chunk is built in composite glyph mode
+        backend: Font backend that writes the files ('fontforge' or 'fonttools')
+        extra_functions: Additional functions whose source affects the output
+                         (e.g. generator.create_font_object)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    codepoints = chunk['codepoints']
+    layouts = sorted({glyphs.get_layout(cp) for cp in codepoints})
+
+    config_keys = set(COMMON_CONFIG_KEYS)
+    modules = list(OUTPUT_MODULES)
+    functions = list(extra_functions)
+    if backend == 'fonttools':
+        modules.append(FONTTOOLS_BACKEND_MODULE)
+        if config.BITMAP_STRIKES:
+            modules.append(BITMAP_STRIKE_MODULE)
+    for layout in layouts:
+        config_keys.update(LAYOUT_CONFIG_KEYS[layout])
+        functions.extend(LAYOUT_FUNCTIONS[layout])
+
+    key_data = {
+        'codepoints': _codepoint_ranges(codepoints),
+        'config': {name: getattr(config, name) for name in sorted(config_keys)},
+        'modules': {name: _module_source(name) for name in sorted(modules)},
+        'source': sorted({f"{fn.__module__}.{fn.__qualname__}\n{inspect.getsource(fn)}"
+                          for fn in functions}),
+        'digit_patterns': utils.DIGIT_PATTERNS,
+        'composite': bool(composite),
+        'file_name': chunk.get('file_name'),
+        'woff2': chunk.get('write_woff2', True),
+        'backend': backend,
+        'tools': _tool_versions(),
+        'timestamp': reproducible.get_build_timestamp(),
+    }
+    encoded = json.dumps(key_data, sort_keys=True, default=repr).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def restore(cache_dir, key, output_dir):
+    """
+    Copy the cached files for a key into output_dir.
+
+    Returns:
+        List of restored file paths, or None on a cache miss
+    """
+    entry_dir = os.path.join(cache_dir, key)
+    entry_path = os.path.join(entry_dir, ENTRY_FILENAME)
+    if not os.path.exists(entry_path):
+        return None
+
+    with open(entry_path, 'r', encoding='utf-8') as f:
+        entry = json.load(f)
+
+    # A partially deleted entry counts as a miss
+    filenames = entry.get('files', [])
+    if not filenames or not all(os.path.exists(os.path.join(entry_dir, name)) for name in filenames):
+        return None
+
+    restored = []
+    for name in filenames:
+        destination = os.path.join(output_dir, name)
+        with atomic_output(destination) as tmp_path:
+            shutil.copyfile(os.path.join(entry_dir, name), tmp_path)
+        restored.append(destination)
+    return restored
+
+
+def store(cache_dir, key, paths):
+    """
+    Copy generated files into the cache under a key.
+
+    The entry is assembled in a temporary directory and renamed into place, so a
+    crash or a concurrent worker never leaves a half-written entry behind.
+    """
+    entry_dir = os.path.join(cache_dir, key)
+    if os.path.exists(os.path.join(entry_dir, ENTRY_FILENAME)):
+        return
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_dir = f"{entry_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    filenames = []
+    for path in paths:
+        name = os.path.basename(path)
+        shutil.copyfile(path, os.path.join(tmp_dir, name))
+        filenames.append(name)
+
+    with open(os.path.join(tmp_dir, ENTRY_FILENAME), 'w', encoding='utf-8') as f:
+        json.dump({'files': filenames}, f, indent=2)
+
+    try:
+        os.replace(tmp_dir, entry_dir)
+    except OSError:
+        # Another process stored the same key first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
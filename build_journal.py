@@ -0,0 +1,187 @@
+"""
+Build journal and atomic file writes for resumable UnicodeHexMono builds.
+
+A full build writes dozens of large files over a long time. To survive a crash
+or a killed process:
+- Every output file is written under a temporary '.partial-' name in the same
+  directory and renamed into place once complete, so dist/ never holds a
+  half-written font under its final name
+- Each finished chunk is appended to a journal in the output directory, with
+  the names and sizes of its files and its build cache key
+- The next run of the same plan skips the chunks the journal lists as complete
+  (whose files are still intact and whose cache key is unchanged, i.e. built
+  with the same glyph settings and drawing code) and resumes at the first
+  incomplete one
+
+The journal is deleted when the build finishes, so a later build starts from
+scratch (unchanged chunks still come from the build cache).
+"""
+
+import contextlib
+import json
+import os
+import threading
+
+import config
+
+
+# ============================================================================
+# Atomic Writes
+# ============================================================================
+
+def get_partial_path(path):
+    """Return the temporary path a file is written to before being renamed to path."""
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f"{config.PARTIAL_FILE_PREFIX}{os.getpid()}-{name}")
+
+
+def is_partial_file(filename):
+    """Check if a filename is a temporary file of an unfinished write."""
+    return filename.startswith(config.PARTIAL_FILE_PREFIX)
+
+
+@contextlib.contextmanager
+def atomic_output(path):
+    """
+    Context manager yielding a temporary path to write `path` through.
+
+    The temporary file keeps the extension of `path` (FontForge picks the
+    output format from it) and is renamed to `path` when the block completes;
+    if the block raises, it is deleted.
+
+    Example:
+        with atomic_output('dist/font.otf') as tmp_path:
+            font.generate(tmp_path)
+    """
+    tmp_path = get_partial_path(path)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+def remove_partial_files(output_dir, filenames):
+    """
+    Delete temporary files left behind by killed builds.
+
+    Only temporaries of the given final filenames are removed, so builds of
+    other shards writing to the same directory are not disturbed.
+
+    Returns:
+        Number of files removed
+    """
+    if not os.path.isdir(output_dir):
+        return 0
+
+    filenames = set(filenames)
+    removed = 0
+    for name in os.listdir(output_dir):
+        if not is_partial_file(name):
+            continue
+        # .partial-<pid>-<final name>
+        final_name = name[len(config.PARTIAL_FILE_PREFIX):].partition('-')[2]
+        if final_name in filenames:
+            with contextlib.suppress(OSError):
+                os.remove(os.path.join(output_dir, name))
+                removed += 1
+    return removed
+
+
+# ============================================================================
+# Build Journal
+# ============================================================================
+
+def get_journal_path(output_dir, shard=None):
+    """Return the journal path of a build (one per shard of a sharded build)."""
+    name = config.BUILD_JOURNAL_FILE
+    if shard is not None:
+        stem, ext = os.path.splitext(name)
+        name = f"{stem}-{shard[0]}-of-{shard[1]}{ext}"
+    return os.path.join(output_dir, name)
+
+
+class BuildJournal:
+    """
+    Append-only record of the chunks a build has finished.
+
+    The first line identifies the plan (see generator.plan_fingerprint); every
+    further line is one finished chunk. Lines are flushed and synced as they
+    are written, and a torn last line from a crash is ignored on load.
+    """
+
+    def __init__(self, path, fingerprint):
+        """
+        Open the journal of a build, keeping entries of the same plan.
+
+        Args:
+            path: Journal file path (see get_journal_path)
+            fingerprint: Fingerprint of the planned build; a journal of a
+                         different plan is discarded
+        """
+        self.path = path
+        self.fingerprint = fingerprint
+        self.completed = {}  # chunk number -> {'files': list of {'name', 'size'}, 'key': cache key}
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            self._load()
+        if not self.completed:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({'plan': fingerprint}) + '\n')
+
+    def _load(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            lines = f.read().split('\n')
+        try:
+            header = json.loads(lines[0])
+        except ValueError:
+            return
+        if header.get('plan') != self.fingerprint:
+            return
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # Empty or torn line
+            self.completed[entry['number']] = {'files': entry['files'], 'key': entry.get('key')}
+
+    def get_completed_files(self, chunk):
+        """
+        Return the files of a chunk finished by an earlier run, or None.
+
+        A chunk counts as finished only if it was built with the same cache key
+        (chunk['cache_key'], see build_cache.chunk_cache_key) and every file it
+        wrote still exists with the recorded size.
+        """
+        completed = self.completed.get(chunk['number'])
+        if not completed or completed['key'] != chunk.get('cache_key'):
+            return None
+        paths = []
+        for entry in completed['files']:
+            path = os.path.join(chunk['output_dir'], entry['name'])
+            if not os.path.exists(path) or os.path.getsize(path) != entry['size']:
+                return None
+            paths.append(path)
+        return paths
+
+    def record(self, chunk, paths):
+        """Append a finished chunk and its files to the journal (thread-safe)."""
+        entry = {
+            'number': chunk['number'],
+            'files': [{'name': os.path.basename(path), 'size': os.path.getsize(path)} for path in paths],
+            'key': chunk.get('cache_key'),
+        }
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self.completed[chunk['number']] = {'files': entry['files'], 'key': entry['key']}
+
+    def remove(self):
+        """Delete the journal once the build has finished."""
+        with contextlib.suppress(OSError):
+            os.remove(self.path)
@@ -0,0 +1,275 @@
+"""
+Interval-based codepoint sets for UnicodeHexMono.
+
+The valid codepoints (U+0000-U+10FFFD without surrogates and non-characters)
+are a handful of contiguous ranges, so they are stored as sorted, merged
+(start, end) intervals instead of a list of over a million integers:
+- len() is O(1); membership and indexing are O(log number of ranges)
+- Slicing by glyph count (e.g. 60,000-glyph font files) returns new sets
+- Iteration yields codepoints lazily, one range at a time
+
+The whole valid Unicode range is 19 intervals, a few KB of memory.
+"""
+
+import bisect
+import itertools
+import re
+
+import config
+
+# Last codepoint of the Unicode codespace. U+10FFFE/10FFFF are noncharacters,
+# so the valid codepoints end at config.UNICODE_MAX (U+10FFFD)
+CODESPACE_MAX = 0x10FFFF
+
+
+class CodepointSet:
+    """
+    Immutable, sorted set of codepoints stored as inclusive (start, end) ranges.
+
+    Supports len(), iteration, `in`, integer indexing and slicing by position
+    (set[:256], set[-1]), so it can stand in for a sorted list of codepoints.
+    """
+
+    __slots__ = ('_ranges', '_offsets')
+
+    def __init__(self, ranges=()):
+        """
+        Args:
+            ranges: Iterable of inclusive (start, end) pairs, in any order;
+                    overlapping and adjacent ranges are merged
+        """
+        merged = []
+        for start, end in sorted(ranges):
+            if start > end:
+                continue
+            if merged and start <= merged[-1][1] + 1:
+                if end > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], end)
+            else:
+                merged.append((start, end))
+
+        self._ranges = tuple(merged)
+        # _offsets[i] is the position of the first codepoint of range i
+        self._offsets = tuple(itertools.accumulate(
+            (end - start + 1 for start, end in merged[:-1]), initial=0
+        )) if merged else ()
+
+    @classmethod
+    def valid_codepoints(cls, first=config.UNICODE_MIN, last=config.UNICODE_MAX):
+        """
+        Return the codepoints the font covers, restricted to first..last.
+
+        Excludes the surrogates, U+FDD0-U+FDEF and U+nFFFE/U+nFFFF of every
+        plane, exactly like utils.is_valid_codepoint.
+        """
+        excluded = [(config.SURROGATE_START, config.SURROGATE_END), (0xFDD0, 0xFDEF)]
+        excluded += [((plane << 16) | 0xFFFE, (plane << 16) | 0xFFFF) for plane in range(17)]
+        return cls([(first, last)]).difference(cls(excluded))
+
+    @property
+    def ranges(self):
+        """Tuple of inclusive (start, end) ranges, sorted and merged."""
+        return self._ranges
+
+    def __len__(self):
+        if not self._ranges:
+            return 0
+        start, end = self._ranges[-1]
+        return self._offsets[-1] + end - start + 1
+
+    def __bool__(self):
+        return bool(self._ranges)
+
+    def __iter__(self):
+        for start, end in self._ranges:
+            yield from range(start, end + 1)
+
+    def __contains__(self, codepoint):
+        index = bisect.bisect_right(self._ranges, (codepoint, float('inf'))) - 1
+        return index >= 0 and self._ranges[index][0] <= codepoint <= self._ranges[index][1]
+
+    def __eq__(self, other):
+        return isinstance(other, CodepointSet) and self._ranges == other._ranges
+
+    def __hash__(self):
+        return hash(self._ranges)
+
+    def __repr__(self):
+        ranges = ', '.join(f"U+{start:04X}-U+{end:04X}" if start != end else f"U+{start:04X}"
+                           for start, end in self._ranges[:4])
+        if len(self._ranges) > 4:
+            ranges += f", ... ({len(self._ranges)} ranges)"
+        return f"CodepointSet([{ranges}], count={len(self):,})"
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("CodepointSet slices must be contiguous (step 1)")
+            return self.slice(start, stop)
+
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("CodepointSet index out of range")
+        range_index = bisect.bisect_right(self._offsets, index) - 1
+        return self._ranges[range_index][0] + index - self._offsets[range_index]
+
+    def slice(self, start, stop):
+        """
+        Return the codepoints at positions start..stop-1 as a new set.
+
+        Args:
+            start: Position of the first codepoint (0-based, clamped)
+            stop: Position after the last codepoint (clamped)
+        """
+        start = max(start, 0)
+        stop = min(stop, len(self))
+        if start >= stop:
+            return CodepointSet()
+
+        first = bisect.bisect_right(self._offsets, start) - 1
+        last = bisect.bisect_right(self._offsets, stop - 1) - 1
+        ranges = list(self._ranges[first:last + 1])
+        first_cp = self._ranges[first][0] + start - self._offsets[first]
+        last_cp = self._ranges[last][0] + stop - 1 - self._offsets[last]
+        ranges[0] = (first_cp, ranges[0][1])
+        ranges[-1] = (ranges[-1][0], last_cp)
+        return CodepointSet(ranges)
+
+    def split(self, size):
+        """
+        Yield consecutive sets of at most `size` codepoints each.
+
+        Args:
+            size: Maximum codepoints per piece (e.g. config.GLYPHS_PER_FILE)
+        """
+        for start in range(0, len(self), size):
+            yield self.slice(start, start + size)
+
+    def split_aligned(self, boundary):
+        """
+        Yield the non-empty pieces of this set between multiples of `boundary`.
+
+        Args:
+            boundary: Alignment in codepoints (e.g. 256 yields U+0000-U+00FF,
+                      U+0100-U+01FF, ... restricted to this set)
+        """
+        pieces = []
+        current_window = None
+        for start, end in self._ranges:
+            window = start - start % boundary
+            while window <= end:
+                if window != current_window and pieces:
+                    yield CodepointSet(pieces)
+                    pieces = []
+                current_window = window
+                pieces.append((max(start, window), min(end, window + boundary - 1)))
+                window += boundary
+        if pieces:
+            yield CodepointSet(pieces)
+
+    def intersection(self, other):
+        """Return the codepoints in both this set and `other`."""
+        ranges = []
+        i = j = 0
+        while i < len(self._ranges) and j < len(other._ranges):
+            start = max(self._ranges[i][0], other._ranges[j][0])
+            end = min(self._ranges[i][1], other._ranges[j][1])
+            if start <= end:
+                ranges.append((start, end))
+            if self._ranges[i][1] < other._ranges[j][1]:
+                i += 1
+            else:
+                j += 1
+        return CodepointSet(ranges)
+
+    def difference(self, other):
+        """Return the codepoints in this set that are not in `other`."""
+        ranges = []
+        j = 0
+        for start, end in self._ranges:
+            # Skip excluded ranges that end before this range
+            while j < len(other._ranges) and other._ranges[j][1] < start:
+                j += 1
+            k = j
+            while k < len(other._ranges) and other._ranges[k][0] <= end:
+                ex_start, ex_end = other._ranges[k]
+                if ex_start > start:
+                    ranges.append((start, ex_start - 1))
+                start = max(start, ex_end + 1)
+                k += 1
+            if start <= end:
+                ranges.append((start, end))
+        return CodepointSet(ranges)
+
+    def restrict(self, first, last):
+        """Return the codepoints within first..last (inclusive)."""
+        return self.intersection(CodepointSet([(first, last)]))
+
+
+def parse_codepoint_ranges(text):
+    """
+    Parse codepoints and ranges written as hex, e.g. 'U+1F600-1F64F, U+41 20AC'.
+
+    Tokens are separated by commas or whitespace. Each token is a codepoint
+    (U+1F600, 1F600 or 0x1F600) or an inclusive range of two codepoints joined
+    by '-' or '..' (U+1F600-U+1F64F, 1F600..1F64F).
+
+    Args:
+        text: Codepoint list
+
+    Returns:
+        CodepointSet
+
+    Raises:
+        ValueError: For tokens that are not hex codepoints or ranges, and for
+                    codepoints above U+10FFFF (surrogates and noncharacters
+                    are accepted; callers drop them with valid_codepoints())
+    """
+    ranges = []
+    for token in re.split(r'[\s,]+', text.strip()):
+        if not token:
+            continue
+        match = re.fullmatch(r'(?:U\+|0x)?([0-9A-F]{1,6})(?:(?:-|\.\.)(?:U\+|0x)?([0-9A-F]{1,6}))?',
+                             token, re.IGNORECASE)
+        if not match:
+            raise ValueError(f"Invalid codepoint or range: {token!r}")
+        start = int(match.group(1), 16)
+        end = int(match.group(2), 16) if match.group(2) else start
+        if end > CODESPACE_MAX or start > end:
+            raise ValueError(f"Invalid codepoint or range: {token!r}")
+        ranges.append((start, end))
+    return CodepointSet(ranges)
+
+
+def load_codepoints_file(path):
+    """
+    Read a codepoint list file for parse_codepoint_ranges ('#' starts a comment).
+
+    Returns:
+        CodepointSet
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_codepoint_ranges(' '.join(line.split('#', 1)[0] for line in f))
+
+
+def load_unicode_blocks(path):
+    """
+    Read Unicode block ranges from the UCD Blocks.txt file.
+
+    Args:
+        path: Path to Blocks.txt (https://www.unicode.org/Public/UCD/latest/ucd/Blocks.txt)
+
+    Returns:
+        List of (start, end, block_name) tuples, sorted by start
+    """
+    blocks = []
+    line_pattern = re.compile(r'^([0-9A-F]+)\.\.([0-9A-F]+);\s*(.+?)\s*$', re.IGNORECASE)
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            match = line_pattern.match(line.split('#', 1)[0])
+            if match:
+                blocks.append((int(match.group(1), 16), int(match.group(2), 16), match.group(3)))
+    return sorted(blocks)
@@ -9,6 +9,7 @@ This module contains all configuration parameters for font generation, organized
 - Glyph positioning constants
 - Unicode ranges and validation
 - Multi-file generation settings
+- Output format and build cache settings
 """
 
 # ============================================================================
@@ -68,4 +69,80 @@ SURROGATE_END = 0xDFFF
 GLYPHS_PER_FILE = 60000  # Conservative limit (allows room for .notdef, etc.)
 
 # Output format
-OUTPUT_FORMAT = 'otf'  # Only OTF, no TTF support
+OUTPUT_FORMAT = 'otf'  # CFF outlines for regular builds
+
+# Composite glyph mode: codepoint glyphs reference shared frame and digit glyphs.
+# CFF has no general composite glyphs, so composite builds use TrueType outlines.
+COMPOSITE_GLYPHS = False
+COMPOSITE_OUTPUT_FORMAT = 'ttf'
+
+# Font backend: 'fontforge' (fontforge -script main.py) or 'fonttools', which
+# assembles the fonts with fontTools FontBuilder and runs under plain Python
+BACKEND = 'fontforge'
+
+# fonttools backend only: emit each frame and (digit, slot) outline once as a CFF
+# global subroutine; codepoint charstrings become a few moveto/callgsubr pairs
+CFF_SUBROUTINES = False
+
+# fonttools backend, composite mode only: also paint codepoint glyphs as COLRv1
+# layers over shared frame and digit glyphs (composite glyf glyphs as fallback)
+COLR_GLYPHS = False
+
+# fonttools backend only: embedded EBDT/EBLC bitmap strikes (pixels per em, at
+# least 13) that rasterizers blit instead of scaling the outlines at those sizes
+BITMAP_STRIKES = ()
+
+# BDF/PCF bitmap fonts for X11 terminals (bitmaps.py)
+BITMAP_FONT_SIZES = (13, 14, 16, 20, 26)
+BITMAP_DIR = 'dist/bitmap'
+
+# GPU texture atlases (atlas.py): pixel sizes, page width/height, output directory
+ATLAS_SIZES = (16, 32)
+ATLAS_PAGE_SIZE = 4096
+ATLAS_DIR = 'dist/atlas'
+
+# On-demand subset server (serve.py): built WOFF2 files are kept in memory and
+# on disk, least recently used first out once a cache exceeds its size
+SUBSET_SERVER_PORT = 8765
+SUBSET_MEMORY_CACHE_BYTES = 32 * 1024 * 1024
+SUBSET_DISK_CACHE_BYTES = 512 * 1024 * 1024
+SUBSET_CACHE_DIR = '.subset-cache'
+
+# Index of the font files written next to font.css: SHA-256, size, glyph count and
+# unicode-range per file. With hashed file names (main.py --hashed-names) each file
+# is renamed to UnicodeHexMono_<start>_<end>.<hash>.<ext>, so it can be served as immutable
+MANIFEST_FILE = 'manifest.json'
+HASHED_FILENAMES = False
+
+# Reproducible builds (main.py --reproducible): the head created/modified dates are
+# SOURCE_DATE_EPOCH if it is set, else this fixed date (the 1.0.0 release), so a
+# rebuild only changes the bytes of files whose glyphs changed. SOURCE_DATE_EPOCH
+# is honored in every build
+REPRODUCIBLE_BUILDS = False
+REPRODUCIBLE_EPOCH = 1766880000  # 2025-12-28T00:00:00Z
+
+# Fonts built from the codepoints of text files (corpus_font.py)
+CORPUS_DIR = 'dist/corpus'
+
+# Single-process builds: number of drawn chunks that may wait for their WOFF2
+# conversion (run in a background thread) while the next chunk is drawn; 0 disables
+PIPELINE_DEPTH = 1
+
+# Web subset profile (main.py --web-subset): small per-block or 256/1024-codepoint
+# files, so a page downloads only the scripts it uses
+WEB_SUBSET_DIR = 'dist/web'
+UNICODE_BLOCKS_FILE = 'Blocks.txt'  # https://www.unicode.org/Public/UCD/latest/ucd/Blocks.txt
+
+# Selective builds (main.py --range / --codepoints) are written here by default
+SELECTION_DIR = 'dist/selection'
+
+# Sharded builds (main.py --shard i/N): per-shard manifests, inside the output directory
+SHARD_MANIFEST_DIR = '.shards'
+
+# Resumable builds: files are written under a temporary name and renamed when
+# complete; finished chunks are recorded in a journal in the output directory
+PARTIAL_FILE_PREFIX = '.partial-'
+BUILD_JOURNAL_FILE = '.build-journal.jsonl'
+
+# Incremental builds: generated chunks are cached by a hash of their inputs
+BUILD_CACHE_DIR = '.build-cache'
@@ -0,0 +1,164 @@
+#!/usr/bin/env fontforge
+# -*- coding: utf-8 -*-
+"""
+Minimal UnicodeHexMono font for the codepoints that occur in some text.
+
+Streams text files (or stdin), collects the distinct codepoints and builds a
+font with only those glyphs through the regular generator path (the same
+glyphs.create_glyph code as every other build), plus its font.css. Small
+enough to bake into test reports instead of shipping the full dist/ set.
+
+- Files are memory-mapped and decoded one block at a time (scanner.py), so
+  multi-GB inputs are read in bounded memory
+- Codepoints seen so far are kept in a 0x110000-bit bitmap (136 KB), however
+  large the input; each block only adds its distinct characters
+- Bytes that are not valid UTF-8 count as U+FFFD, which browsers show for them
+- Surrogates and noncharacters cannot be in the font and are skipped
+
+Usage:
+    fontforge -script corpus_font.py report.txt logs/*.log [--output-dir DIR]
+    cat report.txt | python3 corpus_font.py --backend fonttools
+    python3 corpus_font.py report.txt --print-ranges > report.codepoints
+
+Output: <output dir>/UnicodeHexMono_<first>_<last>.(otf|woff2) and font.css
+(default dist/corpus/); font files of earlier runs in that directory are removed.
+"""
+
+import argparse
+import codecs
+import os
+import sys
+
+import config
+import css_generator
+import generator
+import scanner
+from codepoints import CodepointSet
+from main import parse_formats
+
+
+# Codepoints a decoder can produce: U+0000-10FFFF
+CODEPOINT_LIMIT = 0x110000
+
+
+class CodepointBitmap:
+    """Set of codepoints stored as one bit per codepoint (U+0000-10FFFF)."""
+
+    def __init__(self):
+        self.bits = bytearray(CODEPOINT_LIMIT // 8)
+
+    def __contains__(self, codepoint):
+        return bool(self.bits[codepoint >> 3] & (1 << (codepoint & 7)))
+
+    def update(self, text):
+        """Add the codepoints of a string."""
+        bits = self.bits
+        for char in set(text):
+            codepoint = ord(char)
+            bits[codepoint >> 3] |= 1 << (codepoint & 7)
+
+    def to_codepoint_set(self):
+        """Return the codepoints as a CodepointSet."""
+        ranges = []
+        for index, byte in enumerate(self.bits):
+            if not byte:
+                continue
+            for bit in range(8):
+                if byte & (1 << bit):
+                    codepoint = (index << 3) | bit
+                    if ranges and ranges[-1][1] == codepoint - 1:
+                        ranges[-1][1] = codepoint
+                    else:
+                        ranges.append([codepoint, codepoint])
+        return CodepointSet(ranges)
+
+
+def collect_codepoints(blocks, bitmap):
+    """
+    Add the codepoints of a stream of UTF-8 byte blocks to a bitmap.
+
+    Multi-byte sequences may be split across blocks; invalid bytes count as U+FFFD.
+
+    Returns:
+        Number of bytes read
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    size = 0
+    for block in blocks:
+        size += len(block)
+        bitmap.update(decoder.decode(block))
+    bitmap.update(decoder.decode(b'', final=True))
+    return size
+
+
+def remove_stale_fonts(output_dir, keep):
+    """Remove font files of earlier runs from output_dir (all but the paths in keep)."""
+    keep = {os.path.abspath(path) for path in keep}
+    for filename in sorted(os.listdir(output_dir)):
+        path = os.path.join(output_dir, filename)
+        if css_generator.parse_font_filename(filename) and os.path.abspath(path) not in keep:
+            os.remove(path)
+            print(f"✓ Removed {filename} (earlier run)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Build a UnicodeHexMono font with only the codepoints found in text files."
+    )
+    parser.add_argument("files", nargs='*', metavar="FILE",
+                        help="UTF-8 text files to read ('-' or none for stdin)")
+    parser.add_argument("--output-dir", default=config.CORPUS_DIR, metavar="DIR",
+                        help=f"directory for the font files and font.css (default: {config.CORPUS_DIR})")
+    parser.add_argument("--formats", type=parse_formats, metavar="LIST",
+                        help="files to write: otf (or ttf), woff2 (default: both)")
+    parser.add_argument("--backend", choices=generator.BACKENDS, default=config.BACKEND,
+                        help=f"font backend (default: {config.BACKEND})")
+    parser.add_argument("--composite", action="store_true", default=config.COMPOSITE_GLYPHS,
+                        help="build glyphs from shared frame and digit components (TrueType)")
+    parser.add_argument("--print-ranges", action="store_true",
+                        help="print the collected codepoint ranges (for main.py --codepoints) "
+                             "instead of building a font")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    bitmap = CodepointBitmap()
+    for path in args.files or ['-']:
+        if path == '-':
+            size = collect_codepoints(scanner.iter_stream_blocks(sys.stdin.buffer), bitmap)
+            path = '<stdin>'
+        else:
+            size = collect_codepoints(scanner.iter_file_blocks(path), bitmap)
+        print(f"✓ Read {path} ({size:,} bytes)", file=sys.stderr)
+
+    found = bitmap.to_codepoint_set()
+    codepoints = found.intersection(CodepointSet.valid_codepoints())
+    skipped = len(found) - len(codepoints)
+    print(f"✓ {len(codepoints):,} distinct codepoints in {len(codepoints.ranges):,} range(s)"
+          + (f" ({skipped:,} surrogates/noncharacters skipped)" if skipped else ""), file=sys.stderr)
+
+    if args.print_ranges:
+        print(css_generator.format_unicode_range(codepoints).replace(', ', '\n'))
+        return
+    if not codepoints:
+        print("ERROR: no codepoints to build")
+        sys.exit(1)
+
+    font_files = generator.generate_multi_file(
+        composite=args.composite,
+        cache_dir=None,
+        backend=args.backend,
+        codepoints=codepoints,
+        output_dir=args.output_dir,
+        formats=args.formats,
+    )
+    if not font_files:
+        sys.exit(1)
+    remove_stale_fonts(args.output_dir, font_files)
+    css_generator.generate_css(args.output_dir)
+
+
+if __name__ == "__main__":
+    main()
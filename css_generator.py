@@ -4,22 +4,55 @@
 CSS generation module for UnicodeHexMono font.
 
 This module scans the dist/ folder for generated .otf font files and creates
-a production-ready font.css file with @font-face declarations for npm distribution.
+a production-ready font.css file with @font-face declarations for npm distribution,
+plus manifest.json with the SHA-256, size, glyph count and unicode-range of every
+file (font.css is generated from it).
 
 The CSS follows modern best practices:
 - Uses font-display: swap for better performance
-- Includes proper unicode-range selectors for optimized loading
+- Includes exact unicode-range lists (read from each font's cmap) for optimized loading
 - Uses relative paths compatible with npm packages
 - Includes comprehensive documentation comments
+- Optionally content-hashed file names (UnicodeHexMono_<start>_<end>.<hash>.otf),
+  which never change content and can be cached for a year as immutable
 
 Usage:
     import css_generator
     css_generator.generate_css()
 """
 
+import base64
+import hashlib
+import json
 import os
 import re
 import config
+from build_journal import atomic_output, is_partial_file
+from codepoints import CodepointSet
+
+
+# Hex digits of the SHA-256 in hashed file names
+FILENAME_HASH_LENGTH = 12
+
+# Pattern: UnicodeHexMono_<start>_<end>[.<hash>].(otf|ttf|woff2)
+FONT_FILENAME_PATTERN = re.compile(
+    r'UnicodeHexMono_([0-9A-F]{5,6})_([0-9A-F]{5,6})'
+    r'(?:\.([0-9a-f]{%d}))?\.(otf|ttf|woff2)' % FILENAME_HASH_LENGTH,
+    re.IGNORECASE,
+)
+
+# Bumped when the layout of manifest.json changes incompatibly
+MANIFEST_FORMAT = 1
+
+# Order of the formats in @font-face src lists and in manifest.json
+FORMAT_ORDER = ('woff2', 'otf', 'ttf')
+
+# Format names in the font.css header
+FORMAT_DESCRIPTIONS = {
+    'woff2': 'WOFF2 (web optimized)',
+    'otf': 'OTF (OpenType fallback)',
+    'ttf': 'TTF (TrueType fallback)',
+}
 
 
 def parse_font_filename(filename):
@@ -27,20 +60,19 @@ def parse_font_filename(filename):
     Extract Unicode range and format from font filename.
     
     Args:
-        filename: Font filename (e.g., 'UnicodeHexMono_00000_0F25F.otf' or '.woff2')
+        filename: Font filename (e.g., 'UnicodeHexMono_00000_0F25F.otf', '.ttf' or '.woff2',
+                  or a hashed name like 'UnicodeHexMono_00000_0F25F.3f2a9c01b7de.woff2')
     
     Returns:
         Tuple of (start_codepoint, end_codepoint, start_hex, end_hex, format) or None if invalid
         Example: (0, 0x0F25F, '00000', '0F25F', 'otf')
     """
-    # Pattern: UnicodeHexMono_<start>_<end>.(otf|woff2)
-    pattern = r'UnicodeHexMono_([0-9A-F]{5,6})_([0-9A-F]{5,6})\.(otf|woff2)'
-    match = re.match(pattern, filename, re.IGNORECASE)
+    match = FONT_FILENAME_PATTERN.match(filename)
     
     if match:
         start_hex = match.group(1).upper()
         end_hex = match.group(2).upper()
-        file_format = match.group(3).lower()
+        file_format = match.group(4).lower()
         start_cp = int(start_hex, 16)
         end_cp = int(end_hex, 16)
         return (start_cp, end_cp, start_hex, end_hex, file_format)
@@ -48,17 +80,279 @@ def parse_font_filename(filename):
     return None
 
 
-def generate_css_content(font_ranges):
+def read_cmap_codepoints(path):
     """
-    Generate CSS content with @font-face declarations.
+    Read the codepoints a font file maps in its cmap table.
+    
+    Args:
+        path: Path to an .otf, .ttf or .woff2 file
+    
+    Returns:
+        CodepointSet, or None if fonttools is not installed
+    """
+    try:
+        from fontTools.ttLib import TTFont
+    except ImportError:
+        return None
+    
+    # lazy=True parses only the tables that are accessed (here: cmap)
+    font = TTFont(path, lazy=True)
+    try:
+        return CodepointSet((cp, cp) for cp in font['cmap'].getBestCmap())
+    finally:
+        font.close()
+
+
+def get_file_codepoints(dist_dir, start_cp, end_cp, formats):
+    """
+    Return the codepoints a font file pair actually contains.
+    
+    Reads the cmap of the OTF/TTF file (cheaper to parse than WOFF2). Without
+    fonttools, falls back to the valid codepoints in the filename range, which
+    is what the generator planned for that file.
+    
+    Args:
+        dist_dir: Directory of the font files
+        start_cp, end_cp: Range from the filename
+        formats: Dict of format -> filename
+    
+    Returns:
+        CodepointSet
+    """
+    for file_format in ('otf', 'ttf', 'woff2'):
+        if file_format in formats:
+            codepoints = read_cmap_codepoints(os.path.join(dist_dir, formats[file_format]))
+            if codepoints is not None:
+                return codepoints
+            break
+    
+    return CodepointSet.valid_codepoints(start_cp, end_cp)
+
+
+def format_unicode_range(codepoints):
+    """
+    Format a codepoint set as a CSS unicode-range value.
     
     Args:
+        codepoints: CodepointSet
+    
+    Returns:
+        Comma-separated list of exact subranges, e.g. 'U+0-D7FF, U+E000-FDCF, U+FDF0-FFFD'
+    """
+    parts = []
+    for start, end in codepoints.ranges:
+        parts.append(f"U+{start:X}" if start == end else f"U+{start:X}-{end:X}")
+    return ", ".join(parts)
+
+
+def read_glyph_count(path):
+    """
+    Read the number of glyphs of a font file (maxp table).
+    
+    Returns:
+        Glyph count, or None if fonttools is not installed
+    """
+    try:
+        from fontTools.ttLib import TTFont
+    except ImportError:
+        return None
+    
+    font = TTFont(path, lazy=True)
+    try:
+        return font['maxp'].numGlyphs
+    finally:
+        font.close()
+
+
+def hash_file(path):
+    """
+    Compute the SHA-256 digest and size of a file.
+    
+    Returns:
+        Tuple of (digest bytes, size in bytes)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+            size += len(block)
+    return digest.digest(), size
+
+
+# ============================================================================
+# Hashed File Names
+# ============================================================================
+
+def is_hashed_filename(filename):
+    """Return True for a range file name with a content hash."""
+    match = FONT_FILENAME_PATTERN.match(filename)
+    return bool(match and match.group(3))
+
+
+def get_hashed_filename(filename, digest):
+    """
+    Insert a content hash into a font file name.
+    
+    Example: ('UnicodeHexMono_00000_0F25F.woff2', digest)
+             -> 'UnicodeHexMono_00000_0F25F.3f2a9c01b7de.woff2'
+    """
+    stem, extension = filename.rsplit('.', 1)
+    return f"{stem}.{digest.hex()[:FILENAME_HASH_LENGTH]}.{extension}"
+
+
+def hash_font_filenames(dist_dir):
+    """
+    Rename the font files a build wrote to content-hashed names.
+    
+    The generator always writes UnicodeHexMono_<start>_<end>.<ext>; each such file
+    is renamed to UnicodeHexMono_<start>_<end>.<hash>.<ext>, and hashed files of
+    the same range and format from earlier builds are removed (a file with the
+    same hash is the same content and is simply replaced).
+    
+    Only call this after a build has finished: an interrupted build resumes from
+    the plain names recorded in its journal.
+    
+    Args:
+        dist_dir: Directory with the font files
+    
+    Returns:
+        Dict of old filename -> hashed filename
+    """
+    filenames = sorted(os.listdir(dist_dir))
+    renamed = {}
+    for filename in filenames:
+        parsed = parse_font_filename(filename)
+        if not parsed or is_partial_file(filename) or is_hashed_filename(filename):
+            continue
+        
+        digest, _ = hash_file(os.path.join(dist_dir, filename))
+        hashed = get_hashed_filename(filename, digest)
+        for earlier in filenames:
+            if (earlier != hashed and is_hashed_filename(earlier)
+                    and parse_font_filename(earlier) == parsed):
+                os.remove(os.path.join(dist_dir, earlier))
+                print(f"  Removed: {earlier} (superseded by {hashed})")
+        os.replace(os.path.join(dist_dir, filename), os.path.join(dist_dir, hashed))
+        renamed[filename] = hashed
+    return renamed
+
+
+# ============================================================================
+# Manifest
+# ============================================================================
+
+def build_manifest(dist_dir, font_ranges):
+    """
+    Describe the font files of a directory for manifest.json.
+    
+    Holds no timestamps or paths, so the same files always give the same manifest.
+    
+    Args:
+        dist_dir: Directory of the font files
         font_ranges: List of tuples (start_cp, end_cp, start_hex, end_hex, formats_dict)
                     where formats_dict = {'otf': 'filename.otf', 'woff2': 'filename.woff2'}
+                    ('ttf' instead of 'otf' for composite builds)
+    
+    Returns:
+        Dict with 'format', 'family', 'version' and 'fonts': one entry per range with
+        its first/last codepoint, codepoint and glyph count, CSS unicode-range and,
+        per format, the file name, size, SHA-256 and subresource integrity value
+    """
+    fonts = []
+    for start_cp, end_cp, start_hex, end_hex, formats in font_ranges:
+        # Only codepoints the file can serve, so browsers never download it for
+        # surrogates, noncharacters or anything else it does not contain
+        codepoints = get_file_codepoints(dist_dir, start_cp, end_cp, formats)
+        
+        glyphs = None
+        files = {}
+        for file_format in FORMAT_ORDER:
+            if file_format not in formats:
+                continue
+            path = os.path.join(dist_dir, formats[file_format])
+            digest, size = hash_file(path)
+            if glyphs is None and file_format != 'woff2':
+                glyphs = read_glyph_count(path)
+            files[file_format] = {
+                'file': formats[file_format],
+                'bytes': size,
+                'sha256': digest.hex(),
+                'integrity': 'sha256-' + base64.b64encode(digest).decode('ascii'),
+            }
+        if glyphs is None:
+            glyphs = read_glyph_count(os.path.join(dist_dir, next(iter(files.values()))['file']))
+        
+        fonts.append({
+            'start': f"U+{start_hex}",
+            'end': f"U+{end_hex}",
+            'codepoints': len(codepoints),
+            'glyphs': glyphs,
+            'unicode_range': format_unicode_range(codepoints),
+            'files': files,
+        })
+    
+    return {
+        'format': MANIFEST_FORMAT,
+        'family': config.FONT_FAMILY,
+        'version': config.FONT_VERSION,
+        'fonts': fonts,
+    }
+
+
+def write_manifest_file(output_path, manifest):
+    """Write manifest.json (sorted keys, so identical builds give identical files)."""
+    with atomic_output(output_path) as tmp_path:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+
+def load_manifest(path):
+    """
+    Read a manifest.json written by generate_css.
+    
+    Raises:
+        ValueError: If the file is not a manifest of a supported format
+    """
+    with open(path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    if not isinstance(manifest, dict) or manifest.get('format') != MANIFEST_FORMAT:
+        raise ValueError(f"not a format {MANIFEST_FORMAT} manifest")
+    return manifest
+
+
+# ============================================================================
+# CSS
+# ============================================================================
+
+def get_package_dir(dist_dir):
+    """
+    Return the npm package path of an output directory for the usage comment.
+    
+    Only relative directories inside dist/ (dist, dist/web, ...) are part of the
+    package; anything else (e.g. --output-dir /tmp/x) would leak a local path
+    into the shipped CSS, so it falls back to 'dist'.
+    """
+    path = os.path.normpath(dist_dir).replace(os.sep, '/')
+    if os.path.isabs(dist_dir) or not (path == 'dist' or path.startswith('dist/')):
+        return 'dist'
+    return path
+
+
+def generate_css_content(manifest, dist_dir='dist'):
+    """
+    Generate CSS content with @font-face declarations.
+    
+    Args:
+        manifest: Result of build_manifest (file names and exact unicode-range lists)
+        dist_dir: Directory of the font files, shown in the usage comment if it is
+                  inside the package (see get_package_dir)
     
     Returns:
         String containing the complete CSS content
     """
+    font_ranges = manifest['fonts']
     css_lines = []
     
     # Header comment
@@ -70,23 +364,26 @@ def generate_css_content(font_ranges):
     css_lines.append(" * Each glyph displays its hexadecimal codepoint in a rounded square")
     css_lines.append(" *")
     css_lines.append(" * Usage:")
-    css_lines.append(" *   @import 'unicode-hex-mono/dist/font.css';")
+    css_lines.append(f" *   @import 'unicode-hex-mono/{get_package_dir(dist_dir)}/font.css';")
     css_lines.append(" *   font-family: 'UnicodeHexMono', monospace;")
     css_lines.append(" *")
     css_lines.append(f" * Total font ranges: {len(font_ranges)}")
-    css_lines.append(" * Formats: WOFF2 (web optimized) + OTF (OpenType fallback)")
+    found_formats = {file_format for font in font_ranges for file_format in font['files']}
+    css_lines.append(f" * Formats: {' + '.join(FORMAT_DESCRIPTIONS[fmt] for fmt in FORMAT_ORDER if fmt in found_formats)}")
     css_lines.append(" * Browser optimization: Only needed files are loaded via unicode-range")
     css_lines.append(" */")
     css_lines.append("")
     
     # Generate @font-face for each range
-    for idx, (start_cp, end_cp, start_hex, end_hex, formats) in enumerate(font_ranges):
+    for idx, font in enumerate(font_ranges):
         # Add separator comment between font-face declarations
         if idx > 0:
             css_lines.append("")
         
+        formats = {file_format: entry['file'] for file_format, entry in font['files'].items()}
+        
         # Comment showing which Unicode range this covers
-        css_lines.append(f"/* Unicode Range: U+{start_hex} - U+{end_hex} ({end_cp - start_cp + 1:,} codepoints) */")
+        css_lines.append(f"/* Unicode Range: {font['start']} - {font['end']} ({font['codepoints']:,} codepoints) */")
         
         # @font-face declaration
         css_lines.append("@font-face {")
@@ -98,6 +395,8 @@ def generate_css_content(font_ranges):
             src_parts.append(f"url('./{formats['woff2']}') format('woff2')")
         if 'otf' in formats:
             src_parts.append(f"url('./{formats['otf']}') format('opentype')")
+        if 'ttf' in formats:
+            src_parts.append(f"url('./{formats['ttf']}') format('truetype')")
         
         if len(src_parts) > 1:
             css_lines.append(f"  src: {src_parts[0]},")
@@ -107,7 +406,7 @@ def generate_css_content(font_ranges):
         else:
             css_lines.append(f"  src: {src_parts[0]};")
         
-        css_lines.append(f"  unicode-range: U+{start_hex}-{end_hex};")
+        css_lines.append(f"  unicode-range: {font['unicode_range']};")
         css_lines.append("  font-weight: normal;")
         css_lines.append("  font-style: normal;")
         css_lines.append("  font-display: swap;")
@@ -124,19 +423,29 @@ def write_css_file(output_path, content):
         output_path: Path to output CSS file
         content: CSS content string
     """
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(content)
+    with atomic_output(output_path) as tmp_path:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
 
 
-def generate_css():
+def generate_css(dist_dir='dist', hashed_names=None):
     """
-    Main function to generate font.css from font files in dist/ folder.
+    Main function to generate font.css and manifest.json from font files in dist/ folder.
+    
+    Scans the dist/ directory for .otf, .ttf and .woff2 files, extracts their Unicode ranges,
+    groups by range, writes manifest.json and generates a complete font.css file with
+    @font-face declarations from it.
     
-    Scans the dist/ directory for .otf and .woff2 files, extracts their Unicode ranges,
-    groups by range, and generates a complete font.css file with @font-face declarations.
+    Args:
+        dist_dir: Directory with the font files; font.css is written there
+                  (e.g. config.WEB_SUBSET_DIR for the web subset profile)
+        hashed_names: First rename the files to content-hashed names
+                      (None = config.HASHED_FILENAMES)
     """
-    dist_dir = 'dist'
+    if hashed_names is None:
+        hashed_names = config.HASHED_FILENAMES
     output_path = os.path.join(dist_dir, 'font.css')
+    manifest_path = os.path.join(dist_dir, config.MANIFEST_FILE)
     
     # Check if dist directory exists
     if not os.path.exists(dist_dir):
@@ -144,12 +453,24 @@ def generate_css():
         print("Please run font generation first: fontforge -script main.py")
         return
     
-    # Scan for font files (.otf and .woff2)
+    if hashed_names:
+        print(f"\nRenaming font files in {dist_dir}/ to content-hashed names...")
+        renamed = hash_font_filenames(dist_dir)
+        for filename, hashed in renamed.items():
+            print(f"  Renamed: {filename} -> {hashed}")
+        print(f"✓ {len(renamed)} file(s) renamed")
+    
+    # Scan for font files (.otf/.ttf and .woff2)
     print(f"\nScanning {dist_dir}/ for font files...")
     font_data = {}  # Key: (start_cp, end_cp, start_hex, end_hex), Value: {format: filename}
     
-    for filename in os.listdir(dist_dir):
-        if not (filename.endswith('.otf') or filename.endswith('.woff2')):
+    for filename in sorted(os.listdir(dist_dir)):
+        if not filename.endswith(('.otf', '.ttf', '.woff2')):
+            continue
+        
+        # Skip files an interrupted build was still writing
+        if is_partial_file(filename):
+            print(f"  Skipping: {filename} (partial file of an unfinished build)")
             continue
         
         # Skip test fonts
@@ -164,6 +485,15 @@ def generate_css():
             if range_key not in font_data:
                 font_data[range_key] = {}
             
+            # A plain name is the output of the latest build; a hashed file of the
+            # same range is left over from an earlier --hashed-names build
+            existing = font_data[range_key].get(file_format)
+            if existing and not is_hashed_filename(existing):
+                print(f"  Skipping: {filename} (superseded by {existing})")
+                continue
+            if existing:
+                print(f"  Skipping: {existing} (superseded by {filename})")
+            
             font_data[range_key][file_format] = filename
             print(f"  Found: {filename} (U+{start_hex} - U+{end_hex}) [{file_format.upper()}]")
         else:
@@ -171,7 +501,7 @@ def generate_css():
     
     if not font_data:
         print(f"\nERROR: No valid font files found in {dist_dir}/")
-        print("Font files should follow pattern: UnicodeHexMono_<start>_<end>.(otf|woff2)")
+        print("Font files should follow pattern: UnicodeHexMono_<start>_<end>.(otf|ttf|woff2)")
         return
     
     # Convert to sorted list of ranges with formats
@@ -186,9 +516,14 @@ def generate_css():
     total_files = sum(len(formats) for _, _, _, _, formats in font_ranges)
     print(f"Total font files: {total_files}")
     
+    # Hash the files and write the manifest
+    print(f"\nGenerating manifest...")
+    manifest = build_manifest(dist_dir, font_ranges)
+    write_manifest_file(manifest_path, manifest)
+    
     # Generate CSS
     print(f"\nGenerating CSS...")
-    css_content = generate_css_content(font_ranges)
+    css_content = generate_css_content(manifest, dist_dir)
     
     # Write to file
     write_css_file(output_path, css_content)
@@ -196,9 +531,11 @@ def generate_css():
     # Summary
     print(f"\n{'=' * 70}")
     print(f"✓ Generated: {output_path}")
+    print(f"✓ Generated: {manifest_path}")
     print(f"  Unicode ranges: {len(font_ranges)}")
     print(f"  Total font files: {total_files}")
-    print(f"  Formats: OTF + WOFF2")
+    found_formats = sorted({fmt for _, _, _, _, formats in font_ranges for fmt in formats})
+    print(f"  Formats: {' + '.join(fmt.upper() for fmt in found_formats)}")
     print(f"  CSS size: {len(css_content):,} bytes ({len(css_content) / 1024:.1f} KB)")
     print(f"  @font-face declarations: {len(font_ranges)}")
     print(f"{'=' * 70}")
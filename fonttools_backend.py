@@ -0,0 +1,691 @@
+"""
+FontForge-free font backend for UnicodeHexMono.
+
+Builds font files directly with fontTools instead of FontForge:
+- Glyph outlines are drawn by the same glyphs/utils drawing code, into a
+  T2CharStringPen (CFF outlines) or a TTGlyphPen (composite TrueType outlines)
+- All tables are assembled in memory with FontBuilder
+- OTF/TTF and WOFF2 are serialized from that one in-memory font, so there is no
+  write-then-reread round trip for the WOFF2 conversion
+- Optionally (CFF_SUBROUTINES), every frame and (digit, slot) outline becomes a
+  CFF global subroutine and codepoint charstrings are just moveto + callgsubr
+- Optionally (COLR_GLYPHS), codepoint glyphs are COLRv1 paint layers over shared
+  frame and digit glyphs, with composite glyf glyphs as monochrome fallback
+- Optionally (BITMAP_STRIKES), pixel-exact EBDT/EBLC strikes from bitmaps.py are
+  embedded for small sizes
+
+Runs under plain CPython (python3 main.py --backend fonttools); only fonttools
+and brotli are required.
+"""
+
+import io
+
+from fontTools.cffLib.specializer import commandsToProgram, specializeCommands
+from fontTools.colorLib.builder import buildClipList
+from fontTools.fontBuilder import FontBuilder
+from fontTools.misc.psCharStrings import T2CharString
+from fontTools.misc.roundTools import otRound
+from fontTools.pens.boundsPen import ControlBoundsPen
+from fontTools.pens.cu2quPen import Cu2QuPen
+from fontTools.pens.t2CharStringPen import T2CharStringPen
+from fontTools.pens.ttGlyphPen import TTGlyphPen
+from fontTools.ttLib import newTable, woff2
+from fontTools.ttLib.tables.DefaultTable import DefaultTable
+from fontTools.ttLib.tables import otTables
+from fontTools.ttLib.tables.O_S_2f_2 import Panose
+from fontTools.ttLib.tables.otTables import PaintFormat
+
+import bitmaps
+import config
+import glyphs
+import reproducible
+import utils
+
+
+# Same PANOSE classification FontForge gets in generator.create_font_object
+PANOSE = (2, 11, 6, 9, 3, 0, 0, 2, 0, 4)  # Monospaced
+PANOSE_FIELDS = (
+    'bFamilyType', 'bSerifStyle', 'bWeight', 'bProportion', 'bContrast',
+    'bStrokeVariation', 'bArmStyle', 'bLetterForm', 'bMidline', 'bXHeight',
+)
+
+# Maximum distance (font units) between cubic curves and their quadratic approximation
+CU2QU_MAX_ERR = 1.0
+
+# CPAL palette index meaning "the current text color"
+FOREGROUND_PALETTE_INDEX = 0xFFFF
+
+
+def glyph_name(codepoint):
+    """Return the glyph name FontForge uses for a codepoint (uni0041, u1F600)."""
+    if codepoint <= 0xFFFF:
+        return f"uni{codepoint:04X}"
+    return f"u{codepoint:04X}"
+
+
+class BoundsTrackingPen:
+    """
+    Pen filter that forwards drawing calls and tracks the control-point bounds.
+    
+    Every glyph here has its extremes on on-curve points (boxes, rounded corners,
+    cells), so control bounds are exact. Tracking them while drawing avoids
+    fontTools re-executing each charstring to recompute bounds when saving.
+    """
+    
+    def __init__(self, pen):
+        self.pen = pen
+        self.bounds = None
+    
+    def _add(self, points):
+        xs = [x for x, _ in points]
+        ys = [y for _, y in points]
+        if self.bounds is None:
+            self.bounds = (min(xs), min(ys), max(xs), max(ys))
+        else:
+            x_min, y_min, x_max, y_max = self.bounds
+            self.bounds = (min(x_min, *xs), min(y_min, *ys), max(x_max, *xs), max(y_max, *ys))
+    
+    def moveTo(self, point):
+        self._add((point,))
+        self.pen.moveTo(point)
+    
+    def lineTo(self, point):
+        self._add((point,))
+        self.pen.lineTo(point)
+    
+    def curveTo(self, *points):
+        self._add(points)
+        self.pen.curveTo(*points)
+    
+    def closePath(self):
+        self.pen.closePath()
+
+
+def _draw_cff(draw, width=config.GLYPH_WIDTH):
+    """Draw an outline into a Type 2 charstring; returns (charstring, bounds)."""
+    pen = T2CharStringPen(width, None)
+    tracker = BoundsTrackingPen(pen)
+    draw(tracker)
+    return pen.getCharString(), tracker.bounds
+
+
+def _draw_truetype(draw):
+    """Draw an outline into a TrueType glyph, converting cubics to quadratics."""
+    pen = TTGlyphPen(None)
+    # Outer contours are drawn counter-clockwise; TrueType wants them clockwise
+    draw(Cu2QuPen(pen, CU2QU_MAX_ERR, reverse_direction=True))
+    return pen.glyph()
+
+
+def _build_cff_glyphs(codepoints):
+    """Return (glyph_order, charstrings, bounds) for a CFF font."""
+    glyph_order = ['.notdef']
+    charstrings = {}
+    bounds = {}
+    charstrings['.notdef'], bounds['.notdef'] = _draw_cff(glyphs.draw_notdef_outline)
+
+    for cp in codepoints:
+        name = glyph_name(cp)
+        glyph_order.append(name)
+        charstrings[name], bounds[name] = _draw_cff(
+            lambda pen, cp=cp: glyphs.draw_glyph_outline(pen, cp)
+        )
+
+    return glyph_order, charstrings, bounds
+
+
+# ============================================================================
+# CFF Subroutines
+# ============================================================================
+
+# Operand stack limit of Type 2 charstrings, used by the command specializer
+T2_MAX_STACK = 48
+
+
+def _subroutine_bias(count):
+    """Return the Type 2 subroutine number bias for a subroutine INDEX of `count` entries."""
+    if count < 1240:
+        return 107
+    if count < 33900:
+        return 1131
+    return 32768
+
+
+class PartRecorderPen:
+    """
+    Pen that records an outline as position-independent Type 2 commands.
+    
+    Points are rounded exactly like T2CharStringPen rounds them, so outlines
+    match the plain CFF build. The first moveto is not recorded: the calling
+    glyph moves to `first` itself, then calls the part as a subroutine, which
+    leaves the current point at `last`.
+    """
+    
+    def __init__(self):
+        self.commands = []
+        self.first = None
+        self.last = None
+    
+    def _delta(self, point):
+        point = (otRound(point[0]), otRound(point[1]))
+        previous = self.last
+        self.last = point
+        if previous is None:
+            self.first = point
+            return None
+        return [point[0] - previous[0], point[1] - previous[1]]
+    
+    def moveTo(self, point):
+        delta = self._delta(point)
+        if delta is not None:
+            self.commands.append(('rmoveto', delta))
+    
+    def lineTo(self, point):
+        self.commands.append(('rlineto', self._delta(point)))
+    
+    def curveTo(self, *points):
+        deltas = []
+        for point in points:
+            deltas.extend(self._delta(point))
+        self.commands.append(('rrcurveto', deltas))
+    
+    def closePath(self):
+        pass  # Type 2 contours are closed implicitly
+
+
+def _record_part(contours):
+    """
+    Record a frame or digit outline as a subroutine candidate.
+    
+    Returns:
+        Tuple of (program, first point, last point, control bounds); program is
+        a tuple, so parts with the same shape share one subroutine wherever they
+        are placed
+    """
+    pen = PartRecorderPen()
+    tracker = BoundsTrackingPen(pen)
+    glyphs.replay_contours(tracker, contours)
+    commands = specializeCommands(pen.commands, generalizeFirst=False, maxstack=T2_MAX_STACK)
+    return tuple(commandsToProgram(commands)) + ('return',), pen.first, pen.last, tracker.bounds
+
+
+def _moveto_program(dx, dy):
+    """Return the shortest Type 2 moveto for a relative move."""
+    if dx == 0:
+        return [dy, 'vmoveto']
+    if dy == 0:
+        return [dx, 'hmoveto']
+    return [dx, dy, 'rmoveto']
+
+
+def _union_bounds(boxes):
+    """Return the bounding box of several (x_min, y_min, x_max, y_max) boxes."""
+    return (min(box[0] for box in boxes), min(box[1] for box in boxes),
+            max(box[2] for box in boxes), max(box[3] for box in boxes))
+
+
+def _build_cff_glyphs_subroutinized(codepoints):
+    """
+    Return (glyph_order, charstrings, bounds, global_subrs) for a CFF font whose
+    digit layout glyphs are built from global subroutines.
+    
+    Every frame style and every (digit, slot) outline from the compiled layout
+    templates is recorded once. Each codepoint glyph is then a sequence of
+    "moveto to the part's first point, callgsubr" pairs. Widths are omitted from
+    all charstrings (defaultWidthX is GLYPH_WIDTH). The most used subroutines get
+    the lowest numbers, which encode in a single byte.
+    """
+    parts = {}        # id(contours) -> recorded part
+    usage = {}        # program -> number of glyphs calling it
+    glyph_parts = {}  # glyph name -> list of parts, or None for plain outlines
+    
+    glyph_order = ['.notdef']
+    charstrings = {}
+    bounds = {}
+    charstrings['.notdef'], bounds['.notdef'] = _draw_cff(glyphs.draw_notdef_outline, width=None)
+    
+    for cp in codepoints:
+        name = glyph_name(cp)
+        glyph_order.append(name)
+        layout = glyphs.get_layout(cp)
+        
+        if layout not in glyphs.DIGIT_LAYOUTS:
+            glyph_parts[name] = None
+            charstrings[name], bounds[name] = _draw_cff(
+                lambda pen, cp=cp: glyphs.draw_glyph_outline(pen, cp), width=None
+            )
+            continue
+        
+        template = glyphs.compile_layout_template(layout)
+        contour_lists = [template['frame']]
+        for slot_digits, digit in zip(template['digits'], glyphs.get_layout_digits(layout, cp)):
+            contour_lists.append(slot_digits[digit])
+        
+        recorded = []
+        for contours in contour_lists:
+            part = parts.get(id(contours))
+            if part is None:
+                part = parts[id(contours)] = _record_part(contours)
+            recorded.append(part)
+            usage[part[0]] = usage.get(part[0], 0) + 1
+        glyph_parts[name] = recorded
+    
+    # Number subroutines by descending use
+    subr_programs = sorted(usage, key=lambda program: -usage[program])
+    bias = _subroutine_bias(len(subr_programs))
+    subr_operand = {program: index - bias for index, program in enumerate(subr_programs)}
+    
+    for name, recorded in glyph_parts.items():
+        if recorded is None:
+            continue
+        program = []
+        current = (0, 0)
+        for part_program, first, last, _ in recorded:
+            program.extend(_moveto_program(first[0] - current[0], first[1] - current[1]))
+            program.extend((subr_operand[part_program], 'callgsubr'))
+            current = last
+        program.append('endchar')
+        charstrings[name] = T2CharString(program=program)
+        bounds[name] = _union_bounds([part[3] for part in recorded])
+    
+    return glyph_order, charstrings, bounds, [list(program) for program in subr_programs]
+
+
+def _set_font_bounds(font, bounds):
+    """
+    Fill in head/hhea/CFF bounding boxes from per-glyph bounds.
+    
+    The font is saved with recalcBBoxes disabled, so these values must be exact.
+    """
+    boxes = [box for box in bounds.values() if box is not None]
+    x_min = otRound(min(box[0] for box in boxes))
+    y_min = otRound(min(box[1] for box in boxes))
+    x_max = otRound(max(box[2] for box in boxes))
+    y_max = otRound(max(box[3] for box in boxes))
+
+    head = font['head']
+    head.xMin, head.yMin, head.xMax, head.yMax = x_min, y_min, x_max, y_max
+
+    # Monospaced: every advance is GLYPH_WIDTH
+    hhea = font['hhea']
+    hhea.advanceWidthMax = config.GLYPH_WIDTH
+    hhea.minLeftSideBearing = min(otRound(box[0]) for box in boxes)
+    hhea.minRightSideBearing = min(config.GLYPH_WIDTH - otRound(box[2]) for box in boxes)
+    hhea.xMaxExtent = max(otRound(box[2]) for box in boxes)
+
+    font['CFF '].cff.topDictIndex[0].FontBBox = [x_min, y_min, x_max, y_max]
+    font.recalcBBoxes = False
+
+
+def _build_composite_glyphs(codepoints):
+    """
+    Return (glyph_order, glyf_glyphs) for a TrueType font with composite glyphs.
+
+    Codepoint glyphs reference the shared components from
+    glyphs.get_composite_components(); each component is drawn only once.
+    """
+    glyph_order = ['.notdef']
+    glyf_glyphs = {'.notdef': _draw_truetype(glyphs.draw_notdef_outline)}
+    component_order = []
+
+    for cp in codepoints:
+        name = glyph_name(cp)
+        components = glyphs.get_composite_components(cp)
+
+        if components is None:
+            glyf_glyphs[name] = _draw_truetype(lambda pen, cp=cp: glyphs.draw_glyph_outline(pen, cp))
+        else:
+            # The pen checks component names against the glyphs built so far
+            pen = TTGlyphPen(glyf_glyphs)
+            for component_name, draw in components:
+                if component_name not in glyf_glyphs:
+                    glyf_glyphs[component_name] = _draw_truetype(draw)
+                    component_order.append(component_name)
+                pen.addComponent(component_name, (1, 0, 0, 1, 0, 0))
+            glyf_glyphs[name] = pen.glyph()
+
+        glyph_order.append(name)
+
+    # Components go right after .notdef, like unencoded glyphs in FontForge output
+    return ['.notdef'] + component_order + glyph_order[1:], glyf_glyphs
+
+
+# ============================================================================
+# COLRv1 Glyphs
+# ============================================================================
+
+def get_colr_digit_glyph_name(size, digit):
+    """Return the name of the shared glyph drawing a digit of a given size at the origin."""
+    return f"hexdigit.{size}.{digit}"
+
+
+def _get_colr_layers(codepoint):
+    """
+    Return the layers a digit layout glyph is painted from.
+    
+    Returns:
+        List of (glyph_name, draw, dx, dy) tuples, frame first, where draw is a
+        callable taking a pen that draws the shared glyph and (dx, dy) is the
+        integer offset it is placed at. None for layouts without digits.
+    
+    Digit glyphs are drawn at the origin, one per (size, digit), and placed at
+    their slot origin rounded to whole units (PaintTranslate and glyf component
+    offsets are integers), so a digit can sit up to half a unit away from where
+    the outline build puts it.
+    """
+    layout = glyphs.get_layout(codepoint)
+    if layout not in glyphs.DIGIT_LAYOUTS:
+        return None
+    
+    layers = [(glyphs.get_frame_component_name(layout), lambda pen: glyphs.draw_frame(pen, layout), 0, 0)]
+    for (x, y, size), digit in zip(glyphs.get_digit_slots(layout), glyphs.get_layout_digits(layout, codepoint)):
+        layers.append((
+            get_colr_digit_glyph_name(size, digit),
+            lambda pen, d=digit, size=size: utils.draw_hex_digit(pen, d, 0, 0, size),
+            otRound(x),
+            otRound(y),
+        ))
+    return layers
+
+
+def _build_colr_glyphs(codepoints):
+    """
+    Return (glyph_order, glyf_glyphs, color_layers, clip_boxes) for a COLRv1 font.
+    
+    color_layers maps every digit layout glyph to its (glyph_name, dx, dy)
+    layers, frame first, for _build_colr_table. Its glyf glyph is a composite
+    of the same shared glyphs at the same offsets, for renderers without COLR
+    support.
+    """
+    glyph_order = ['.notdef']
+    glyf_glyphs = {'.notdef': _draw_truetype(glyphs.draw_notdef_outline)}
+    shared_order = []
+    color_layers = {}
+    clip_boxes = {}
+    frame_bounds = {}
+    
+    for cp in codepoints:
+        name = glyph_name(cp)
+        glyph_order.append(name)
+        layers = _get_colr_layers(cp)
+        
+        if layers is None:
+            glyf_glyphs[name] = _draw_truetype(lambda pen, cp=cp: glyphs.draw_glyph_outline(pen, cp))
+            continue
+        
+        pen = TTGlyphPen(glyf_glyphs)
+        for layer_name, draw, dx, dy in layers:
+            if layer_name not in glyf_glyphs:
+                bounds_pen = ControlBoundsPen(None)
+                draw(bounds_pen)
+                frame_bounds[layer_name] = bounds_pen.bounds
+                glyf_glyphs[layer_name] = _draw_truetype(draw)
+                shared_order.append(layer_name)
+            pen.addComponent(layer_name, (1, 0, 0, 1, dx, dy))
+        
+        glyf_glyphs[name] = pen.glyph()
+        color_layers[name] = [(layer_name, dx, dy) for layer_name, _, dx, dy in layers]
+        # Digits lie inside the frame, so its box clips the whole glyph
+        clip_boxes[name] = tuple(otRound(v) for v in frame_bounds[layers[0][0]])
+    
+    return ['.notdef'] + shared_order + glyph_order[1:], glyf_glyphs, color_layers, clip_boxes
+
+
+def _paint(format, **fields):
+    """Return an otTables.Paint of a given format."""
+    paint = otTables.Paint()
+    paint.Format = format
+    for field, value in fields.items():
+        setattr(paint, field, value)
+    return paint
+
+
+def _build_colr_table(color_layers, clip_boxes, glyph_order):
+    """
+    Build the COLRv1 table painting each glyph from its shared layers.
+    
+    Glyphs are split into a head (frame and leading digits) and a tail (the
+    last two digits). Each distinct head and tail is a PaintColrLayers slice
+    of the LayerList written once, so a codepoint glyph only adds its own
+    two-layer slice: [head, tail]. Codepoints of a chunk share a few hundred
+    heads and 256 tails per layout, which keeps the per-glyph cost to a base
+    record, a PaintColrLayers and two LayerList offsets.
+    
+    The slices are assembled here directly; fontTools' generic builder finds
+    the same kind of reuse by searching every layer list, which is much
+    slower for tens of thousands of glyphs.
+    
+    Args:
+        color_layers: Dict of glyph name -> list of (glyph_name, dx, dy)
+        clip_boxes: Dict of glyph name -> (xMin, yMin, xMax, yMax)
+        glyph_order: Font glyph order (base glyph records are sorted by it)
+    """
+    layer_list = []
+    layer_paints = {}
+    slices = {}
+    solid = _paint(PaintFormat.PaintSolid, PaletteIndex=FOREGROUND_PALETTE_INDEX, Alpha=1.0)
+    
+    def get_layer_paint(layer):
+        paint = layer_paints.get(layer)
+        if paint is None:
+            layer_name, dx, dy = layer
+            paint = _paint(PaintFormat.PaintGlyph, Glyph=layer_name, Paint=solid)
+            if dx or dy:
+                paint = _paint(PaintFormat.PaintTranslate, Paint=paint, dx=dx, dy=dy)
+            layer_paints[layer] = paint
+        return paint
+    
+    def add_slice(paints):
+        paint = _paint(PaintFormat.PaintColrLayers, NumLayers=len(paints),
+                       FirstLayerIndex=len(layer_list))
+        layer_list.extend(paints)
+        return paint
+    
+    def get_shared_slice(layers):
+        if len(layers) == 1:
+            return get_layer_paint(layers[0])
+        paint = slices.get(layers)
+        if paint is None:
+            paint = slices[layers] = add_slice([get_layer_paint(layer) for layer in layers])
+        return paint
+    
+    records = []
+    glyph_ids = {name: gid for gid, name in enumerate(glyph_order)}
+    for name in sorted(color_layers, key=glyph_ids.__getitem__):
+        layers = tuple(color_layers[name])
+        split = max(len(layers) - 2, 1)
+        paint = add_slice([get_shared_slice(layers[:split]), get_shared_slice(layers[split:])])
+        record = otTables.BaseGlyphPaintRecord()
+        record.BaseGlyph = name
+        record.Paint = paint
+        records.append(record)
+    
+    colr = otTables.COLR()
+    colr.Version = 1
+    colr.BaseGlyphRecordCount = 0
+    colr.BaseGlyphRecordArray = None
+    colr.LayerRecordArray = None
+    colr.LayerRecordCount = 0
+    colr.BaseGlyphList = otTables.BaseGlyphList()
+    colr.BaseGlyphList.BaseGlyphCount = len(records)
+    colr.BaseGlyphList.BaseGlyphPaintRecord = records
+    colr.LayerList = otTables.LayerList()
+    colr.LayerList.LayerCount = len(layer_list)
+    colr.LayerList.Paint = layer_list
+    colr.ClipList = buildClipList(clip_boxes)
+    colr.VarIndexMap = None
+    colr.VarStore = None
+    
+    table = newTable('COLR')
+    table.version = 1
+    table.table = colr
+    return table
+
+
+def build_font(codepoints, composite=config.COMPOSITE_GLYPHS, subroutines=None, colr=None,
+               bitmap_strikes=None):
+    """
+    Build a complete font for the given codepoints in memory.
+
+    Args:
+        codepoints: Iterable of codepoints, in glyph order
+        composite: Build TrueType composite glyphs instead of CFF outlines
+        subroutines: Build CFF glyphs from global subroutines (ignored for
+                     composite fonts); None reads config.CFF_SUBROUTINES
+        colr: With composite, also paint glyphs from COLRv1 layers (the
+              composite glyphs become the monochrome fallback); None reads
+              config.COLR_GLYPHS
+        bitmap_strikes: Pixel sizes of embedded EBDT/EBLC bitmap strikes;
+                        None reads config.BITMAP_STRIKES
+
+    Returns:
+        fontTools TTFont, ready to save as OTF/TTF or WOFF2
+    """
+    if subroutines is None:
+        subroutines = config.CFF_SUBROUTINES
+    subroutines = subroutines and not composite
+    if colr is None:
+        colr = config.COLR_GLYPHS
+    colr = colr and composite
+    if bitmap_strikes is None:
+        bitmap_strikes = config.BITMAP_STRIKES
+    
+    codepoints = list(codepoints)
+    fb = FontBuilder(config.EM_SIZE, isTTF=composite)
+
+    private_dict = {}
+    if colr:
+        glyph_order, glyf_glyphs, color_layers, clip_boxes = _build_colr_glyphs(codepoints)
+    elif composite:
+        glyph_order, glyf_glyphs = _build_composite_glyphs(codepoints)
+    elif subroutines:
+        glyph_order, charstrings, bounds, global_subrs = _build_cff_glyphs_subroutinized(codepoints)
+        private_dict = {'defaultWidthX': config.GLYPH_WIDTH, 'nominalWidthX': 0}
+    else:
+        glyph_order, charstrings, bounds = _build_cff_glyphs(codepoints)
+
+    fb.setupGlyphOrder(glyph_order)
+    fb.setupCharacterMap({cp: glyph_name(cp) for cp in codepoints})
+
+    if composite:
+        fb.setupGlyf(glyf_glyphs)
+        glyf = fb.font['glyf']
+        metrics = {name: (config.GLYPH_WIDTH, getattr(glyf[name], 'xMin', 0)) for name in glyph_order}
+    else:
+        fb.setupCFF(
+            config.FONT_NAME,
+            {
+                'FullName': config.FONT_FULLNAME,
+                'FamilyName': config.FONT_FAMILY,
+                'Weight': config.FONT_STYLE,
+                'version': config.FONT_VERSION,
+                'Notice': config.FONT_COPYRIGHT,
+            },
+            charstrings,
+            private_dict,
+        )
+        if subroutines:
+            cff = fb.font['CFF '].cff
+            private = cff.topDictIndex[0].Private
+            for program in global_subrs:
+                cff.GlobalSubrs.append(T2CharString(program=program, private=private,
+                                                    globalSubrs=cff.GlobalSubrs))
+        metrics = {name: (config.GLYPH_WIDTH, otRound(bounds[name][0]) if bounds[name] else 0)
+                   for name in glyph_order}
+
+    fb.setupHorizontalMetrics(metrics)
+    fb.setupHorizontalHeader(ascent=config.ASCENT, descent=-config.DESCENT)
+    fb.setupNameTable({
+        'copyright': config.FONT_COPYRIGHT,
+        'familyName': config.FONT_FAMILY,
+        'styleName': config.FONT_STYLE,
+        'uniqueFontIdentifier': f"{config.FONT_FULLNAME} {config.FONT_VERSION}",
+        'fullName': config.FONT_FULLNAME,
+        'version': f"Version {config.FONT_VERSION}",
+        'psName': config.FONT_NAME,
+        'typographicFamily': config.FONT_FAMILY,
+        'compatibleFullName': config.FONT_FULLNAME,
+    })
+
+    panose = Panose()
+    for field, value in zip(PANOSE_FIELDS, PANOSE):
+        setattr(panose, field, value)
+    fb.setupOS2(
+        version=4,
+        achVendID="PFNT",
+        usWinAscent=config.ASCENT,
+        usWinDescent=config.DESCENT,
+        sTypoAscender=config.ASCENT,
+        sTypoDescender=-config.DESCENT,
+        sTypoLineGap=0,
+        panose=panose,
+        xAvgCharWidth=config.GLYPH_WIDTH,
+    )
+    fb.setupPost(isFixedPitch=1)
+    if colr:
+        # Every layer uses the foreground color; CPAL still needs one palette
+        fb.setupCPAL([[(0.0, 0.0, 0.0, 1.0)]])
+        fb.font['COLR'] = _build_colr_table(color_layers, clip_boxes, glyph_order)
+    if bitmap_strikes:
+        # Compiled directly by bitmaps.py; stored as raw table data
+        cmap = {cp: glyph_name(cp) for cp in codepoints}
+        for tag, data in zip(('EBDT', 'EBLC'), bitmaps.build_strike_tables(glyph_order, cmap, bitmap_strikes)):
+            table = DefaultTable(tag)
+            table.data = data
+            fb.font[tag] = table
+    fb.setupDummyDSIG()
+    fb.font['head'].fontRevision = float(config.FONT_VERSION)
+    timestamp = reproducible.get_build_timestamp()
+    if timestamp is not None:
+        # Fixed dates; saving would otherwise stamp the current time into head.modified
+        head = fb.font['head']
+        head.created = head.modified = reproducible.to_opentype_timestamp(timestamp)
+        fb.font.recalcTimestamp = False
+    if not composite:
+        _set_font_bounds(fb.font, bounds)
+
+    return fb.font
+
+
+def serialize_font(font):
+    """Compile an in-memory font into OTF/TTF file bytes."""
+    data = io.BytesIO()
+    font.save(data)
+    return data.getvalue()
+
+
+def compress_woff2(data):
+    """Convert serialized font bytes into WOFF2 file bytes in memory."""
+    output = io.BytesIO()
+    woff2.compress(io.BytesIO(data), output)
+    return output.getvalue()
+
+
+def write_font_files(data, outline_path=None, woff2_path=None):
+    """
+    Write serialized font bytes as an OTF/TTF file and/or a WOFF2 file.
+    
+    The WOFF2 encoder reads the compiled sfnt bytes directly, so the CFF table
+    is not parsed and rebuilt again. Brotli releases the GIL while compressing,
+    so this can run in a background thread while the next font is built.
+    """
+    if outline_path is not None:
+        with open(outline_path, 'wb') as f:
+            f.write(data)
+
+    if woff2_path is not None:
+        woff2.compress(io.BytesIO(data), woff2_path)
+
+
+def save_font(font, outline_path, woff2_path=None):
+    """
+    Serialize an in-memory font as OTF/TTF and, optionally, WOFF2.
+
+    Args:
+        font: TTFont from build_font()
+        outline_path: Path of the OTF (CFF) or TTF (composite) file
+        woff2_path: Path of the WOFF2 file, or None to skip it
+    
+    The tables are compiled once and both files are written from those bytes.
+    """
+    write_font_files(serialize_font(font), outline_path, woff2_path)
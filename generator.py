@@ -2,22 +2,55 @@
 Font generation engine for UnicodeHexMono.
 
 This module orchestrates the multi-file font generation process:
-- Collects valid Unicode codepoints
+- Collects valid Unicode codepoints (as a compact interval set, see codepoints.py)
 - Separates ASCII (U+0000-U+00FF) into dedicated file for performance
-- Splits remaining codepoints into chunks (60,000 glyphs per file)
+- Splits remaining codepoints into chunks (60,000 glyphs per file), or into
+  small per-block / 256- or 1024-codepoint files for the web subset profile
 - Creates FontForge font objects with proper metadata
 - Generates individual glyphs for each codepoint
 - Validates and exports OTF font files
+- Alternatively builds fonts without FontForge (see fonttools_backend.py)
+- Optionally builds chunks in parallel worker processes
+- Overlaps each chunk's WOFF2 conversion with drawing the next chunk
+- Restores unchanged chunks from the content-addressed build cache
+- Writes every file atomically and journals finished chunks, so an
+  interrupted build resumes at the first incomplete chunk
+- Builds a deterministic subset of the chunks per shard (--shard i/N), with a
+  merge step that checks and collects the outputs of every shard
+- Writes byte-identical files for identical inputs in reproducible mode
+  (fixed font dates, see reproducible.py)
 
 The multi-file approach is necessary because OpenType fonts have a hard limit
 of 65,535 glyphs per file, while Unicode has over 1 million codepoints.
 """
 
+import hashlib
+import json
 import os
-import fontforge
+import multiprocessing
+import queue
+import threading
 import config
-import utils
 import glyphs
+import build_cache
+import reproducible
+from build_journal import BuildJournal, atomic_output, get_journal_path, remove_partial_files
+from codepoints import CodepointSet, load_unicode_blocks
+
+# Font backends (see fonttools_backend.py)
+BACKEND_FONTFORGE = 'fontforge'
+BACKEND_FONTTOOLS = 'fonttools'
+BACKENDS = (BACKEND_FONTFORGE, BACKEND_FONTTOOLS)
+
+# Web subset profiles (see plan_web_chunks)
+WEB_SUBSET_BLOCKS = 'blocks'
+WEB_SUBSETS = ('256', '1024', WEB_SUBSET_BLOCKS)
+
+# Files listed individually in the build summary
+SUMMARY_MAX_FILES = 50
+
+# Version of the shard manifest layout
+SHARD_MANIFEST_FORMAT = 1
 
 # ============================================================================
 # Font Object Creation
@@ -25,6 +58,9 @@ import glyphs
 
 def create_font_object():
     """Create and configure a new FontForge font object with proper metadata."""
+    # Imported here so the fonttools backend runs under plain Python
+    import fontforge
+    
     font = fontforge.font()
     
     # Set font metadata
@@ -59,185 +95,831 @@ def create_font_object():
     font.appendSFNTName('English (US)', 'Fullname', config.FONT_FULLNAME)
     font.appendSFNTName('English (US)', 'Preferred Family', config.FONT_FAMILY)
     font.appendSFNTName('English (US)', 'Compatible Full', config.FONT_FULLNAME)
+    # Replaces FontForge's default unique ID, which contains the build date
+    font.appendSFNTName('English (US)', 'UniqueID', f"{config.FONT_FULLNAME} {config.FONT_VERSION}")
     
     return font
 
 # ============================================================================
-# Multi-File Font Generation
+# Chunk Planning
 # ============================================================================
 
-def generate_multi_file():
-    """Generate multiple font files to cover the full Unicode range.
+def plan_chunks(output_dir='dist'):
+    """
+    Split all valid codepoints into the font files to generate.
     
     Strategy:
     - File 1: ASCII & Extended ASCII (U+0000-U+00FF) - 256 glyphs
     - Files 2+: Remaining codepoints in 60,000-glyph chunks
-    """
-    print("\nMode: Multi-file generation")
-    print(f"Glyphs per file (non-ASCII): {config.GLYPHS_PER_FILE}")
-    print(f"Unicode range: U+{config.UNICODE_MIN:05X} - U+{config.UNICODE_MAX:05X}")
-    
-    # Ensure dist directory exists
-    os.makedirs('dist', exist_ok=True)
     
-    # Collect all valid codepoints
-    print("\nCollecting valid codepoints...")
-    all_codepoints = []
-    for cp in range(config.UNICODE_MIN, config.UNICODE_MAX + 1):
-        if utils.is_valid_codepoint(cp):
-            all_codepoints.append(cp)
+    Args:
+        output_dir: Directory for the generated files
     
-    total_codepoints = len(all_codepoints)
-    print(f"Total valid codepoints: {total_codepoints:,}")
+    Returns:
+        List of chunk dicts in output order, each with:
+        'number' (1-based file number), 'total' (number of files),
+        'title' (optional description), 'codepoints' (CodepointSet),
+        'progress_every' (glyph count between progress messages) and
+        'output_dir' (directory the files are written to); optionally
+        'file_name' (see plan_selection) and 'write_woff2' (False skips
+        the WOFF2 file)
+    """
+    all_codepoints = CodepointSet.valid_codepoints(config.UNICODE_MIN, config.UNICODE_MAX)
     
     # Separate ASCII range (U+0000-U+00FF) from the rest
     ascii_range_end = 0x00FF
-    ascii_codepoints = [cp for cp in all_codepoints if cp <= ascii_range_end]
-    remaining_codepoints = [cp for cp in all_codepoints if cp > ascii_range_end]
+    ascii_codepoints = all_codepoints.restrict(config.UNICODE_MIN, ascii_range_end)
+    remaining_codepoints = all_codepoints.restrict(ascii_range_end + 1, config.UNICODE_MAX)
+    
+    chunks = [{
+        'title': "ASCII & Extended ASCII",
+        'codepoints': ascii_codepoints,
+        'progress_every': 50,
+    }]
+    
+    for chunk_codepoints in remaining_codepoints.split(config.GLYPHS_PER_FILE):
+        chunks.append({
+            'title': None,
+            'codepoints': chunk_codepoints,
+            'progress_every': 1000,
+        })
+    
+    return _number_chunks(chunks, output_dir)
+
+
+def _number_chunks(chunks, output_dir):
+    """Add the 'number', 'total' and 'output_dir' entries to planned chunks."""
+    for number, chunk in enumerate(chunks, start=1):
+        chunk['number'] = number
+        chunk['total'] = len(chunks)
+        chunk['output_dir'] = output_dir
+    
+    return chunks
+
+
+def plan_web_chunks(subset, blocks_file=config.UNICODE_BLOCKS_FILE, output_dir=config.WEB_SUBSET_DIR):
+    """
+    Split all valid codepoints into small files for web pages.
+    
+    A page then downloads only the files covering the scripts it actually
+    uses, instead of a 60,000-glyph file per stray character.
+    
+    Args:
+        subset: 'blocks' to split along Unicode blocks, or a fixed alignment in
+                codepoints (256 or 1024) to split at multiples of that size
+        blocks_file: Path to the UCD Blocks.txt file (for subset='blocks')
+        output_dir: Directory for the generated files
+    
+    Returns:
+        List of chunk dicts, like plan_chunks()
+    """
+    all_codepoints = CodepointSet.valid_codepoints(config.UNICODE_MIN, config.UNICODE_MAX)
+    chunks = []
+    
+    if subset == WEB_SUBSET_BLOCKS:
+        blocks = load_unicode_blocks(blocks_file)
+        for start, end, name in blocks:
+            block_codepoints = all_codepoints.restrict(start, end)
+            # A few blocks (e.g. the supplementary private use areas) exceed one file
+            for piece in block_codepoints.split(config.GLYPHS_PER_FILE):
+                chunks.append({'title': name, 'codepoints': piece, 'progress_every': 1000})
+        
+        # Codepoints outside every block: one file per contiguous gap, so that no
+        # file's range overlaps a block file (unassigned planes split further)
+        unassigned = all_codepoints.difference(CodepointSet((start, end) for start, end, _ in blocks))
+        for gap in unassigned.ranges:
+            for piece in CodepointSet([gap]).split(config.GLYPHS_PER_FILE):
+                chunks.append({'title': None, 'codepoints': piece, 'progress_every': 1000})
+        
+        chunks.sort(key=lambda chunk: chunk['codepoints'][0])
+    else:
+        for piece in all_codepoints.split_aligned(int(subset)):
+            chunks.append({'title': None, 'codepoints': piece, 'progress_every': 1000})
+    
+    return _number_chunks(chunks, output_dir)
+
+
+def plan_selection(codepoints, output_dir=config.SELECTION_DIR, file_name=None):
+    """
+    Split the valid codepoints of a selection into the font files to generate.
+    
+    Used to rebuild only some codepoints (e.g. main.py --range U+1F600-1F64F)
+    through the same build path as a full build.
+    
+    Args:
+        codepoints: CodepointSet to build; surrogates and noncharacters are dropped
+        output_dir: Directory for the generated files
+        file_name: File name (without extension) instead of the default
+                   UnicodeHexMono_<first>_<last>; the selection must fit one file
+    
+    Returns:
+        List of chunk dicts, like plan_chunks() (empty if nothing is valid)
+    """
+    selected = CodepointSet.valid_codepoints().intersection(codepoints)
+    chunks = [{'title': None, 'codepoints': piece, 'progress_every': 1000}
+              for piece in selected.split(config.GLYPHS_PER_FILE)]
+    if file_name is not None:
+        if len(chunks) > 1:
+            raise ValueError(f"{len(selected):,} codepoints do not fit one file named {file_name}")
+        for chunk in chunks:
+            chunk['file_name'] = file_name
+    
+    return _number_chunks(chunks, output_dir)
+
+
+# ============================================================================
+# Sharding
+# ============================================================================
+
+def select_shard(chunks, index, count):
+    """
+    Return the chunks built by one shard of a sharded build.
+    
+    Chunks are dealt out round-robin by file number, so every shard gets a mix
+    of the small ASCII file and the large ones, and the assignment depends only
+    on the plan.
     
-    print(f"\nASCII & Extended ASCII (U+0000-U+00FF): {len(ascii_codepoints):,} glyphs")
-    print(f"Remaining codepoints (U+0100+): {len(remaining_codepoints):,} glyphs")
+    Args:
+        chunks: Full chunk plan (plan_chunks() or plan_web_chunks())
+        index: 1-based shard index
+        count: Number of shards
+    """
+    return [chunk for chunk in chunks if (chunk['number'] - 1) % count == index - 1]
+
+
+def plan_fingerprint(chunks, composite, backend):
+    """
+    Hash the chunk plan and the settings that decide the output files.
+    
+    Shards merged together must have been built from the same fingerprint.
+    """
+    data = {
+        'chunks': [[list(r) for r in chunk['codepoints'].ranges] for chunk in chunks],
+        'output_dir': chunks[0]['output_dir'] if chunks else None,
+        'composite': bool(composite),
+        'backend': backend,
+        'cff_subroutines': config.CFF_SUBROUTINES,
+        'colr_glyphs': config.COLR_GLYPHS,
+        'bitmap_strikes': list(config.BITMAP_STRIKES),
+        'font_version': config.FONT_VERSION,
+        'timestamp': reproducible.get_build_timestamp(),
+    }
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def get_shard_manifest_path(output_dir, index, count):
+    """Return the manifest path of a shard (e.g. dist/.shards/shard-2-of-4.json)."""
+    return os.path.join(output_dir, config.SHARD_MANIFEST_DIR, f"shard-{index}-of-{count}.json")
+
+
+def write_shard_manifest(output_dir, index, count, fingerprint, chunks, results):
+    """
+    Record which chunks a shard built and the files it wrote.
+    
+    Args:
+        output_dir: Output directory of the build
+        index: 1-based shard index
+        count: Number of shards
+        fingerprint: plan_fingerprint() of the full plan
+        chunks: Chunks built by this shard
+        results: (files, cache_hit) per chunk, as returned by the build
+    """
+    manifest = {
+        'format': SHARD_MANIFEST_FORMAT,
+        'shard': index,
+        'shards': count,
+        'plan': fingerprint,
+        'chunks': [
+            {
+                'number': chunk['number'],
+                'codepoints': [list(r) for r in chunk['codepoints'].ranges],
+                'files': [os.path.basename(path) for path in files],
+            }
+            for chunk, (files, _) in zip(chunks, results)
+        ],
+    }
+    path = get_shard_manifest_path(output_dir, index, count)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return path
+
+
+def merge_shards(output_dir='dist'):
+    """
+    Check that every shard of a sharded build finished and collect its files.
+    
+    All manifests in the output directory must come from the same plan and
+    shard count, every shard must be present, and every file they list must
+    exist (shards may have run on other machines and been copied together).
+    
+    Args:
+        output_dir: Output directory shared by the shards
     
-    # Calculate total number of files
-    num_remaining_files = (len(remaining_codepoints) + config.GLYPHS_PER_FILE - 1) // config.GLYPHS_PER_FILE
-    total_files = 1 + num_remaining_files  # 1 ASCII file + remaining chunks
+    Returns:
+        List of font file paths in file order, or [] if the shards are
+        incomplete or inconsistent
+    """
+    manifest_dir = os.path.join(output_dir, config.SHARD_MANIFEST_DIR)
+    print(f"\nMerging shard outputs from {manifest_dir}/...")
+    names = sorted(name for name in os.listdir(manifest_dir)
+                   if name.endswith('.json')) if os.path.isdir(manifest_dir) else []
+    if not names:
+        print(f"ERROR: no shard manifests found in {manifest_dir}/")
+        return []
+    
+    manifests = []
+    for name in names:
+        with open(os.path.join(manifest_dir, name), 'r', encoding='utf-8') as f:
+            manifests.append(json.load(f))
+    
+    builds = {(m['plan'], m['shards']) for m in manifests}
+    if len(builds) > 1 or any(m.get('format') != SHARD_MANIFEST_FORMAT for m in manifests):
+        print(f"ERROR: manifests in {manifest_dir}/ come from different plans or shard counts")
+        print(f"  Remove {manifest_dir}/ and rebuild every shard with the same options")
+        return []
     
-    print(f"\nWill generate {total_files} font files:")
-    print(f"  - 1 ASCII file (U+0000-U+00FF)")
-    print(f"  - {num_remaining_files} files for remaining Unicode")
+    count = manifests[0]['shards']
+    missing = sorted(set(range(1, count + 1)) - {m['shard'] for m in manifests})
+    if missing:
+        print(f"ERROR: missing shard(s) {', '.join(f'{i}/{count}' for i in missing)}")
+        return []
     
-    font_files = []
+    chunks = sorted((chunk for m in manifests for chunk in m['chunks']), key=lambda c: c['number'])
+    font_files = [os.path.join(output_dir, name) for chunk in chunks for name in chunk['files']]
+    absent = [path for path in font_files if not os.path.exists(path)]
+    if absent:
+        print(f"ERROR: {len(absent)} file(s) listed by the shards are missing, e.g. {absent[0]}")
+        return []
+    
+    total_codepoints = sum(end - start + 1 for chunk in chunks for start, end in chunk['codepoints'])
+    print(f"✓ {count} shard(s), {len(chunks)} ranges, {len(font_files)} files, "
+          f"{total_codepoints:,} codepoints")
+    return font_files
+
+
+# ============================================================================
+# Chunk Generation
+# ============================================================================
+
+# Set in worker processes by _init_worker; None means print directly
+_progress_queue = None
+
+
+def _init_worker(progress_queue):
+    """Pool initializer: route worker progress messages to the parent process."""
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def _report(chunk, message):
+    """Print a progress message, or forward it to the parent when in a worker."""
+    if _progress_queue is None:
+        print(message)
+    else:
+        _progress_queue.put(f"[File {chunk['number']}/{chunk['total']}] {message}")
+
+
+def convert_to_woff2(otf_path, woff2_path):
+    """
+    Convert a generated OTF/TTF file to WOFF2 using fonttools.
+    
+    Returns:
+        True if the WOFF2 file was written, False if fonttools is not installed
+    """
+    try:
+        from fontTools.ttLib import woff2
+    except ImportError:
+        return False
+    
+    # Compresses the tables as they are: loading and saving a TTFont would
+    # recompile them and stamp the current time into head.modified
+    with atomic_output(woff2_path) as tmp_path:
+        woff2.compress(otf_path, tmp_path)
+    return True
+
+
+def _write_woff2(chunk, outline_path, woff2_path):
+    """Convert a written OTF/TTF file to WOFF2; returns the list of files written."""
+    if not chunk.get('write_woff2', True):
+        return []
+    _report(chunk, f"\nGenerating {woff2_path}...")
+    _report(chunk, "  Converting OTF to WOFF2 using fonttools...")
+    if convert_to_woff2(outline_path, woff2_path):
+        _report(chunk, f"✓ Generated: {woff2_path}")
+        _report(chunk, f"  Format: WOFF2 (optimized for web)")
+        return [woff2_path]
+    
+    _report(chunk, "⚠ fonttools not installed - skipping WOFF2 generation")
+    _report(chunk, "  Install with: pip3 install --break-system-packages fonttools brotli")
+    return []
+
+
+def get_chunk_output_paths(chunk, composite=config.COMPOSITE_GLYPHS):
+    """Return the (OTF or TTF path, WOFF2 path) a chunk is written to."""
+    outline_format = config.COMPOSITE_OUTPUT_FORMAT if composite else config.OUTPUT_FORMAT
+    codepoints = chunk['codepoints']
+    file_name = chunk.get('file_name') or f"UnicodeHexMono_{codepoints[0]:05X}_{codepoints[-1]:05X}"
+    output_base = os.path.join(chunk['output_dir'], file_name)
+    return f"{output_base}.{outline_format}", f"{output_base}.woff2"
+
+
+def build_chunk_outline(chunk, composite=config.COMPOSITE_GLYPHS, backend=config.BACKEND):
+    """
+    Draw one planned chunk and write its OTF (or TTF) file.
     
-    # ========================================================================
-    # STEP 1: Generate ASCII & Extended ASCII file (U+0000-U+00FF)
-    # ========================================================================
-    print(f"\n{'=' * 70}")
-    print(f"File 1/{total_files}: ASCII & Extended ASCII")
-    print(f"U+{ascii_codepoints[0]:05X} - U+{ascii_codepoints[-1]:05X}")
-    print(f"Glyphs in this file: {len(ascii_codepoints):,}")
-    print(f"{'=' * 70}")
+    The WOFF2 conversion is returned as a separate step so that it can run while
+    the next chunk is drawn (see _build_chunks_pipelined).
+    
+    Args:
+        chunk: Chunk dict from plan_chunks()
+        composite: Build glyphs from shared components (see glyphs.create_composite_glyph)
+        backend: 'fontforge' or 'fonttools' (see fonttools_backend.py)
+    
+    Returns:
+        Tuple of (list of file paths written, finish) where finish() writes the
+        WOFF2 file and returns the list of file paths it wrote
+    """
+    codepoints = chunk['codepoints']
+    min_cp = codepoints[0]
+    max_cp = codepoints[-1]
+    
+    header = f"File {chunk['number']}/{chunk['total']}: "
+    header += chunk['title'] if chunk['title'] else f"U+{min_cp:05X} - U+{max_cp:05X}"
+    _report(chunk, f"\n{'=' * 70}")
+    _report(chunk, header)
+    if chunk['title']:
+        _report(chunk, f"U+{min_cp:05X} - U+{max_cp:05X}")
+    _report(chunk, f"Glyphs in this file: {len(codepoints):,}")
+    _report(chunk, f"{'=' * 70}")
+    
+    output_path_otf, output_path_woff2 = get_chunk_output_paths(chunk, composite)
+    
+    if backend == BACKEND_FONTTOOLS:
+        return _build_chunk_outline_fonttools(chunk, composite, output_path_otf, output_path_woff2)
     
     # Create font
     font = create_font_object()
     
-    # Generate glyphs for ASCII range
-    print("Generating glyphs...")
-    for i, cp in enumerate(ascii_codepoints):
-        glyphs.create_glyph(font, cp)
-        if (i + 1) % 50 == 0:
-            print(f"  {i + 1:,} / {len(ascii_codepoints):,} glyphs generated...")
+    # Generate glyphs for this chunk
+    _report(chunk, "Generating glyphs...")
+    for i, cp in enumerate(codepoints):
+        glyphs.create_glyph(font, cp, composite=composite)
+        if (i + 1) % chunk['progress_every'] == 0:
+            _report(chunk, f"  {i + 1:,} / {len(codepoints):,} glyphs generated...")
     
     # Add .notdef glyph
-    print("Creating .notdef glyph...")
+    _report(chunk, "Creating .notdef glyph...")
     glyphs.create_notdef_glyph(font)
     
     # Validate glyphs
-    print("Validating glyphs...")
+    _report(chunk, "Validating glyphs...")
     glyphs.validate_font_glyphs(font)
     
-    # Generate OTF filename
-    min_cp = ascii_codepoints[0]
-    max_cp = ascii_codepoints[-1]
-    output_path_otf = f"dist/UnicodeHexMono_{min_cp:05X}_{max_cp:05X}.otf"
-    print(f"\nGenerating {output_path_otf}...")
+    # Generate OTF (or TTF in composite mode) with proper flags
+    _report(chunk, f"\nGenerating {output_path_otf}...")
+    timestamp = reproducible.get_build_timestamp()
+    flags = ('opentype', 'omit-instructions', 'dummy-dsig')
+    if timestamp is not None:
+        flags += ('no-FFTM-table',)  # FontForge's own timestamps
+    with atomic_output(output_path_otf) as tmp_path:
+        font.generate(tmp_path, flags=flags)
+        if timestamp is not None:
+            reproducible.pin_font_file_timestamps(tmp_path, timestamp)
+    
+    _report(chunk, f"✓ Generated: {output_path_otf}")
+    _report(chunk, f"  Total glyphs in file: {len(font)}")
+    
+    font.close()
+    
+    # WOFF2 is converted from the file just written, using fonttools
+    return [output_path_otf], lambda: _write_woff2(chunk, output_path_otf, output_path_woff2)
+
+
+def _build_chunk_outline_fonttools(chunk, composite, output_path_otf, output_path_woff2):
+    """Build one chunk in memory with fontTools FontBuilder and write the OTF/TTF file."""
+    import fonttools_backend
+    
+    _report(chunk, "Generating glyphs (fonttools backend)...")
+    font = fonttools_backend.build_font(chunk['codepoints'], composite=composite)
+    glyph_count = len(font.getGlyphOrder())
+    
+    _report(chunk, f"\nGenerating {output_path_otf}...")
+    data = fonttools_backend.serialize_font(font)
+    with atomic_output(output_path_otf) as tmp_path:
+        fonttools_backend.write_font_files(data, tmp_path)
+    _report(chunk, f"✓ Generated: {output_path_otf}")
+    _report(chunk, f"  Total glyphs in file: {glyph_count}")
+    
+    def finish():
+        if not chunk.get('write_woff2', True):
+            return []
+        # Compressed from the serialized bytes; the font object is no longer needed
+        _report(chunk, f"\nGenerating {output_path_woff2}...")
+        with atomic_output(output_path_woff2) as tmp_path:
+            fonttools_backend.write_font_files(data, woff2_path=tmp_path)
+        _report(chunk, f"✓ Generated: {output_path_woff2}")
+        _report(chunk, f"  Format: WOFF2 (optimized for web)")
+        return [output_path_woff2]
+    
+    return [output_path_otf], finish
+
+
+def build_chunk(chunk, composite=config.COMPOSITE_GLYPHS, backend=config.BACKEND):
+    """
+    Generate the OTF (or TTF) and WOFF2 files for one planned chunk.
+    
+    Args:
+        chunk: Chunk dict from plan_chunks()
+        composite: Build glyphs from shared components (see glyphs.create_composite_glyph)
+        backend: 'fontforge' or 'fonttools' (see fonttools_backend.py)
+    
+    Returns:
+        List of generated file paths
+    
+    Safe to run in a worker process: all output goes through _report().
+    """
+    output_files, finish = build_chunk_outline(chunk, composite, backend)
+    return output_files + finish()
+
+
+def _chunk_cache_key(chunk, composite, backend):
+    """
+    Return the build cache key of a chunk (see build_cache.chunk_cache_key).
+    
+    generate_multi_file stores the key in chunk['cache_key'] while planning,
+    so building a chunk does not hash the sources again.
+    """
+    if 'cache_key' in chunk:
+        return chunk['cache_key']
+    return build_cache.chunk_cache_key(chunk, composite, backend=backend,
+                                       extra_functions=(create_font_object, get_chunk_output_paths,
+                                                        build_chunk_outline,
+                                                        _build_chunk_outline_fonttools,
+                                                        _write_woff2, convert_to_woff2,
+                                                        reproducible.pin_font_file_timestamps,
+                                                        reproducible.pin_sfnt_timestamps))
+
+
+def _restore_from_cache(chunk, key, cache_dir):
+    """Restore a chunk's files from the cache; returns the file list or None on a miss."""
+    restored = build_cache.restore(cache_dir, key, chunk['output_dir'])
+    if restored is not None:
+        codepoints = chunk['codepoints']
+        _report(chunk, f"\n✓ File {chunk['number']}/{chunk['total']}: "
+                       f"U+{codepoints[0]:05X} - U+{codepoints[-1]:05X} restored from cache ({key[:12]})")
+    return restored
+
+
+def _store_in_cache(chunk, key, cache_dir, output_files):
+    """Store a built chunk's files in the cache."""
+    build_cache.store(cache_dir, key, output_files)
+    _report(chunk, f"  Stored in build cache ({key[:12]})")
+
+
+def build_chunk_cached(chunk, composite=config.COMPOSITE_GLYPHS, cache_dir=config.BUILD_CACHE_DIR,
+                       backend=config.BACKEND):
+    """
+    Restore a chunk from the build cache, or build it and store the result.
+    
+    Args:
+        chunk: Chunk dict from plan_chunks()
+        composite: Build glyphs from shared components
+        cache_dir: Cache directory, or None to always build
+        backend: 'fontforge' or 'fonttools'
+    
+    Returns:
+        Tuple of (list of file paths, cache_hit) where cache_hit is None when
+        caching is disabled
+    """
+    if cache_dir is None:
+        return build_chunk(chunk, composite, backend), None
+    
+    key = _chunk_cache_key(chunk, composite, backend)
+    restored = _restore_from_cache(chunk, key, cache_dir)
+    if restored is not None:
+        return restored, True
+    
+    output_files = build_chunk(chunk, composite, backend)
+    _store_in_cache(chunk, key, cache_dir, output_files)
+    return output_files, False
+
+
+def _build_chunks_pipelined(chunks, composite, cache_dir, backend, depth, journal=None):
+    """
+    Build chunks in this process, overlapping WOFF2 conversion with drawing.
+    
+    The main thread draws each chunk and writes its OTF/TTF file (FontForge is
+    not thread-safe), then hands the WOFF2 step to a converter thread through a
+    queue of at most `depth` chunks. While the converter compresses chunk N,
+    the main thread already draws chunk N+1; once `depth` chunks are waiting,
+    drawing blocks, which bounds memory to depth + 2 chunks in flight.
+    
+    Finished chunks are recorded in the journal, if given, as soon as their
+    last file is written.
+    
+    Returns:
+        List of (file paths, cache_hit) tuples in plan order
+    """
+    handoff = queue.Queue(maxsize=depth)
+    results = [None] * len(chunks)
+    errors = []
     
-    # Generate OTF
-    font.generate(output_path_otf, flags=('opentype', 'omit-instructions', 'dummy-dsig'))
-    font_files.append(output_path_otf)
+    def convert():
+        while True:
+            item = handoff.get()
+            if item is None:
+                return
+            index, key, output_files, finish = item
+            if errors:
+                continue  # A previous chunk failed; drain the queue without working
+            try:
+                output_files = output_files + finish()
+                if key is not None:
+                    _store_in_cache(chunks[index], key, cache_dir, output_files)
+                if journal is not None:
+                    journal.record(chunks[index], output_files)
+                results[index] = (output_files, None if key is None else False)
+            except BaseException as error:
+                errors.append(error)
     
-    print(f"✓ Generated: {output_path_otf}")
-    print(f"  Total glyphs in file: {len(font)}")
+    converter = threading.Thread(target=convert, name="woff2-converter", daemon=True)
+    converter.start()
     
-    # Generate WOFF2
-    output_path_woff2 = f"dist/UnicodeHexMono_{min_cp:05X}_{max_cp:05X}.woff2"
-    print(f"\nGenerating {output_path_woff2}...")
-    print("  Converting OTF to WOFF2 using fonttools...")
     try:
-        from fontTools.ttLib import TTFont
-        otf_font = TTFont(output_path_otf)
-        otf_font.flavor = 'woff2'
-        otf_font.save(output_path_woff2)
-        font_files.append(output_path_woff2)
-        print(f"✓ Generated: {output_path_woff2}")
-        print(f"  Format: WOFF2 (optimized for web)")
-    except ImportError:
-        print("⚠ fonttools not installed - skipping WOFF2 generation")
-        print("  Install with: pip3 install --break-system-packages fonttools brotli")
+        for index, chunk in enumerate(chunks):
+            if errors:
+                break
+            key = None
+            if cache_dir is not None:
+                key = _chunk_cache_key(chunk, composite, backend)
+                restored = _restore_from_cache(chunk, key, cache_dir)
+                if restored is not None:
+                    if journal is not None:
+                        journal.record(chunk, restored)
+                    results[index] = (restored, True)
+                    continue
+            output_files, finish = build_chunk_outline(chunk, composite, backend)
+            handoff.put((index, key, output_files, finish))
+    finally:
+        handoff.put(None)
+        converter.join()
     
-    font.close()
+    if errors:
+        raise errors[0]
+    return results
+
+
+def _build_chunks_parallel(chunks, composite, jobs, cache_dir, backend, journal=None):
+    """
+    Build chunks in a pool of worker processes.
     
-    # ========================================================================
-    # STEP 2: Generate remaining files in 60k chunks
-    # ========================================================================
-    for file_idx in range(num_remaining_files):
-        start_idx = file_idx * config.GLYPHS_PER_FILE
-        end_idx = min(start_idx + config.GLYPHS_PER_FILE, len(remaining_codepoints))
-        chunk = remaining_codepoints[start_idx:end_idx]
-        
-        if not chunk:
-            continue
-        
-        min_cp = chunk[0]
-        max_cp = chunk[-1]
-        
-        print(f"\n{'=' * 70}")
-        print(f"File {file_idx + 2}/{total_files}: U+{min_cp:05X} - U+{max_cp:05X}")
-        print(f"Glyphs in this file: {len(chunk):,}")
-        print(f"{'=' * 70}")
-        
-        # Create font
-        font = create_font_object()
-        
-        # Generate glyphs for this chunk
-        print("Generating glyphs...")
-        for i, cp in enumerate(chunk):
-            glyphs.create_glyph(font, cp)
-            if (i + 1) % 1000 == 0:
-                print(f"  {i + 1:,} / {len(chunk):,} glyphs generated...")
-        
-        # Add .notdef glyph
-        print("Creating .notdef glyph...")
-        glyphs.create_notdef_glyph(font)
-        
-        # Validate glyphs
-        print("Validating glyphs...")
-        glyphs.validate_font_glyphs(font)
-        
-        # Generate OTF filename
-        output_path_otf = f"dist/UnicodeHexMono_{min_cp:05X}_{max_cp:05X}.otf"
-        print(f"\nGenerating {output_path_otf}...")
+    Each worker owns its FontForge (or fontTools) state, so a chunk is built exactly as in a
+    serial run. Progress messages are relayed through a queue and printed by the
+    parent. Results are returned in plan order, regardless of completion order;
+    the parent records each chunk in the journal, if given, as it completes.
+    """
+    # FontForge runs this script with its own embedded interpreter, so workers
+    # must be forked: "spawn" would try to re-run the fontforge binary as Python.
+    context = multiprocessing.get_context('fork')
+    progress_queue = context.Queue()
+    
+    with context.Pool(jobs, initializer=_init_worker, initargs=(progress_queue,)) as pool:
+        pending = [pool.apply_async(build_chunk_cached, (chunk, composite, cache_dir, backend))
+                   for chunk in chunks]
+        finished = 0
+        journaled = set()
         
-        # Generate OTF with proper flags
-        font.generate(output_path_otf, flags=('opentype', 'omit-instructions', 'dummy-dsig'))
-        font_files.append(output_path_otf)
+        while finished < len(pending):
+            try:
+                print(progress_queue.get(timeout=0.2))
+            except queue.Empty:
+                pass
+            
+            done = [index for index, result in enumerate(pending) if result.ready()]
+            if journal is not None:
+                for index in done:
+                    if index not in journaled and pending[index].successful():
+                        journal.record(chunks[index], pending[index].get()[0])
+                        journaled.add(index)
+            if len(done) != finished:
+                finished = len(done)
+                print(f"\n>>> {finished}/{len(pending)} files complete")
         
-        print(f"✓ Generated: {output_path_otf}")
-        print(f"  Total glyphs in file: {len(font)}")
+        # Flush messages still queued after the last chunk finished
+        while True:
+            try:
+                print(progress_queue.get_nowait())
+            except queue.Empty:
+                break
         
-        # Generate WOFF2 using fonttools
-        output_path_woff2 = f"dist/UnicodeHexMono_{min_cp:05X}_{max_cp:05X}.woff2"
-        print(f"\nGenerating {output_path_woff2}...")
-        print("  Converting OTF to WOFF2 using fonttools...")
-        try:
-            from fontTools.ttLib import TTFont
-            otf_font = TTFont(output_path_otf)
-            otf_font.flavor = 'woff2'
-            otf_font.save(output_path_woff2)
-            font_files.append(output_path_woff2)
-            print(f"✓ Generated: {output_path_woff2}")
-            print(f"  Format: WOFF2 (optimized for web)")
-        except ImportError:
-            print("⚠ fonttools not installed - skipping WOFF2 generation")
-            print("  Install with: pip3 install --break-system-packages fonttools brotli")
+        # get() re-raises any exception from the worker
+        return [result.get() for result in pending]
+
+
+# ============================================================================
+# Multi-File Font Generation
+# ============================================================================
+
+def generate_multi_file(composite=config.COMPOSITE_GLYPHS, jobs=1, cache_dir=config.BUILD_CACHE_DIR,
+                        backend=config.BACKEND, pipeline_depth=config.PIPELINE_DEPTH,
+                        web_subset=None, blocks_file=config.UNICODE_BLOCKS_FILE, shard=None,
+                        resume=True, codepoints=None, output_dir=None, formats=None):
+    """Generate multiple font files to cover the full Unicode range.
+    
+    Strategy:
+    - File 1: ASCII & Extended ASCII (U+0000-U+00FF) - 256 glyphs
+    - Files 2+: Remaining codepoints in 60,000-glyph chunks
+    
+    With web_subset, files are instead split along Unicode blocks or fixed
+    256/1024-codepoint boundaries and written to config.WEB_SUBSET_DIR. With
+    codepoints, only those are built (see plan_selection), by default to
+    config.SELECTION_DIR.
+    
+    Args:
+        composite: Build codepoint glyphs as references to shared frame and digit
+                   glyphs (TrueType outlines) instead of full CFF outlines
+        jobs: Number of worker processes; each builds one whole file at a time.
+              1 builds every file in this process.
+        cache_dir: Build cache directory, or None to regenerate every file
+        backend: 'fontforge' (default) or 'fonttools', which builds the fonts
+                 directly with fontTools FontBuilder and needs no FontForge
+        pipeline_depth: With jobs=1, how many drawn chunks may wait for their
+                        WOFF2 conversion while the next chunk is drawn.
+                        0 runs every stage strictly one after another.
+        web_subset: None for the regular files, or a web subset profile
+                    ('blocks', '256' or '1024', see plan_web_chunks)
+        blocks_file: Path to the UCD Blocks.txt file (web_subset='blocks')
+        shard: None to build every file, or (index, count) to build only the
+               files of shard index (1-based) of count (see select_shard) and
+               write its manifest for merge_shards()
+        resume: Skip chunks that an interrupted run of the same plan finished
+                (see build_journal.py); False rebuilds them
+        codepoints: None for the full range, or a CodepointSet to build only
+                    those codepoints
+        output_dir: Directory for the generated files, None for the default
+                    of the plan ('dist', config.WEB_SUBSET_DIR or
+                    config.SELECTION_DIR)
+        formats: None for all files, or a collection of 'otf'/'ttf' (the
+                 outline file, TTF in composite mode) and 'woff2'
+    
+    Returns:
+        List of generated file paths, in the same order as a serial build
+    """
+    outline_format = config.COMPOSITE_OUTPUT_FORMAT if composite else config.OUTPUT_FORMAT
+    
+    print("\nMode: Multi-file generation")
+    if composite:
+        print(f"Glyph mode: composite ({outline_format.upper()} outlines with shared components)")
+    if backend == BACKEND_FONTTOOLS:
+        print("Backend: fonttools (FontBuilder, no FontForge)")
+        if config.CFF_SUBROUTINES and not composite:
+            print("CFF charstrings: frames and digits as global subroutines")
+        if config.COLR_GLYPHS and composite:
+            print("Color glyphs: COLRv1 layers over shared frame and digit glyphs")
+        if config.BITMAP_STRIKES:
+            print(f"Bitmap strikes: {', '.join(map(str, config.BITMAP_STRIKES))} px (EBDT/EBLC)")
+    timestamp = reproducible.get_build_timestamp()
+    if timestamp is not None:
+        print(f"Font dates: {reproducible.describe_timestamp(timestamp)} (reproducible)")
+    if codepoints is not None:
+        print(f"Selection: {len(codepoints):,} codepoints in {len(codepoints.ranges):,} range(s)")
+    elif web_subset is None:
+        print(f"Glyphs per file (non-ASCII): {config.GLYPHS_PER_FILE}")
+    elif web_subset == WEB_SUBSET_BLOCKS:
+        print(f"Web subset: one file per Unicode block ({blocks_file})")
+    else:
+        print(f"Web subset: one file per {web_subset}-codepoint range")
+    print(f"Unicode range: U+{config.UNICODE_MIN:05X} - U+{config.UNICODE_MAX:05X}")
+    
+    # Collect all valid codepoints and split them into files
+    print("\nCollecting valid codepoints...")
+    if codepoints is not None:
+        chunks = plan_selection(codepoints, output_dir or config.SELECTION_DIR)
+    elif web_subset is None:
+        chunks = plan_chunks(output_dir or 'dist')
+    else:
+        if web_subset == WEB_SUBSET_BLOCKS and not os.path.exists(blocks_file):
+            print(f"ERROR: {blocks_file} not found")
+            print("Download it from https://www.unicode.org/Public/UCD/latest/ucd/Blocks.txt")
+            return []
+        chunks = plan_web_chunks(web_subset, blocks_file, output_dir or config.WEB_SUBSET_DIR)
+    total_codepoints = sum(len(chunk['codepoints']) for chunk in chunks)
+    print(f"Total valid codepoints: {total_codepoints:,}")
+    if not chunks:
+        print("ERROR: no valid codepoints to build")
+        return []
+    
+    # Files to keep: the WOFF2 conversion is skipped when not requested, the
+    # outline file is written anyway (WOFF2 is converted from it) and removed
+    write_woff2 = formats is None or 'woff2' in formats
+    keep_outline = formats is None or bool({'otf', 'ttf'} & set(formats))
+    for chunk in chunks:
+        chunk['write_woff2'] = write_woff2
+    
+    # Ensure output directory exists
+    output_dir = chunks[0]['output_dir']
+    os.makedirs(output_dir, exist_ok=True)
+    
+    fingerprint = plan_fingerprint(chunks, composite, backend)
+    if shard is not None:
+        shard_index, shard_count = shard
+        planned_files = len(chunks)
+        chunks = select_shard(chunks, shard_index, shard_count)
+        total_codepoints = sum(len(chunk['codepoints']) for chunk in chunks)
+        print(f"\nShard {shard_index}/{shard_count}: {len(chunks)} of {planned_files} files, "
+              f"{total_codepoints:,} codepoints (plan {fingerprint[:12]})")
+    
+    total_files = len(chunks)
+    if shard is not None or codepoints is not None:
+        print(f"\nWill generate {total_files} font files in {output_dir}/")
+    elif web_subset is None:
+        ascii_chunk = chunks[0]
+        print(f"\nASCII & Extended ASCII (U+0000-U+00FF): {len(ascii_chunk['codepoints']):,} glyphs")
+        print(f"Remaining codepoints (U+0100+): {total_codepoints - len(ascii_chunk['codepoints']):,} glyphs")
         
-        font.close()
+        print(f"\nWill generate {total_files} font files:")
+        print(f"  - 1 ASCII file (U+0000-U+00FF)")
+        print(f"  - {total_files - 1} files for remaining Unicode")
+    else:
+        print(f"\nWill generate {total_files} font files in {output_dir}/ "
+              f"(average {total_codepoints // total_files:,} glyphs per file)")
+    
+    # Files of killed runs were never renamed into place; resume after the
+    # chunks an interrupted run of this plan finished
+    output_names = [os.path.basename(path)
+                    for chunk in chunks for path in get_chunk_output_paths(chunk, composite)]
+    removed = remove_partial_files(output_dir, output_names)
+    if removed:
+        print(f"\nRemoved {removed} partial file(s) left by an interrupted build")
+    journal_path = get_journal_path(output_dir, shard)
+    if not resume and os.path.exists(journal_path):
+        os.remove(journal_path)
+    journal = BuildJournal(journal_path, fingerprint)
+    resumed = {}
+    for chunk in chunks:
+        # Covers the glyph settings and drawing code, which the plan fingerprint
+        # does not: a chunk finished with other settings is built again
+        chunk['cache_key'] = _chunk_cache_key(chunk, composite, backend)
+        completed_files = journal.get_completed_files(chunk)
+        if completed_files is not None:
+            resumed[chunk['number']] = completed_files
+    if resumed:
+        print(f"\nResuming interrupted build ({journal_path}): "
+              f"{len(resumed)} of {total_files} files already complete")
+    pending_chunks = [chunk for chunk in chunks if chunk['number'] not in resumed]
+    
+    jobs = max(1, min(jobs, len(pending_chunks)))
+    if jobs > 1:
+        print(f"Parallel build: {jobs} worker processes")
+        built = _build_chunks_parallel(pending_chunks, composite, jobs, cache_dir, backend, journal)
+    elif pipeline_depth > 0:
+        built = _build_chunks_pipelined(pending_chunks, composite, cache_dir, backend, pipeline_depth, journal)
+    else:
+        built = []
+        for chunk in pending_chunks:
+            built.append(build_chunk_cached(chunk, composite, cache_dir, backend))
+            journal.record(chunk, built[-1][0])
+    journal.remove()
+    
+    built = iter(built)
+    results = [(resumed[chunk['number']], None) if chunk['number'] in resumed else next(built)
+               for chunk in chunks]
+    
+    if not keep_outline:
+        for chunk_files, _ in results:
+            for path in chunk_files:
+                if not path.endswith('.woff2'):
+                    os.remove(path)
+        results = [([path for path in chunk_files if path.endswith('.woff2')], hit)
+                   for chunk_files, hit in results]
+    
+    font_files = [path for chunk_files, _ in results for path in chunk_files]
+    cache_hits = sum(1 for _, hit in results if hit)
+    cache_misses = sum(1 for _, hit in results if hit is False)
     
     # Summary
     print("\n" + "=" * 70)
     print("SUCCESS!")
-    print(f"Generated {len(font_files)} font files ({total_files} ranges × 2 formats):")
-    for f in font_files:
+    format_names = []
+    if keep_outline:
+        format_names.append(f"{outline_format.upper()} (OpenType)")
+    if write_woff2:
+        format_names.append("WOFF2 (Web optimized)")
+    print(f"Generated {len(font_files)} font files ({total_files} ranges × {len(format_names)} formats):")
+    for f in font_files[:SUMMARY_MAX_FILES]:
         print(f"  - {f}")
+    if len(font_files) > SUMMARY_MAX_FILES:
+        print(f"  ... and {len(font_files) - SUMMARY_MAX_FILES:,} more in {output_dir}/")
     print(f"Total codepoints covered: {total_codepoints:,}")
-    print(f"Formats: OTF (OpenType) + WOFF2 (Web optimized)")
-    print("=" * 70)
\ No newline at end of file
+    print(f"Formats: {' + '.join(format_names)}")
+    if cache_dir is not None:
+        print(f"Build cache ({cache_dir}): {cache_hits} hit(s), {cache_misses} miss(es)")
+    if resumed:
+        print(f"Resumed: {len(resumed)} file(s) finished by the interrupted build")
+    if shard is not None:
+        manifest_path = write_shard_manifest(output_dir, shard_index, shard_count, fingerprint, chunks, results)
+        print(f"Shard manifest: {manifest_path}")
+    print("=" * 70)
+    
+    return font_files
@@ -8,12 +8,322 @@ This module handles the creation of individual glyphs for different Unicode rang
 - U+100000-U+10FFFD (Plane 16): 4-digit hex in 2x2 grid with vertical divider
 
 Each glyph is rendered inside a rounded square border with appropriate styling.
+Glyphs can also be built as composites that reference shared frame and digit
+glyphs, which keeps per-codepoint outline data to a handful of references.
 """
 
+import functools
+
 import config
 import utils
 
 
+# ============================================================================
+# Layout Geometry
+# ============================================================================
+
+# Layout identifiers, one per visual style (see create_glyph for the ranges)
+LAYOUT_2DIGIT = "2digit"              # U+0000-U+00FF: 2 huge digits
+LAYOUT_2X2 = "2x2"                    # U+0100-U+FFFF: 4 digits in 2x2 grid
+LAYOUT_5DIGIT_SPLIT = "5digit"        # U+10000-U+FFFFF: plane digit + 2x2 grid
+LAYOUT_PLANE16 = "plane16"            # U+100000-U+10FFFD: 2x2 grid with divider
+LAYOUT_REPLACEMENT = "replacement"    # U+FFFD: diagonal X
+LAYOUT_NOTDEF = "notdef"              # Anything else: empty outlined square
+
+# Layouts built from a frame plus hex digits placed in fixed slots
+DIGIT_LAYOUTS = (LAYOUT_2DIGIT, LAYOUT_2X2, LAYOUT_5DIGIT_SPLIT, LAYOUT_PLANE16)
+
+
+def get_layout(codepoint):
+    """
+    Return the layout identifier used to render a codepoint.
+    
+    Args:
+        codepoint: Unicode codepoint value
+    
+    Returns:
+        One of the LAYOUT_* constants
+    """
+    if 0x100000 <= codepoint <= 0x10FFFF:
+        return LAYOUT_PLANE16
+    if 0x10000 <= codepoint <= 0xFFFFF:
+        return LAYOUT_5DIGIT_SPLIT
+    if codepoint == 0xFFFD:
+        return LAYOUT_REPLACEMENT
+    if 0x0000 <= codepoint <= 0x00FF:
+        return LAYOUT_2DIGIT
+    if 0x0100 <= codepoint <= 0xFFFF:
+        return LAYOUT_2X2
+    return LAYOUT_NOTDEF
+
+
+def get_layout_digits(layout, codepoint):
+    """
+    Return the hex digits shown by a layout, in slot order.
+    
+    Args:
+        layout: One of DIGIT_LAYOUTS
+        codepoint: Unicode codepoint value
+    
+    Returns:
+        Uppercase hex string with one character per slot of get_digit_slots(layout)
+        Example: get_layout_digits(LAYOUT_PLANE16, 0x10ABCD) -> 'ABCD'
+    """
+    if layout == LAYOUT_2DIGIT:
+        return f"{codepoint:02X}"       # e.g., "4A" for U+004A
+    if layout == LAYOUT_2X2:
+        return f"{codepoint:04X}"       # e.g., "12AB"
+    if layout == LAYOUT_5DIGIT_SPLIT:
+        return f"{codepoint:05X}"       # e.g., "E12AB" (plane digit first)
+    if layout == LAYOUT_PLANE16:
+        return f"{codepoint:06X}"[2:]   # last 4 digits, "10" prefix is implied
+    raise ValueError(f"Layout '{layout}' has no digit slots")
+
+
+def get_digit_slots(layout):
+    """
+    Return the position and size of every digit slot in a layout.
+    
+    Args:
+        layout: One of DIGIT_LAYOUTS
+    
+    Returns:
+        List of (x, y, size) tuples (bottom-left corner and digit height),
+        in the same order as the characters of get_layout_digits()
+    """
+    # Inner area: BOX_SIZE - 2 * BOX_STROKE_WIDTH
+    inner_size = config.BOX_SIZE - 2 * config.BOX_STROKE_WIDTH
+    inner_x = config.BOX_MARGIN + config.BOX_STROKE_WIDTH
+    inner_y = config.GLYPH_Y_OFFSET + config.BOX_STROKE_WIDTH
+    
+    if layout == LAYOUT_2DIGIT:
+        # Two digits side by side with spacing
+        digit_width = config.TWO_DIGIT_SIZE * 0.6  # Aspect ratio 60%
+        total_width = 2 * digit_width + config.GRID_SPACING
+        
+        # Center the two digits horizontally and vertically
+        offset_x = (inner_size - total_width) / 2
+        offset_y = (inner_size - config.TWO_DIGIT_SIZE) / 2
+        
+        return [
+            (inner_x + offset_x, inner_y + offset_y, config.TWO_DIGIT_SIZE),
+            (inner_x + offset_x + digit_width + config.GRID_SPACING, inner_y + offset_y,
+             config.TWO_DIGIT_SIZE),
+        ]
+    
+    if layout in (LAYOUT_2X2, LAYOUT_PLANE16):
+        # 2x2 grid: each cell gets half the space minus spacing
+        cell_width = (inner_size - config.GRID_SPACING) / 2
+        cell_height = (inner_size - config.GRID_SPACING) / 2
+        
+        # Center digits within cells (Plane 16 historically uses the 60% width)
+        digit_width = config.DIGIT_SIZE * (0.65 if layout == LAYOUT_2X2 else 0.6)
+        offset_x = (cell_width - digit_width) / 2
+        offset_y = (cell_height - config.DIGIT_SIZE) / 2
+        
+        left_x = inner_x + offset_x
+        right_x = inner_x + cell_width + config.GRID_SPACING + offset_x
+        top_y = inner_y + cell_height + config.GRID_SPACING + offset_y
+        bottom_y = inner_y + offset_y
+        
+        # Top-left, top-right, bottom-left, bottom-right
+        return [
+            (left_x, top_y, config.DIGIT_SIZE),
+            (right_x, top_y, config.DIGIT_SIZE),
+            (left_x, bottom_y, config.DIGIT_SIZE),
+            (right_x, bottom_y, config.DIGIT_SIZE),
+        ]
+    
+    if layout == LAYOUT_5DIGIT_SPLIT:
+        # Calculate vertical padding for reference (this gives us the target horizontal padding)
+        cell_height = (inner_size - config.SUPPLEMENTARY_GRID_SPACING) / 2
+        vertical_padding = (cell_height - config.DIGIT_SIZE) / 2  # ~75 units
+        
+        # LEFT SECTION: Large plane digit, padded like the grid and vertically centered
+        plane_x = inner_x + vertical_padding
+        plane_y = inner_y + (inner_size - config.PLANE_DIGIT_SIZE) / 2
+        
+        # RIGHT SECTION: 2x2 grid with balanced margins
+        plane_digit_width = config.PLANE_DIGIT_SIZE * 0.65  # ~189 units
+        grid_start_x = plane_x + plane_digit_width + config.PLANE_SECTION_SPACING
+        
+        # Available width for grid (right margin matches vertical padding)
+        available_width = inner_size - (grid_start_x - inner_x) - vertical_padding
+        cell_width = (available_width - config.SUPPLEMENTARY_GRID_SPACING) / 2
+        
+        digit_width = config.DIGIT_SIZE * 0.65
+        offset_x = (cell_width - digit_width) / 2
+        offset_y = vertical_padding
+        
+        left_x = grid_start_x + offset_x
+        right_x = grid_start_x + cell_width + config.SUPPLEMENTARY_GRID_SPACING + offset_x
+        top_y = inner_y + cell_height + config.SUPPLEMENTARY_GRID_SPACING + offset_y
+        bottom_y = inner_y + offset_y
+        
+        # Plane digit, then top-left, top-right, bottom-left, bottom-right
+        return [
+            (plane_x, plane_y, config.PLANE_DIGIT_SIZE),
+            (left_x, top_y, config.DIGIT_SIZE),
+            (right_x, top_y, config.DIGIT_SIZE),
+            (left_x, bottom_y, config.DIGIT_SIZE),
+            (right_x, bottom_y, config.DIGIT_SIZE),
+        ]
+    
+    raise ValueError(f"Layout '{layout}' has no digit slots")
+
+
+def draw_frame(pen, layout):
+    """
+    Draw the part of a digit layout that is the same for every codepoint.
+    
+    Args:
+        pen: FontForge glyph pen
+        layout: One of DIGIT_LAYOUTS
+    
+    Plane 16 uses more rounded corners and a vertical divider; every other
+    digit layout shares the standard rounded square.
+    """
+    x_left = config.BOX_MARGIN
+    y_bottom = config.GLYPH_Y_OFFSET
+    
+    if layout != LAYOUT_PLANE16:
+        utils.draw_rounded_square(pen, x_left, y_bottom, config.BOX_SIZE, config.CORNER_RADIUS)
+        return
+    
+    utils.draw_rounded_square(pen, x_left, y_bottom, config.BOX_SIZE, config.CORNER_RADIUS_PLANE16)
+    
+    # Vertical line from top to bottom of inner area, through the middle
+    inner_size = config.BOX_SIZE - 2 * config.BOX_STROKE_WIDTH
+    inner_y = config.GLYPH_Y_OFFSET + config.BOX_STROKE_WIDTH
+    middle_x = config.BOX_MARGIN + config.BOX_SIZE / 2
+    line_width = config.BOX_STROKE_WIDTH  # Same thickness as border (40 units)
+    utils.draw_thick_line(pen, middle_x, inner_y, middle_x, inner_y + inner_size, line_width)
+
+
+def draw_layout_digits(pen, layout, codepoint):
+    """
+    Draw the hex digits of a codepoint into the slots of a layout.
+    
+    Args:
+        pen: FontForge glyph pen
+        layout: One of DIGIT_LAYOUTS
+        codepoint: Unicode codepoint value
+    """
+    hex_str = get_layout_digits(layout, codepoint)
+    for digit, (x, y, size) in zip(hex_str, get_digit_slots(layout)):
+        utils.draw_hex_digit(pen, digit, x, y, size)
+
+
+# ============================================================================
+# Layout Templates
+# ============================================================================
+
+class ContourRecorder:
+    """
+    Pen that records closed contours so they can be replayed into another pen.
+    
+    Each contour is stored as (start_point, segments), where every segment is a
+    tuple of points: one point for a line, three points for a cubic curve.
+    """
+    
+    def __init__(self):
+        self.contours = []
+        self._start = None
+        self._segments = None
+    
+    def moveTo(self, point):
+        self._start = point
+        self._segments = []
+    
+    def lineTo(self, point):
+        self._segments.append((point,))
+    
+    def curveTo(self, *points):
+        self._segments.append(points)
+    
+    def closePath(self):
+        self.contours.append((self._start, tuple(self._segments)))
+        self._start = None
+        self._segments = None
+
+
+def _record(draw, *args):
+    """Run a drawing function against a ContourRecorder and return its contours."""
+    recorder = ContourRecorder()
+    draw(recorder, *args)
+    return tuple(recorder.contours)
+
+
+def replay_contours(pen, contours):
+    """Draw contours recorded by ContourRecorder into a pen."""
+    move_to = pen.moveTo
+    line_to = pen.lineTo
+    curve_to = pen.curveTo
+    close_path = pen.closePath
+    
+    for start, segments in contours:
+        move_to(start)
+        for segment in segments:
+            if len(segment) == 1:
+                line_to(segment[0])
+            else:
+                curve_to(*segment)
+        close_path()
+
+
+@functools.lru_cache(maxsize=None)
+def compile_layout_template(layout):
+    """
+    Compile a digit layout into a fixed drawing template.
+    
+    Args:
+        layout: One of DIGIT_LAYOUTS
+    
+    Returns:
+        Dict with:
+        'frame': recorded frame contours
+        'slots': slot origins from get_digit_slots()
+        'digits': one dict per slot mapping each hex digit to its recorded,
+                  already-translated contours
+    
+    Templates are compiled once per process from the same geometry and drawing
+    primitives used by draw_frame() and draw_layout_digits(), so replaying a
+    template produces exactly the same outline. Call
+    compile_layout_template.cache_clear() after changing config values at runtime.
+    """
+    slots = get_digit_slots(layout)
+    digits = []
+    for x, y, size in slots:
+        digits.append({
+            digit: _record(utils.draw_hex_digit, digit, x, y, size)
+            for digit in utils.DIGIT_PATTERNS
+        })
+    
+    return {
+        'frame': _record(draw_frame, layout),
+        'slots': slots,
+        'digits': digits,
+    }
+
+
+def draw_layout_template(pen, layout, codepoint):
+    """
+    Draw a digit layout glyph by replaying its compiled template.
+    
+    Args:
+        pen: FontForge glyph pen
+        layout: One of DIGIT_LAYOUTS
+        codepoint: Unicode codepoint value
+    
+    Equivalent to draw_frame() followed by draw_layout_digits(), without
+    recomputing any geometry.
+    """
+    template = compile_layout_template(layout)
+    replay_contours(pen, template['frame'])
+    for slot_digits, digit in zip(template['digits'], get_layout_digits(layout, codepoint)):
+        replay_contours(pen, slot_digits[digit])
+
+
 # ============================================================================
 # Glyph Drawing Functions
 # ============================================================================
@@ -25,7 +335,12 @@ def draw_replacement_character(glyph):
     and normal characters (hex codes).
     """
     pen = glyph.glyphPen()
-    
+    draw_replacement_outline(pen)
+    pen = None
+
+
+def draw_replacement_outline(pen):
+    """Draw the U+FFFD outline (rounded square with diagonal X) into a pen."""
     # Draw outer rounded square border
     x_left = config.BOX_MARGIN
     y_bottom = config.GLYPH_Y_OFFSET
@@ -50,8 +365,6 @@ def draw_replacement_character(glyph):
     
     # Draw second diagonal (/) from bottom-left to top-right
     utils.draw_thick_line(pen, x1, y1, x2, y2, line_width)
-    
-    pen = None
 
 
 def draw_hex_code_2digit(glyph, codepoint):
@@ -63,41 +376,8 @@ def draw_hex_code_2digit(glyph, codepoint):
         glyph: FontForge glyph object
         codepoint: Unicode codepoint value (0x0000 to 0x00FF)
     """
-    # Convert codepoint to 2-digit hex string (only last 2 digits)
-    hex_str = f"{codepoint:02X}"  # e.g., "4A" for U+004A
-    
     pen = glyph.glyphPen()
-    
-    # Draw outer rounded square border
-    x_left = config.BOX_MARGIN
-    y_bottom = config.GLYPH_Y_OFFSET
-    utils.draw_rounded_square(pen, x_left, y_bottom, config.BOX_SIZE, config.CORNER_RADIUS)
-    
-    # Calculate positioning for 2 huge digits (horizontal layout)
-    inner_size = config.BOX_SIZE - 2 * config.BOX_STROKE_WIDTH
-    inner_x = config.BOX_MARGIN + config.BOX_STROKE_WIDTH
-    inner_y = config.GLYPH_Y_OFFSET + config.BOX_STROKE_WIDTH
-    
-    # Two digits side by side with spacing
-    digit_width = config.TWO_DIGIT_SIZE * 0.6  # Aspect ratio 60%
-    total_width = 2 * digit_width + config.GRID_SPACING
-    
-    # Center the two digits horizontally
-    offset_x = (inner_size - total_width) / 2
-    offset_y = (inner_size - config.TWO_DIGIT_SIZE) / 2  # Center vertically
-    
-    # Draw first digit (left)
-    utils.draw_hex_digit(pen, hex_str[0],
-                         inner_x + offset_x,
-                         inner_y + offset_y,
-                         config.TWO_DIGIT_SIZE)
-    
-    # Draw second digit (right)
-    utils.draw_hex_digit(pen, hex_str[1],
-                         inner_x + offset_x + digit_width + config.GRID_SPACING,
-                         inner_y + offset_y,
-                         config.TWO_DIGIT_SIZE)
-    
+    draw_layout_template(pen, LAYOUT_2DIGIT, codepoint)
     pen = None
 
 
@@ -109,55 +389,8 @@ def draw_hex_code_2x2(glyph, codepoint):
         glyph: FontForge glyph object
         codepoint: Unicode codepoint value (0x0100 to 0xFFFF)
     """
-    # Convert codepoint to 4-digit hex string
-    hex_str = f"{codepoint:04X}"
-
     pen = glyph.glyphPen()
-
-    # Calculate grid positioning
-    # Inner area: BOX_SIZE - 2 * BOX_STROKE_WIDTH
-    inner_size = config.BOX_SIZE - 2 * config.BOX_STROKE_WIDTH
-    inner_x = config.BOX_MARGIN + config.BOX_STROKE_WIDTH
-    inner_y = config.GLYPH_Y_OFFSET + config.BOX_STROKE_WIDTH
-    
-    # 2x2 grid: each cell gets half the space minus spacing
-    cell_width = (inner_size - config.GRID_SPACING) / 2
-    cell_height = (inner_size - config.GRID_SPACING) / 2
-    
-    # Center digits within cells
-    digit_width = config.DIGIT_SIZE * 0.65
-    offset_x = (cell_width - digit_width) / 2
-    offset_y = (cell_height - config.DIGIT_SIZE) / 2
-    
-    x_left = config.BOX_MARGIN
-    y_bottom = config.GLYPH_Y_OFFSET
-    utils.draw_rounded_square(pen, x_left, y_bottom, config.BOX_SIZE, config.CORNER_RADIUS)
-
-    # Grid positions (row, col) -> (y_index, x_index)
-    # Top-left: hex_str[0]
-    utils.draw_hex_digit(pen, hex_str[0], 
-                   inner_x + offset_x, 
-                   inner_y + cell_height + config.GRID_SPACING + offset_y, 
-                   config.DIGIT_SIZE)
-    
-    # Top-right: hex_str[1]
-    utils.draw_hex_digit(pen, hex_str[1], 
-                   inner_x + cell_width + config.GRID_SPACING + offset_x, 
-                   inner_y + cell_height + config.GRID_SPACING + offset_y, 
-                   config.DIGIT_SIZE)
-    
-    # Bottom-left: hex_str[2]
-    utils.draw_hex_digit(pen, hex_str[2], 
-                   inner_x + offset_x, 
-                   inner_y + offset_y, 
-                   config.DIGIT_SIZE)
-    
-    # Bottom-right: hex_str[3]
-    utils.draw_hex_digit(pen, hex_str[3], 
-                   inner_x + cell_width + config.GRID_SPACING + offset_x, 
-                   inner_y + offset_y, 
-                   config.DIGIT_SIZE)
-    
+    draw_layout_template(pen, LAYOUT_2X2, codepoint)
     pen = None
 
 
@@ -174,74 +407,8 @@ def draw_hex_code_5digit_split(glyph, codepoint):
         glyph: FontForge glyph object
         codepoint: Unicode codepoint value (0x10000 to 0xFFFFF)
     """
-    # Convert codepoint to 5-digit hex string
-    hex_str = f"{codepoint:05X}"
-    
     pen = glyph.glyphPen()
-    
-    # Draw the rounded square border
-    x_left = config.BOX_MARGIN
-    y_bottom = config.GLYPH_Y_OFFSET
-    utils.draw_rounded_square(pen, x_left, y_bottom, config.BOX_SIZE, config.CORNER_RADIUS)
-    
-    # Calculate inner area
-    inner_size = config.BOX_SIZE - 2 * config.BOX_STROKE_WIDTH
-    inner_x = config.BOX_MARGIN + config.BOX_STROKE_WIDTH
-    inner_y = config.GLYPH_Y_OFFSET + config.BOX_STROKE_WIDTH
-    
-    # Calculate vertical padding for reference (this gives us the target horizontal padding)
-    cell_height = (inner_size - config.SUPPLEMENTARY_GRID_SPACING) / 2
-    vertical_padding = (cell_height - config.DIGIT_SIZE) / 2  # ~75 units
-    
-    # LEFT SECTION: Large plane digit
-    plane_digit = hex_str[0]  # First digit (e.g., 'E' from 'E12AB')
-    
-    # Position: left side with padding matching vertical padding, vertically centered
-    plane_x = inner_x + vertical_padding  # Match vertical padding (~75 units from left edge)
-    plane_y = inner_y + (inner_size - config.PLANE_DIGIT_SIZE) / 2  # Vertically centered
-    
-    utils.draw_hex_digit(pen, plane_digit, plane_x, plane_y, config.PLANE_DIGIT_SIZE)
-    
-    # RIGHT SECTION: 2x2 grid for remaining 4 digits
-    # Calculate grid position to have balanced margins
-    plane_digit_width = config.PLANE_DIGIT_SIZE * 0.65  # ~189 units
-    grid_start_x = plane_x + plane_digit_width + config.PLANE_SECTION_SPACING
-    
-    # Calculate available width for grid (accounting for right margin matching vertical padding)
-    available_width = inner_size - (grid_start_x - inner_x) - vertical_padding
-    
-    # 2x2 grid calculations
-    cell_width = (available_width - config.SUPPLEMENTARY_GRID_SPACING) / 2
-    
-    digit_width = config.DIGIT_SIZE * 0.65
-    offset_x = (cell_width - digit_width) / 2
-    offset_y = vertical_padding  # Use the same padding as calculated above
-    
-    # Draw 2x2 grid: hex_str[1] to hex_str[4]
-    # Top-left: hex_str[1]
-    utils.draw_hex_digit(pen, hex_str[1],
-                         grid_start_x + offset_x,
-                         inner_y + cell_height + config.SUPPLEMENTARY_GRID_SPACING + offset_y,
-                         config.DIGIT_SIZE)
-    
-    # Top-right: hex_str[2]
-    utils.draw_hex_digit(pen, hex_str[2],
-                         grid_start_x + cell_width + config.SUPPLEMENTARY_GRID_SPACING + offset_x,
-                         inner_y + cell_height + config.SUPPLEMENTARY_GRID_SPACING + offset_y,
-                         config.DIGIT_SIZE)
-    
-    # Bottom-left: hex_str[3]
-    utils.draw_hex_digit(pen, hex_str[3],
-                         grid_start_x + offset_x,
-                         inner_y + offset_y,
-                         config.DIGIT_SIZE)
-    
-    # Bottom-right: hex_str[4]
-    utils.draw_hex_digit(pen, hex_str[4],
-                         grid_start_x + cell_width + config.SUPPLEMENTARY_GRID_SPACING + offset_x,
-                         inner_y + offset_y,
-                         config.DIGIT_SIZE)
-    
+    draw_layout_template(pen, LAYOUT_5DIGIT_SPLIT, codepoint)
     pen = None
 
 
@@ -254,67 +421,8 @@ def draw_hex_code_2x2_filled(glyph, codepoint):
         glyph: FontForge glyph object
         codepoint: Unicode codepoint value (0x100000 to 0x10FFFF)
     """
-    # Convert codepoint to 6-digit hex string
-    hex_str = f"{codepoint:06X}"
-    
     pen = glyph.glyphPen()
-
-    # Draw the same outline square as BMP
-    x_left = config.BOX_MARGIN
-    y_bottom = config.GLYPH_Y_OFFSET
-    utils.draw_rounded_square(pen, x_left, y_bottom, config.BOX_SIZE, config.CORNER_RADIUS_PLANE16)
-
-    # Calculate grid positioning (same as BMP)
-    inner_size = config.BOX_SIZE - 2 * config.BOX_STROKE_WIDTH
-    inner_x = config.BOX_MARGIN + config.BOX_STROKE_WIDTH
-    inner_y = config.GLYPH_Y_OFFSET + config.BOX_STROKE_WIDTH
-    
-    # 2x2 grid: each cell gets half the space minus spacing
-    cell_width = (inner_size - config.GRID_SPACING) / 2
-    cell_height = (inner_size - config.GRID_SPACING) / 2
-    
-    # Center digits within cells
-    digit_width = config.DIGIT_SIZE * 0.6
-    offset_x = (cell_width - digit_width) / 2
-    offset_y = (cell_height - config.DIGIT_SIZE) / 2
-    
-    # Draw digits (same as BMP - dark on light background)
-    # Top-left: hex_str[2]
-    utils.draw_hex_digit(pen, hex_str[2], 
-                   inner_x + offset_x, 
-                   inner_y + cell_height + config.GRID_SPACING + offset_y, 
-                   config.DIGIT_SIZE)
-    
-    # Top-right: hex_str[3]
-    utils.draw_hex_digit(pen, hex_str[3], 
-                   inner_x + cell_width + config.GRID_SPACING + offset_x, 
-                   inner_y + cell_height + config.GRID_SPACING + offset_y, 
-                   config.DIGIT_SIZE)
-    
-    # Bottom-left: hex_str[4]
-    utils.draw_hex_digit(pen, hex_str[4], 
-                   inner_x + offset_x, 
-                   inner_y + offset_y, 
-                   config.DIGIT_SIZE)
-    
-    # Bottom-right: hex_str[5]
-    utils.draw_hex_digit(pen, hex_str[5], 
-                   inner_x + cell_width + config.GRID_SPACING + offset_x, 
-                   inner_y + offset_y, 
-                   config.DIGIT_SIZE)
-    
-    # Add vertical line through the middle
-    inner_size = config.BOX_SIZE - 2 * config.BOX_STROKE_WIDTH
-    inner_x = config.BOX_MARGIN + config.BOX_STROKE_WIDTH
-    inner_y = config.GLYPH_Y_OFFSET + config.BOX_STROKE_WIDTH
-    
-    # Calculate middle x position
-    middle_x = config.BOX_MARGIN + config.BOX_SIZE / 2
-    
-    # Vertical line from top to bottom of inner area
-    line_width = config.BOX_STROKE_WIDTH  # Same thickness as border (40 units)
-    utils.draw_thick_line(pen, middle_x, inner_y, middle_x, inner_y + inner_size, line_width)
-    
+    draw_layout_template(pen, LAYOUT_PLANE16, codepoint)
     pen = None
 
 
@@ -330,7 +438,12 @@ def _draw_notdef_glyph(glyph):
     This creates a frame by drawing outer and inner rounded rectangles.
     """
     pen = glyph.glyphPen()
-    
+    draw_notdef_outline(pen)
+    pen = None
+
+
+def draw_notdef_outline(pen):
+    """Draw the .notdef outline (rounded square frame with a hole) into a pen."""
     x_left = config.BOX_MARGIN
     y_bottom = config.GLYPH_Y_OFFSET
     
@@ -393,29 +506,134 @@ def _draw_notdef_glyph(glyph):
     pen.lineTo((inner_x + r, inner_y))
     
     pen.closePath()
+
+
+
+
+# ============================================================================
+# Composite Glyphs
+# ============================================================================
+
+def get_frame_component_name(layout):
+    """Return the name of the shared base glyph holding a layout's frame."""
+    if layout == LAYOUT_PLANE16:
+        return "hexframe.plane16"
+    return "hexframe"
+
+
+def get_digit_component_name(layout, slot, digit):
+    """
+    Return the name of the shared base glyph for a digit drawn in a layout slot.
+    
+    Example: get_digit_component_name(LAYOUT_2X2, 3, 'B') -> 'hexdigit.2x2.3.B'
+    """
+    return f"hexdigit.{layout}.{slot}.{digit}"
+
+
+def _ensure_component_glyph(font, name, draw):
+    """
+    Create an unencoded base glyph on first use.
+    
+    Args:
+        font: FontForge font object
+        name: Glyph name of the component
+        draw: Callable taking a pen that draws the component outline
+    
+    Components are drawn at their final position, so codepoint glyphs reference
+    them with an identity transform. Only components used by a file are created.
+    """
+    if name in font:
+        return
+    
+    component = font.createChar(-1, name)
+    component.width = config.GLYPH_WIDTH
+    pen = component.glyphPen()
+    draw(pen)
     pen = None
 
 
+def get_composite_components(codepoint):
+    """
+    Return the shared components a codepoint glyph is composed of.
+    
+    Args:
+        codepoint: Unicode codepoint value
+    
+    Returns:
+        List of (component_name, draw) tuples, frame first, where draw is a
+        callable taking a pen that draws the component outline in place.
+        None for layouts that are not built from components (U+FFFD, fallback).
+    """
+    layout = get_layout(codepoint)
+    if layout not in DIGIT_LAYOUTS:
+        return None
+    
+    components = [(get_frame_component_name(layout), lambda pen: draw_frame(pen, layout))]
+    slots = get_digit_slots(layout)
+    for slot, digit in enumerate(get_layout_digits(layout, codepoint)):
+        x, y, size = slots[slot]
+        components.append((
+            get_digit_component_name(layout, slot, digit),
+            lambda pen, d=digit, x=x, y=y, size=size: utils.draw_hex_digit(pen, d, x, y, size),
+        ))
+    return components
+
+
+def create_composite_glyph(font, codepoint):
+    """
+    Create a codepoint glyph as references to shared frame and digit glyphs.
+    
+    Args:
+        font: FontForge font object
+        codepoint: Unicode codepoint value (0x0000 to 0x10FFFD)
+    
+    Every digit layout is a frame plus one digit per slot, so a file needs at most
+    2 frames and 16 digits per (layout, slot) as real outlines. Each codepoint
+    glyph then only stores a few component references instead of its own contours.
+    U+FFFD and the fallback square have nothing to share and are drawn directly.
+    """
+    components = get_composite_components(codepoint)
+    if components is None:
+        create_glyph(font, codepoint)
+        return
+    
+    # Make sure every referenced base glyph exists before referencing it
+    for name, draw in components:
+        _ensure_component_glyph(font, name, draw)
+    
+    glyph = font.createChar(codepoint)
+    glyph.width = config.GLYPH_WIDTH
+    glyph.clear()
+    
+    for name, _ in components:
+        glyph.addReference(name)
 
 
 # ============================================================================
 # Main Glyph Creation
 # ============================================================================
 
-def create_glyph(font, codepoint):
+def create_glyph(font, codepoint, composite=False):
     """
     Create a single glyph with appropriate rendering based on Unicode range.
     
     Args:
         font: FontForge font object
         codepoint: Unicode codepoint value (0x0000 to 0x10FFFD)
+        composite: If True, build the glyph from shared component glyphs
+                   (see create_composite_glyph) instead of drawing its own outline
     
     Glyph rendering strategy:
     - U+FFFD: Diagonal X in outlined square
-    - U+0000-U+FFFF: 4-digit hex code in 2x2 grid
+    - U+0000-U+00FF: 2-digit huge hex code
+    - U+0100-U+FFFF: 4-digit hex code in 2x2 grid
     - U+10000-U+FFFFF: 5-digit hex (large plane digit + 2x2 grid)
     - U+100000-U+10FFFD: 4-digit hex in 2x2 grid with vertical divider
     """
+    if composite:
+        create_composite_glyph(font, codepoint)
+        return
+    
     # Create or get glyph
     glyph = font.createChar(codepoint)
     
@@ -426,28 +644,47 @@ def create_glyph(font, codepoint):
     glyph.clear()
     
     # Determine which type of rounded square to draw based on codepoint range
-    if 0x100000 <= codepoint <= 0x10FFFF:
+    layout = get_layout(codepoint)
+    if layout == LAYOUT_PLANE16:
         # Plane 16: Filled rounded square with last 4 hex digits in 2x2 grid
         draw_hex_code_2x2_filled(glyph, codepoint)
-    elif 0x10000 <= codepoint <= 0xFFFFF:
+    elif layout == LAYOUT_5DIGIT_SPLIT:
         # Supplementary Planes 1-15: Outlined square with plane digit + 2x2 grid
         draw_hex_code_5digit_split(glyph, codepoint)
-    elif 0x0000 <= codepoint <= 0xFFFF:
-        # BMP: Check for special cases
-        if codepoint == 0xFFFD:
-            # U+FFFD replacement character: Square with diagonal X
-            draw_replacement_character(glyph)
-        elif 0x0000 <= codepoint <= 0x00FF:
-            # ASCII & Extended ASCII: 2-digit huge display
-            draw_hex_code_2digit(glyph, codepoint)
-        else:
-            # Other BMP (U+0100-U+FFFC): 4-digit hex in 2x2 grid
-            draw_hex_code_2x2(glyph, codepoint)
+    elif layout == LAYOUT_REPLACEMENT:
+        # U+FFFD replacement character: Square with diagonal X
+        draw_replacement_character(glyph)
+    elif layout == LAYOUT_2DIGIT:
+        # ASCII & Extended ASCII: 2-digit huge display
+        draw_hex_code_2digit(glyph, codepoint)
+    elif layout == LAYOUT_2X2:
+        # Other BMP (U+0100-U+FFFC): 4-digit hex in 2x2 grid
+        draw_hex_code_2x2(glyph, codepoint)
     else:
         # Fallback: outlined square (this shouldn't normally be reached)
         _draw_notdef_glyph(glyph)
 
 
+def draw_glyph_outline(pen, codepoint):
+    """
+    Draw the complete outline of a codepoint into any pen.
+    
+    Args:
+        pen: FontForge glyph pen or any pen with moveTo/lineTo/curveTo/closePath
+             (e.g. a fontTools T2CharStringPen)
+        codepoint: Unicode codepoint value (0x0000 to 0x10FFFD)
+    
+    Same rendering strategy as create_glyph, for backends without FontForge glyphs.
+    """
+    layout = get_layout(codepoint)
+    if layout in DIGIT_LAYOUTS:
+        draw_layout_template(pen, layout, codepoint)
+    elif layout == LAYOUT_REPLACEMENT:
+        draw_replacement_outline(pen)
+    else:
+        draw_notdef_outline(pen)
+
+
 def create_notdef_glyph(font):
     """
     Create the .notdef glyph (displayed for undefined characters).
@@ -484,6 +721,10 @@ def validate_font_glyphs(font):
         if glyph.glyphname == ".notdef":
             continue
         
+        # Composite glyphs have no contours of their own, only references
+        if glyph.references:
+            continue
+        
         # Check if glyph has any contours
         if not glyph.foreground or len(glyph.foreground) == 0:
             # Glyph has no outline data
@@ -4,29 +4,263 @@
 FontForge script to generate UnicodeHexMono font.
 Each glyph is a rounded square for all Unicode codepoints U+0000 to U+10FFFF.
 
-Usage: fontforge -script main.py
-Output: UnicodeHexMono.otf
+Usage: fontforge -script main.py [--composite] [--jobs N] [--no-cache] [--cache-dir DIR]
+       python3 main.py --backend fonttools [options]
+       fontforge -script main.py --range U+1F600-1F64F [--formats otf] [--output-dir DIR]
+Output: dist/UnicodeHexMono_<start>_<end>.(otf|woff2) and dist/font.css
+
+Options:
+    --range SPEC   Build only these codepoints, e.g. U+1F600-1F64F or
+                   "U+0-FF, U+2000-206F" (repeatable); written to dist/selection/
+    --codepoints FILE
+                   Build only the codepoints listed in a file (same syntax as
+                   --range, '#' comments)
+    --formats LIST Files to write: otf (or ttf), woff2 (default: both)
+    --output-dir DIR
+                   Directory for the font files and font.css
+    --composite    Build glyphs as references to shared frame/digit glyphs
+                   (TrueType outlines, much smaller files)
+    --jobs N       Build up to N font files at once in worker processes
+    --no-cache     Regenerate every file instead of restoring unchanged ones
+    --cache-dir    Build cache location (default: .build-cache)
+    --backend      fontforge (default) or fonttools, which builds the fonts
+                   with fontTools FontBuilder and does not need FontForge
+    --pipeline-depth N
+                   Drawn files that may wait for WOFF2 conversion while the
+                   next file is drawn (default: 1, 0 = strictly sequential)
+    --web-subset {256,1024,blocks}
+                   Write small per-range or per-Unicode-block files to
+                   dist/web/ instead (blocks needs --blocks-file)
+    --blocks-file  Path to the UCD Blocks.txt file (default: Blocks.txt)
+    --cff-subroutines
+                   With --backend fonttools: emit frames and digits once as CFF
+                   global subroutines (much smaller OTF and WOFF2 files)
+    --colr         With --backend fonttools: also paint glyphs as COLRv1 layers
+                   over shared frame/digit glyphs (implies --composite)
+    --bitmap-strikes LIST
+                   With --backend fonttools: embed pixel-exact bitmap strikes
+                   at these sizes, e.g. 13,14,16 (EBDT/EBLC, at least 13 px)
+    --reproducible Byte-identical rebuilds: fixed font dates (SOURCE_DATE_EPOCH
+                   or config.REPRODUCIBLE_EPOCH), no FontForge timestamp table
+    --hashed-names Rename the files to content-hashed names after the build;
+                   font.css and manifest.json refer to the hashed names
+    --shard i/N    Build only shard i of N (every Nth file of the plan) and
+                   write a shard manifest; font.css is written by --merge
+    --no-resume    Rebuild files an interrupted build already finished
+                   (by default the build resumes from its journal)
+    --merge        Check that all shards finished, then write font.css for
+                   the combined files (pass the same --web-subset as the shards)
 """
 
+import argparse
+
+import bitmaps
 import generator
 import css_generator
 import config
+import reproducible
+from codepoints import CodepointSet, load_codepoints_file, parse_codepoint_ranges
+
+# Values accepted by --formats ('otf' and 'ttf' both mean the outline file)
+OUTPUT_FORMATS = ('otf', 'ttf', 'woff2')
+
+
+def parse_shard(value):
+    """Parse a '--shard i/N' value into (i, N)."""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, e.g. 1/4, got {value!r}")
+    if count < 1 or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"shard index must be between 1 and N, got {value!r}")
+    return index, count
+
+
+def parse_formats(value):
+    """Parse a '--formats otf,woff2' value into a tuple of formats."""
+    formats = tuple(part.strip().lower() for part in value.split(',') if part.strip())
+    unknown = [part for part in formats if part not in OUTPUT_FORMATS]
+    if not formats or unknown:
+        raise argparse.ArgumentTypeError(f"expected a comma-separated list of {', '.join(OUTPUT_FORMATS)}, "
+                                         f"got {value!r}")
+    return formats
+
 
-def main():
+def parse_range(value):
+    """Parse a '--range' value into a CodepointSet."""
+    try:
+        return parse_codepoint_ranges(value)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error))
+
+
+def parse_args(argv=None):
+    """Parse command line options (FontForge passes arguments after the script name)."""
+    parser = argparse.ArgumentParser(description=f"Generate the {config.FONT_NAME} font files.")
+    parser.add_argument(
+        "--range", type=parse_range, action="append", dest="ranges", metavar="SPEC",
+        help="build only these codepoints, e.g. U+1F600-1F64F or 'U+0-FF, U+2000-206F' (repeatable)"
+    )
+    parser.add_argument(
+        "--codepoints", metavar="FILE",
+        help="build only the codepoints listed in FILE (hex codepoints/ranges, '#' comments)"
+    )
+    parser.add_argument(
+        "--formats", type=parse_formats, metavar="LIST",
+        help="comma-separated files to write: otf (ttf in composite mode) and/or woff2 (default: both)"
+    )
+    parser.add_argument(
+        "--output-dir", metavar="DIR",
+        help=f"directory for the font files and font.css (default: dist, {config.WEB_SUBSET_DIR} with "
+             f"--web-subset, {config.SELECTION_DIR} with --range/--codepoints)"
+    )
+    parser.add_argument(
+        "--composite", action="store_true", default=config.COMPOSITE_GLYPHS,
+        help="build codepoint glyphs as references to shared frame and digit glyphs"
+    )
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=1, metavar="N",
+        help="number of worker processes building font files in parallel (default: 1)"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="regenerate every font file instead of restoring unchanged ones from the cache"
+    )
+    parser.add_argument(
+        "--cache-dir", default=config.BUILD_CACHE_DIR, metavar="DIR",
+        help=f"build cache directory (default: {config.BUILD_CACHE_DIR})"
+    )
+    parser.add_argument(
+        "--backend", choices=generator.BACKENDS, default=config.BACKEND,
+        help=f"library that writes the font files (default: {config.BACKEND})"
+    )
+    parser.add_argument(
+        "--pipeline-depth", type=int, default=config.PIPELINE_DEPTH, metavar="N",
+        help="font files that may wait for WOFF2 conversion in a background thread while "
+             f"the next one is drawn; 0 disables overlapping (default: {config.PIPELINE_DEPTH})"
+    )
+    parser.add_argument(
+        "--web-subset", choices=generator.WEB_SUBSETS,
+        help=f"write small files split along Unicode blocks or fixed 256/1024-codepoint "
+             f"boundaries to {config.WEB_SUBSET_DIR}/ instead of the regular files"
+    )
+    parser.add_argument(
+        "--blocks-file", default=config.UNICODE_BLOCKS_FILE, metavar="PATH",
+        help=f"UCD Blocks.txt for --web-subset blocks (default: {config.UNICODE_BLOCKS_FILE})"
+    )
+    parser.add_argument(
+        "--cff-subroutines", action="store_true", default=config.CFF_SUBROUTINES,
+        help="with --backend fonttools, build CFF glyphs from shared global subroutines"
+    )
+    parser.add_argument(
+        "--colr", action="store_true", default=config.COLR_GLYPHS,
+        help="with --backend fonttools, paint codepoint glyphs as COLRv1 layers over shared "
+             "frame and digit glyphs, with composite glyphs as fallback (implies --composite)"
+    )
+    parser.add_argument(
+        "--bitmap-strikes", type=bitmaps.parse_sizes, default=config.BITMAP_STRIKES, metavar="LIST",
+        help="with --backend fonttools, embed pixel-exact EBDT/EBLC bitmap strikes at these "
+             "pixel sizes, e.g. 13,14,16"
+    )
+    parser.add_argument(
+        "--reproducible", action="store_true", default=config.REPRODUCIBLE_BUILDS,
+        help="write the same bytes for the same inputs: font dates from SOURCE_DATE_EPOCH "
+             "(or a fixed date if unset), no FontForge timestamp table"
+    )
+    parser.add_argument(
+        "--hashed-names", action="store_true", default=config.HASHED_FILENAMES,
+        help="rename the font files to content-hashed names (UnicodeHexMono_<start>_<end>.<hash>.otf) "
+             "that can be cached as immutable; font.css and manifest.json refer to them"
+    )
+    parser.add_argument(
+        "--no-resume", action="store_true",
+        help="ignore the journal of an interrupted build and rebuild every file"
+    )
+    parser.add_argument(
+        "--shard", type=parse_shard, metavar="i/N",
+        help="build only shard i of N (1-based) and write its manifest; run --merge afterwards"
+    )
+    parser.add_argument(
+        "--merge", action="store_true",
+        help="check the shard manifests of a sharded build and write font.css for all files"
+    )
+    args = parser.parse_args(argv)
+    args.selection = None
+    if args.ranges or args.codepoints:
+        if args.web_subset:
+            parser.error("--range/--codepoints cannot be combined with --web-subset")
+        selection = list(args.ranges or [])
+        if args.codepoints:
+            try:
+                selection.append(load_codepoints_file(args.codepoints))
+            except (OSError, ValueError) as error:
+                parser.error(f"--codepoints: {error}")
+        args.selection = CodepointSet(r for codepoints in selection for r in codepoints.ranges)
+    if args.shard and args.merge:
+        parser.error("--shard and --merge are separate steps")
+    if args.cff_subroutines and args.backend != generator.BACKEND_FONTTOOLS:
+        parser.error("--cff-subroutines requires --backend fonttools")
+    if args.colr:
+        if args.backend != generator.BACKEND_FONTTOOLS:
+            parser.error("--colr requires --backend fonttools")
+        args.composite = True
+    if args.bitmap_strikes and args.backend != generator.BACKEND_FONTTOOLS:
+        parser.error("--bitmap-strikes requires --backend fonttools")
+    try:
+        reproducible.get_source_date_epoch()
+    except ValueError as error:
+        parser.error(str(error))
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Read by fonttools_backend.build_font (also in forked worker processes)
+    config.CFF_SUBROUTINES = args.cff_subroutines
+    config.COLR_GLYPHS = args.colr
+    config.BITMAP_STRIKES = args.bitmap_strikes
+    config.REPRODUCIBLE_BUILDS = args.reproducible
+    
     print("=" * 70)
     print(f"Creating {config.FONT_NAME} font family...")
     print("=" * 70)
     
-    # Generate font files
-    generator.generate_multi_file()
+    if args.output_dir:
+        output_dir = args.output_dir
+    elif args.selection is not None:
+        output_dir = config.SELECTION_DIR
+    elif args.web_subset:
+        output_dir = config.WEB_SUBSET_DIR
+    else:
+        output_dir = 'dist'
+    
+    # Generate font files (or collect those of every shard)
+    if args.merge:
+        font_files = generator.merge_shards(output_dir)
+    else:
+        font_files = generator.generate_multi_file(
+            composite=args.composite,
+            jobs=args.jobs,
+            cache_dir=None if args.no_cache else args.cache_dir,
+            backend=args.backend,
+            pipeline_depth=max(0, args.pipeline_depth),
+            web_subset=args.web_subset,
+            blocks_file=args.blocks_file,
+            shard=args.shard,
+            resume=not args.no_resume,
+            codepoints=args.selection,
+            output_dir=output_dir,
+            formats=args.formats,
+        )
+    if not font_files or args.shard:
+        return
     
     # Generate CSS file for npm distribution
     print("\n" + "=" * 70)
     print("Generating font.css for npm distribution...")
     print("=" * 70)
-    css_generator.generate_css()
+    css_generator.generate_css(output_dir, hashed_names=args.hashed_names)
 
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,593 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Golden raster hash regression check for UnicodeHexMono glyphs.
+
+Rasterizes a fixed sample of codepoints from every layout (2-digit ASCII, 2x2
+BMP, 5-digit split, plane 16 and U+FFFD) at a few pixel sizes and compares
+them with hashes stored in goldens/raster_hashes.json. Each glyph bitmap gets:
+- An exact hash of its pixels, which must match for the glyph to pass
+- A 64-bit perceptual hash (difference hash of a 9x8 downscale), whose Hamming
+  distance to the golden one shows how far a failing glyph moved
+
+So a change to the drawing code (a faster template, merged contours, a new
+backend) can be shown to render pixel-identical, and a deliberate design
+change shows up as a list of changed glyphs to review before re-recording.
+
+The rasterizer is pure Python: outlines are flattened to line segments and
+filled with the even-odd rule at 4x4 samples per pixel. The digits are drawn
+in the same direction as the filled frame they sit in, so even-odd shows them
+as knockouts and every contour changes the bitmap whatever its direction
+(which also means a flipped contour direction is not detected). Glyphs are
+rendered in batches across a process pool, so the default sample (about
+2,000 glyphs at 3 sizes) checks in a few seconds.
+
+By default the outlines come straight from glyphs.draw_glyph_outline. With
+--font, glyphs are read from built font files instead (needs fonttools).
+Font coordinates are rounded to integers, so compare those with --tolerance.
+
+Usage:
+    python3 raster_check.py check [--font FILE ...] [--tolerance BITS] [--dump DIR] [--jobs N]
+    python3 raster_check.py record [--samples N] [--sizes 12,24,48] [--jobs N]
+"""
+
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import math
+import os
+import random
+import sys
+import time
+
+import config
+import glyphs
+from codepoints import CodepointSet
+
+
+DEFAULT_GOLDEN_PATH = os.path.join('goldens', 'raster_hashes.json')
+
+# Version of the golden file layout
+GOLDEN_FORMAT = 1
+
+# Pixel sizes (em height) rendered by default
+DEFAULT_SIZES = (12, 24, 48)
+
+# Random codepoints sampled per layout on top of the fixed ones
+DEFAULT_SAMPLES = 500
+
+# Seed of the codepoint sample, so re-recording keeps the same codepoints
+SAMPLE_SEED = 0x5EED
+
+# Samples per pixel along each axis (coverage has SUPERSAMPLE^2 + 1 levels)
+SUPERSAMPLE = 4
+
+# 8-bit coverage of each sample count (translate table; counts never exceed SUPERSAMPLE^2)
+COVERAGE_LEVELS = bytes(
+    (count * 255 + SUPERSAMPLE * SUPERSAMPLE // 2) // (SUPERSAMPLE * SUPERSAMPLE)
+    for count in range(SUPERSAMPLE * SUPERSAMPLE + 1)
+).ljust(256, b'\xff')
+
+# Line segments per cubic curve when flattening
+CURVE_STEPS = 8
+
+# Codepoints rendered per worker task
+BATCH_SIZE = 64
+
+
+# ============================================================================
+# Rasterizer
+# ============================================================================
+
+class RasterPen:
+    """
+    Pen that flattens outlines into edges in pixel coordinates.
+
+    Accepts the pen protocol used by the glyph drawing code (moveTo, lineTo,
+    curveTo, closePath) plus qCurveTo, endPath and addComponent for glyphs
+    replayed from TrueType fonts.
+    """
+
+    def __init__(self, size):
+        self.scale = size / config.EM_SIZE
+        self.size = size
+        self.edges = []  # (x0, y0, x1, y1) in pixels, y pointing down
+        self._start = None
+        self._current = None
+
+    def _to_pixels(self, point):
+        x, y = point
+        return x * self.scale, (config.ASCENT - y) * self.scale
+
+    def _add_edge(self, p0, p1):
+        if p0[1] != p1[1]:
+            self.edges.append((p0[0], p0[1], p1[0], p1[1]))
+
+    def moveTo(self, point):
+        self._start = self._current = self._to_pixels(point)
+
+    def lineTo(self, point):
+        point = self._to_pixels(point)
+        self._add_edge(self._current, point)
+        self._current = point
+
+    def curveTo(self, *points):
+        # A cubic per three points (consecutive curves share no implied points here)
+        for i in range(0, len(points) - 2, 3):
+            self._cubic(*(self._to_pixels(p) for p in points[i:i + 3]))
+
+    def qCurveTo(self, *points):
+        if points[-1] is None:
+            raise ValueError("Closed contours without on-curve points are not supported")
+        points = [self._to_pixels(p) for p in points]
+        # Implied on-curve points lie halfway between consecutive off-curve points
+        for i, control in enumerate(points[:-1]):
+            if i < len(points) - 2:
+                following = points[i + 1]
+                end = ((control[0] + following[0]) / 2, (control[1] + following[1]) / 2)
+            else:
+                end = points[-1]
+            self._quadratic(control, end)
+
+    def _cubic(self, c1, c2, end):
+        (x0, y0), (x1, y1), (x2, y2), (x3, y3) = self._current, c1, c2, end
+        for step in range(1, CURVE_STEPS + 1):
+            t = step / CURVE_STEPS
+            u = 1 - t
+            point = (u * u * u * x0 + 3 * u * u * t * x1 + 3 * u * t * t * x2 + t * t * t * x3,
+                     u * u * u * y0 + 3 * u * u * t * y1 + 3 * u * t * t * y2 + t * t * t * y3)
+            self._add_edge(self._current, point)
+            self._current = point
+
+    def _quadratic(self, control, end):
+        (x0, y0), (x1, y1), (x2, y2) = self._current, control, end
+        for step in range(1, CURVE_STEPS + 1):
+            t = step / CURVE_STEPS
+            u = 1 - t
+            point = (u * u * x0 + 2 * u * t * x1 + t * t * x2,
+                     u * u * y0 + 2 * u * t * y1 + t * t * y2)
+            self._add_edge(self._current, point)
+            self._current = point
+
+    def closePath(self):
+        if self._current is not None and self._current != self._start:
+            self._add_edge(self._current, self._start)
+        self._start = self._current = None
+
+    endPath = closePath
+
+    def addComponent(self, glyph_name, transformation):
+        raise ValueError("Components must be decomposed before rasterizing")
+
+
+def rasterize_samples(edges, size):
+    """
+    Fill flattened outline edges with the even-odd rule, counting samples.
+
+    Args:
+        edges: (x0, y0, x1, y1) segments in pixels (from RasterPen)
+        size: Bitmap height in pixels (the em); the width is GLYPH_WIDTH scaled
+
+    Returns:
+        Tuple (width, height, bytes): covered samples per pixel (0 to
+        SUPERSAMPLE^2), one byte per pixel, rows top to bottom
+    """
+    width = math.ceil(config.GLYPH_WIDTH * size / config.EM_SIZE)
+    height = size
+    samples = SUPERSAMPLE
+
+    # Edges as (top, bottom, x at top, dx per unit of y), sorted by top
+    prepared = []
+    for x0, y0, x1, y1 in edges:
+        if y0 > y1:
+            x0, y0, x1, y1 = x1, y1, x0, y0
+        prepared.append((y0, y1, x0, (x1 - x0) / (y1 - y0)))
+    prepared.sort()
+
+    coverage = bytearray()
+    sample_columns = width * samples
+    active = []
+    next_edge = 0
+
+    for pixel_row in range(height):
+        # Samples per pixel: partial pixels directly, runs of full pixels as a difference array
+        partial = [0] * (width + 1)
+        full_runs = [0] * (width + 1)
+
+        for sub_row in range(samples):
+            y = pixel_row + (sub_row + 0.5) / samples
+            while next_edge < len(prepared) and prepared[next_edge][0] <= y:
+                active.append(prepared[next_edge])
+                next_edge += 1
+            active = [edge for edge in active if edge[1] > y]
+            if not active:
+                continue
+
+            crossings = sorted((x + (y - top) * slope) * samples for top, _, x, slope in active)
+
+            # Every other crossing starts a filled span
+            for span_start, span_end in zip(crossings[::2], crossings[1::2]):
+                # Sample columns whose centers (c + 0.5) lie in [span_start, span_end)
+                first = min(max(math.ceil(span_start - 0.5), 0), sample_columns)
+                last = min(max(math.ceil(span_end - 0.5), 0), sample_columns)
+                if first >= last:
+                    continue
+                first_pixel, first_offset = divmod(first, samples)
+                last_pixel, last_offset = divmod(last, samples)
+                if first_pixel == last_pixel:
+                    partial[first_pixel] += last - first
+                    continue
+                partial[first_pixel] += samples - first_offset
+                partial[last_pixel] += last_offset
+                full_runs[first_pixel + 1] += samples
+                full_runs[last_pixel] -= samples
+
+        run = 0
+        for column in range(width):
+            run += full_runs[column]
+            coverage.append(partial[column] + run)
+
+    return width, height, bytes(coverage)
+
+
+def rasterize(edges, size):
+    """
+    Fill flattened outline edges with the even-odd rule.
+
+    Returns:
+        Tuple (width, height, bytes): 8-bit coverage, one byte per pixel, rows
+        top to bottom (see rasterize_samples for the arguments)
+    """
+    width, height, samples = rasterize_samples(edges, size)
+    return width, height, samples.translate(COVERAGE_LEVELS)
+
+
+def perceptual_hash(width, height, pixels):
+    """
+    Return the 64-bit difference hash of a bitmap as 16 hex digits.
+
+    The bitmap is area-averaged down to 9x8 pixels; each bit tells whether a
+    pixel is brighter than its right neighbour.
+    """
+    cells = []
+    for cell_y in range(8):
+        y0, y1 = cell_y * height // 8, max((cell_y + 1) * height // 8, cell_y * height // 8 + 1)
+        row = []
+        for cell_x in range(9):
+            x0, x1 = cell_x * width // 9, max((cell_x + 1) * width // 9, cell_x * width // 9 + 1)
+            total = sum(sum(pixels[y * width + x0:y * width + x1]) for y in range(y0, y1))
+            row.append(total / ((y1 - y0) * (x1 - x0)))
+        cells.append(row)
+
+    value = 0
+    for row in cells:
+        for left, right in zip(row, row[1:]):
+            value = (value << 1) | (left > right)
+    return f"{value:016x}"
+
+
+def hash_bitmap(width, height, pixels):
+    """Return (exact hash, perceptual hash) strings of a bitmap."""
+    exact = hashlib.sha256(f"{width}x{height}:".encode() + pixels).hexdigest()[:16]
+    return exact, perceptual_hash(width, height, pixels)
+
+
+def hamming_distance(first, second):
+    """Number of differing bits between two hex perceptual hashes."""
+    return bin(int(first, 16) ^ int(second, 16)).count('1')
+
+
+# ============================================================================
+# Glyph Sources
+# ============================================================================
+
+# Per worker process: font files given with --font, opened on first use
+_fonts = None
+
+
+def _init_worker(font_paths):
+    global _fonts
+    _fonts = {'paths': font_paths, 'cmap': None, 'glyph_sets': {}}
+
+
+def _font_glyph_recording(codepoint):
+    """Return a decomposed recording of a codepoint's glyph in the --font files, or None."""
+    from fontTools.pens.recordingPen import DecomposingRecordingPen
+    from fontTools.ttLib import TTFont
+
+    if _fonts['cmap'] is None:
+        # Codepoint -> font path, first file wins
+        _fonts['cmap'] = {}
+        for path in _fonts['paths']:
+            font = TTFont(path, lazy=True)
+            for cp, name in font['cmap'].getBestCmap().items():
+                _fonts['cmap'].setdefault(cp, (path, name))
+            font.close()
+
+    entry = _fonts['cmap'].get(codepoint)
+    if entry is None:
+        return None
+    path, name = entry
+    if path not in _fonts['glyph_sets']:
+        _fonts['glyph_sets'][path] = TTFont(path, lazy=True).getGlyphSet()
+    glyph_set = _fonts['glyph_sets'][path]
+    recording = DecomposingRecordingPen(glyph_set)
+    glyph_set[name].draw(recording)
+    return recording
+
+
+def render_glyph(codepoint, size):
+    """
+    Rasterize one codepoint at one pixel size.
+
+    Returns:
+        Tuple (width, height, bytes), or None if the --font files lack the codepoint
+    """
+    pen = RasterPen(size)
+    if _fonts and _fonts['paths']:
+        recording = _font_glyph_recording(codepoint)
+        if recording is None:
+            return None
+        recording.replay(pen)
+    else:
+        glyphs.draw_glyph_outline(pen, codepoint)
+    return rasterize(pen.edges, size)
+
+
+def _render_batch(codepoints, sizes, dump_dir=None):
+    """Worker: hash a batch of codepoints at every size, {hex codepoint: {size: [exact, perceptual]}}."""
+    results = {}
+    for codepoint in codepoints:
+        hashes = {}
+        for size in sizes:
+            bitmap = render_glyph(codepoint, size)
+            if bitmap is None:
+                break
+            hashes[str(size)] = list(hash_bitmap(*bitmap))
+            if dump_dir:
+                write_pgm(os.path.join(dump_dir, f"U+{codepoint:04X}-{size}px.pgm"), *bitmap)
+        else:
+            results[f"{codepoint:04X}"] = hashes
+    return results
+
+
+def write_pgm(path, width, height, pixels):
+    """Write a bitmap as a binary PGM image (black glyph on white)."""
+    with open(path, 'wb') as f:
+        f.write(f"P5 {width} {height} 255\n".encode('ascii'))
+        f.write(bytes(255 - value for value in pixels))
+
+
+def render_all(codepoints, sizes, jobs=None, font_paths=(), dump_dir=None):
+    """
+    Hash the bitmaps of many codepoints, in batches across worker processes.
+
+    Args:
+        codepoints: Codepoints to render
+        sizes: Pixel sizes
+        jobs: Worker processes (None = one per CPU, 1 = in this process)
+        font_paths: Font files to read glyphs from instead of the drawing code
+        dump_dir: Write every bitmap as a PGM image into this directory
+
+    Returns:
+        Dict of hex codepoint -> {size: [exact hash, perceptual hash]}
+    """
+    batches = [codepoints[i:i + BATCH_SIZE] for i in range(0, len(codepoints), BATCH_SIZE)]
+    results = {}
+    if jobs == 1:
+        _init_worker(list(font_paths))
+        for batch in batches:
+            results.update(_render_batch(batch, sizes, dump_dir))
+        return results
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                                initargs=(list(font_paths),)) as pool:
+        futures = [pool.submit(_render_batch, batch, sizes, dump_dir) for batch in batches]
+        for future in futures:
+            results.update(future.result())
+    return results
+
+
+# ============================================================================
+# Codepoint Sample
+# ============================================================================
+
+def sample_codepoints(samples=DEFAULT_SAMPLES, seed=SAMPLE_SEED):
+    """
+    Pick the codepoints to check, covering every layout.
+
+    Always includes all of U+0000-00FF, U+FFFD, the first and last codepoint
+    of each layout and every hex digit repeated in all slots (U+1111, U+AAAAA,
+    U+10CCCC, ...); adds `samples` random valid codepoints per multi-digit layout.
+
+    Returns:
+        Sorted list of codepoints
+    """
+    valid = CodepointSet.valid_codepoints()
+    rng = random.Random(seed)
+    chosen = set(range(0x0000, 0x0100))
+    chosen.add(0xFFFD)
+
+    layout_ranges = (
+        (0x0100, 0xFFFF, 4, 0x0000),       # 2x2
+        (0x10000, 0xFFFFF, 5, 0x00000),    # 5-digit split
+        (0x100000, 0x10FFFD, 4, 0x100000),  # plane 16 (last 4 digits shown)
+    )
+    for first, last, digits, prefix in layout_ranges:
+        layout_codepoints = valid.restrict(first, last)
+        chosen.add(layout_codepoints[0])
+        chosen.add(layout_codepoints[-1])
+        for digit in '0123456789ABCDEF':
+            codepoint = prefix | int(digit * digits, 16)
+            if codepoint in layout_codepoints:
+                chosen.add(codepoint)
+        for _ in range(samples):
+            chosen.add(layout_codepoints[rng.randrange(len(layout_codepoints))])
+
+    return sorted(cp for cp in chosen if cp in valid)
+
+
+# ============================================================================
+# Golden File
+# ============================================================================
+
+def record(output_path, samples, sizes, jobs=None):
+    """Render the sample and write it as the new golden file."""
+    codepoints = sample_codepoints(samples)
+    print(f"Rendering {len(codepoints):,} codepoints at {', '.join(map(str, sizes))} px...")
+    start = time.time()
+    hashes = render_all(codepoints, sizes, jobs)
+    elapsed = time.time() - start
+
+    header = {
+        'format': GOLDEN_FORMAT,
+        'sizes': list(sizes),
+        'supersample': SUPERSAMPLE,
+        'curve_steps': CURVE_STEPS,
+    }
+    # One line per codepoint, so re-recording after a design change gives a readable diff
+    lines = [f"  {json.dumps(cp)}: {json.dumps([hashes[cp][str(size)] for size in sizes])}"
+             for cp in sorted(hashes, key=lambda cp: int(cp, 16))]
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(header)[:-1] + ', "glyphs": {\n')
+        f.write(',\n'.join(lines))
+        f.write('\n}}\n')
+    print(f"✓ Recorded {len(hashes):,} glyphs × {len(sizes)} sizes to {output_path} ({elapsed:.1f}s)")
+
+
+def check(golden_path, jobs=None, font_paths=(), tolerance=None, dump_dir=None):
+    """
+    Render the codepoints of the golden file and compare their hashes.
+
+    Args:
+        golden_path: Golden file written by record()
+        jobs: Worker processes
+        font_paths: Font files to read glyphs from instead of the drawing code
+        tolerance: None to require identical pixels; otherwise the largest
+                   perceptual hash distance (bits) accepted for changed pixels
+        dump_dir: Write the bitmaps of failing glyphs as PGM images here
+
+    Returns:
+        Number of failing glyph/size pairs
+    """
+    with open(golden_path, 'r', encoding='utf-8') as f:
+        golden = json.load(f)
+    if golden.get('format') != GOLDEN_FORMAT:
+        print(f"ERROR: {golden_path} has format {golden.get('format')}, expected {GOLDEN_FORMAT}")
+        return 1
+    if (golden['supersample'], golden['curve_steps']) != (SUPERSAMPLE, CURVE_STEPS):
+        print(f"ERROR: {golden_path} was recorded with different rasterizer settings, re-record it")
+        return 1
+
+    sizes = golden['sizes']
+    codepoints = [int(cp, 16) for cp in golden['glyphs']]
+    source = ', '.join(font_paths) if font_paths else 'glyphs.draw_glyph_outline'
+    print(f"Checking {len(codepoints):,} codepoints at {', '.join(map(str, sizes))} px from {source}...")
+    start = time.time()
+    hashes = render_all(codepoints, sizes, jobs, font_paths)
+    elapsed = time.time() - start
+
+    missing = [cp for cp in golden['glyphs'] if cp not in hashes]
+    failures = []
+    near = 0
+    for cp, expected_sizes in golden['glyphs'].items():
+        if cp not in hashes:
+            continue
+        for size, (exact, perceptual) in zip(sizes, expected_sizes):
+            actual_exact, actual_perceptual = hashes[cp][str(size)]
+            if actual_exact == exact:
+                continue
+            distance = hamming_distance(actual_perceptual, perceptual)
+            if tolerance is not None and distance <= tolerance:
+                near += 1
+                continue
+            failures.append((int(cp, 16), size, distance))
+
+    if missing:
+        print(f"⚠ {len(missing):,} codepoints are not in the font files and were skipped")
+    if near:
+        print(f"⚠ {near:,} glyph bitmaps differ within the perceptual tolerance of {tolerance} bits")
+
+    if failures:
+        by_layout = {}
+        for codepoint, size, distance in failures:
+            by_layout.setdefault(glyphs.get_layout(codepoint), []).append((codepoint, size, distance))
+        for layout, entries in sorted(by_layout.items()):
+            print(f"ERROR: {len(entries):,} {layout} bitmaps differ from the goldens")
+            for codepoint, size, distance in entries[:10]:
+                print(f"  U+{codepoint:04X} at {size}px (perceptual distance {distance} bits)")
+            if len(entries) > 10:
+                print(f"  ... and {len(entries) - 10:,} more")
+        if dump_dir:
+            os.makedirs(dump_dir, exist_ok=True)
+            failed = sorted({codepoint for codepoint, _, _ in failures})
+            render_all(failed, sizes, jobs, font_paths, dump_dir)
+            print(f"  Bitmaps of the {len(failed):,} failing codepoints written to {dump_dir}/")
+        print(f"\n⚠ {len(failures):,} of {len(hashes) * len(sizes):,} bitmaps differ ({elapsed:.1f}s)")
+    else:
+        print(f"\n✓ {len(hashes) * len(sizes):,} bitmaps match the goldens ({elapsed:.1f}s)")
+    return len(failures)
+
+
+# ============================================================================
+# Command Line
+# ============================================================================
+
+def parse_sizes(value):
+    """Parse a '--sizes 12,24,48' value."""
+    try:
+        sizes = tuple(int(part) for part in value.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated pixel sizes, got {value!r}")
+    if not sizes or min(sizes) < 8:
+        raise argparse.ArgumentTypeError("pixel sizes must be at least 8")
+    return sizes
+
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Golden raster hash regression check for glyph drawing.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    check_parser = subparsers.add_parser("check", help="compare rendered glyphs with the goldens")
+    check_parser.add_argument("--golden", default=DEFAULT_GOLDEN_PATH, metavar="PATH",
+                              help=f"golden file (default: {DEFAULT_GOLDEN_PATH})")
+    check_parser.add_argument("--font", nargs='+', default=(), metavar="FILE",
+                              help="read glyphs from these built font files instead of the drawing code")
+    check_parser.add_argument("--tolerance", type=int, default=None, metavar="BITS",
+                              help="accept changed pixels up to this perceptual hash distance "
+                                   "(default: pixels must be identical)")
+    check_parser.add_argument("--dump", metavar="DIR",
+                              help="write the bitmaps of failing codepoints as PGM images to DIR")
+    check_parser.add_argument("--jobs", type=int, default=None, metavar="N",
+                              help="worker processes (default: one per CPU)")
+
+    record_parser = subparsers.add_parser("record", help="render the sample and write new goldens")
+    record_parser.add_argument("-o", "--output", default=DEFAULT_GOLDEN_PATH, metavar="PATH",
+                               help=f"golden file (default: {DEFAULT_GOLDEN_PATH})")
+    record_parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES, metavar="N",
+                               help=f"random codepoints per multi-digit layout (default: {DEFAULT_SAMPLES})")
+    record_parser.add_argument("--sizes", type=parse_sizes, default=DEFAULT_SIZES, metavar="LIST",
+                               help=f"pixel sizes (default: {','.join(map(str, DEFAULT_SIZES))})")
+    record_parser.add_argument("--jobs", type=int, default=None, metavar="N",
+                               help="worker processes (default: one per CPU)")
+
+    args = parser.parse_args()
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    return args
+
+
+def main():
+    args = parse_args()
+    if args.command == "record":
+        record(args.output, args.samples, args.sizes, args.jobs)
+        return
+    failures = check(args.golden, args.jobs, tuple(args.font), args.tolerance, args.dump)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reproducible (byte-identical) builds for UnicodeHexMono.
+
+A font file is only worth a new CDN or artifact cache entry if its glyphs
+changed. The bytes of a build depend on nothing but its inputs when:
+- The head table created/modified dates are fixed: SOURCE_DATE_EPOCH
+  (https://reproducible-builds.org/specs/source-date-epoch/) if it is set,
+  otherwise config.REPRODUCIBLE_EPOCH in reproducible mode (main.py
+  --reproducible). FontForge output is patched after font.generate, because
+  not every FontForge version honors SOURCE_DATE_EPOCH, and its FFTM
+  timestamp table is left out
+- The name table has no dates (the unique ID is set explicitly instead of
+  FontForge's default, which contains the build date)
+- WOFF2 files are compressed from the OTF/TTF tables as they are, without
+  fontTools recompiling them or restamping head.modified
+- The glyph order is the sorted order of the chunk plan in both backends
+
+`check` builds the same options twice (with different PYTHONHASHSEED values,
+so set iteration order cannot leak into the output) and compares the SHA-256
+of every file; for font files that differ it lists the tables that differ.
+
+Usage:
+    python3 reproducible.py check [--work-dir DIR] [--keep] [main.py options]
+
+Examples:
+    python3 reproducible.py check --backend fonttools --range U+0000-0FFF
+    python3 reproducible.py check --range U+1F600-1F64F --composite   # runs fontforge -script
+"""
+
+import argparse
+import calendar
+import hashlib
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+
+import config
+
+
+# Seconds from 1904-01-01 (OpenType LONGDATETIME epoch) to 1970-01-01
+OPENTYPE_EPOCH_OFFSET = calendar.timegm((1970, 1, 1, 0, 0, 0)) - calendar.timegm((1904, 1, 1, 0, 0, 0))
+
+# head table: byte offsets of checkSumAdjustment and the created/modified dates
+HEAD_CHECKSUM_ADJUSTMENT_OFFSET = 8
+HEAD_CREATED_OFFSET = 20
+
+# Whole-font checksum target (OpenType head.checkSumAdjustment)
+SFNT_CHECKSUM_MAGIC = 0xB1B0AFBA
+
+# PYTHONHASHSEED of the two builds of `check`
+CHECK_HASH_SEEDS = ('1', '2')
+
+
+# ============================================================================
+# Timestamps
+# ============================================================================
+
+def get_source_date_epoch():
+    """
+    Read SOURCE_DATE_EPOCH from the environment.
+
+    Returns:
+        Unix time in seconds, or None if the variable is not set
+
+    Raises:
+        ValueError: If it is not a non-negative integer
+    """
+    value = os.environ.get('SOURCE_DATE_EPOCH')
+    if value is None:
+        return None
+    if not value.strip().isdigit():
+        raise ValueError(f"SOURCE_DATE_EPOCH must be a non-negative integer, got {value!r}")
+    return int(value)
+
+
+def get_build_timestamp():
+    """
+    Return the Unix time to write as the font dates, or None for the current time.
+
+    SOURCE_DATE_EPOCH wins if it is set; otherwise reproducible builds
+    (config.REPRODUCIBLE_BUILDS) use config.REPRODUCIBLE_EPOCH.
+    """
+    epoch = get_source_date_epoch()
+    if epoch is None and config.REPRODUCIBLE_BUILDS:
+        epoch = config.REPRODUCIBLE_EPOCH
+    return epoch
+
+
+def to_opentype_timestamp(unix_time):
+    """Convert Unix time to an OpenType LONGDATETIME (seconds since 1904-01-01)."""
+    return unix_time + OPENTYPE_EPOCH_OFFSET
+
+
+def describe_timestamp(unix_time):
+    """Format Unix time as an ISO 8601 UTC date, e.g. '2025-12-28T00:00:00Z'."""
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(unix_time))
+
+
+# ============================================================================
+# Patching sfnt Files
+# ============================================================================
+
+def sfnt_checksum(data):
+    """Return the OpenType checksum (sum of big-endian uint32 words) of bytes."""
+    padded = bytes(data) + b'\0' * (-len(data) % 4)
+    return sum(struct.unpack(f'>{len(padded) // 4}I', padded)) & 0xFFFFFFFF
+
+
+def pin_sfnt_timestamps(data, unix_time):
+    """
+    Set the head created/modified dates of OTF/TTF file bytes.
+
+    Only the two dates and the checksums that cover them change; every other
+    byte is kept, so no table is recompiled.
+
+    Args:
+        data: OTF/TTF file bytes
+        unix_time: Date to write, as Unix time
+
+    Returns:
+        Patched file bytes
+
+    Raises:
+        ValueError: If the data has no head table
+    """
+    data = bytearray(data)
+    num_tables = struct.unpack_from('>H', data, 4)[0]
+    for index in range(num_tables):
+        record = 12 + 16 * index
+        tag, _, offset, length = struct.unpack_from('>4sIII', data, record)
+        if tag == b'head':
+            break
+    else:
+        raise ValueError("font has no head table")
+
+    timestamp = to_opentype_timestamp(unix_time)
+    struct.pack_into('>I', data, offset + HEAD_CHECKSUM_ADJUSTMENT_OFFSET, 0)
+    struct.pack_into('>qq', data, offset + HEAD_CREATED_OFFSET, timestamp, timestamp)
+    struct.pack_into('>I', data, record + 4, sfnt_checksum(data[offset:offset + length]))
+    adjustment = (SFNT_CHECKSUM_MAGIC - sfnt_checksum(data)) & 0xFFFFFFFF
+    struct.pack_into('>I', data, offset + HEAD_CHECKSUM_ADJUSTMENT_OFFSET, adjustment)
+    return bytes(data)
+
+
+def pin_font_file_timestamps(path, unix_time):
+    """Set the head created/modified dates of an OTF/TTF file in place."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(path, 'wb') as f:
+        f.write(pin_sfnt_timestamps(data, unix_time))
+
+
+# ============================================================================
+# Build Twice and Compare
+# ============================================================================
+
+def hash_tree(directory):
+    """
+    Hash every file below a directory (hidden files and directories excluded).
+
+    Returns:
+        Dict of relative path -> hex SHA-256
+    """
+    digests = {}
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(name for name in dirs if not name.startswith('.'))
+        for name in sorted(files):
+            if name.startswith('.'):
+                continue
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                digests[os.path.relpath(path, directory)] = hashlib.sha256(f.read()).hexdigest()
+    return digests
+
+
+def read_font_tables(path):
+    """
+    Read the raw (decompressed) tables of an OTF/TTF/WOFF2 file.
+
+    Returns:
+        Dict of tag -> bytes, or None if fonttools is not installed
+    """
+    try:
+        from fontTools.ttLib import TTFont
+    except ImportError:
+        return None
+
+    font = TTFont(path, lazy=True)
+    try:
+        return {tag: font.reader[tag] for tag in font.reader.keys()}
+    finally:
+        font.close()
+
+
+def diff_font_tables(first_path, second_path):
+    """Return the tags of the tables that differ between two font files (None without fonttools)."""
+    first = read_font_tables(first_path)
+    second = read_font_tables(second_path)
+    if first is None or second is None:
+        return None
+    return sorted(tag for tag in set(first) | set(second) if first.get(tag) != second.get(tag))
+
+
+def get_build_command(build_args):
+    """Return the command that runs main.py with build_args under the backend's interpreter."""
+    import generator
+    from main import parse_args as parse_build_args
+
+    options = parse_build_args(build_args)
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+    if options.backend == generator.BACKEND_FONTTOOLS:
+        return [sys.executable, script] + build_args
+    return ['fontforge', '-script', script] + build_args
+
+
+def run_build(command, output_dir, hash_seed):
+    """Run one build into output_dir; returns True if it succeeded."""
+    env = dict(os.environ, PYTHONHASHSEED=hash_seed)
+    args = command + ['--output-dir', output_dir, '--no-cache', '--no-resume', '--reproducible']
+    print(f"\n$ PYTHONHASHSEED={hash_seed} {' '.join(args)}")
+    started = time.time()
+    result = subprocess.run(args, env=env, stdout=subprocess.DEVNULL)
+    if result.returncode != 0:
+        print(f"ERROR: build failed with exit status {result.returncode}")
+        return False
+    print(f"✓ Built in {time.time() - started:.1f}s")
+    return True
+
+
+def check_reproducible(build_args, work_dir, keep=False):
+    """
+    Build twice with the same options and compare the output hashes.
+
+    Both builds write to the same path (the first is moved aside), so paths
+    that end up in font.css are the same.
+
+    Args:
+        build_args: main.py options (not --output-dir)
+        work_dir: Directory for the two builds
+        keep: Keep the build outputs for inspection
+
+    Returns:
+        List of error messages (empty if both builds are byte-identical)
+    """
+    errors = []
+
+    def fail(message):
+        errors.append(message)
+        print(f"ERROR: {message}")
+
+    command = get_build_command(build_args)
+    output_dir = os.path.join(work_dir, 'dist')
+    first_dir = os.path.join(work_dir, 'first')
+    for path in (output_dir, first_dir):
+        shutil.rmtree(path, ignore_errors=True)
+
+    try:
+        if not run_build(command, output_dir, CHECK_HASH_SEEDS[0]):
+            return ["first build failed"]
+        os.rename(output_dir, first_dir)
+        if not run_build(command, output_dir, CHECK_HASH_SEEDS[1]):
+            return ["second build failed"]
+
+        first = hash_tree(first_dir)
+        second = hash_tree(output_dir)
+        print()
+        for name in sorted(set(first) | set(second)):
+            if name not in second:
+                fail(f"{name}: only written by the first build")
+            elif name not in first:
+                fail(f"{name}: only written by the second build")
+            elif first[name] != second[name]:
+                tables = None
+                if name.endswith(('.otf', '.ttf', '.woff2')):
+                    tables = diff_font_tables(os.path.join(first_dir, name), os.path.join(output_dir, name))
+                detail = f" (tables: {', '.join(tables) or 'none, only the container'})" if tables is not None else ""
+                fail(f"{name}: SHA-256 differs{detail}")
+        if not first:
+            fail("the builds wrote no files")
+        if not errors:
+            print(f"✓ {len(first)} files are byte-identical in both builds")
+    finally:
+        if keep:
+            print(f"  Builds kept in {first_dir}/ and {output_dir}/")
+        else:
+            shutil.rmtree(first_dir, ignore_errors=True)
+            shutil.rmtree(output_dir, ignore_errors=True)
+    return errors
+
+
+# ============================================================================
+# Command Line
+# ============================================================================
+
+def parse_args():
+    """Parse command line options; unknown options are passed to main.py."""
+    parser = argparse.ArgumentParser(
+        description="Check that two builds with the same options are byte-identical.",
+        epilog="Other options (--backend, --range, --composite, ...) are passed to main.py.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    check_parser = subparsers.add_parser("check", help="build twice and compare the file hashes")
+    check_parser.add_argument("--work-dir", metavar="DIR",
+                              help="directory for the two builds (default: a temporary directory)")
+    check_parser.add_argument("--keep", action="store_true",
+                              help="keep both builds for inspection")
+    args, build_args = parser.parse_known_args()
+    if any(arg == '--output-dir' or arg.startswith('--output-dir=') for arg in build_args):
+        parser.error("--output-dir is set by the check; use --work-dir")
+    try:
+        get_source_date_epoch()
+    except ValueError as e:
+        parser.error(str(e))
+    args.build_args = build_args
+    return args
+
+
+def main():
+    args = parse_args()
+    timestamp = get_source_date_epoch()
+    source = "SOURCE_DATE_EPOCH" if timestamp is not None else "config.REPRODUCIBLE_EPOCH"
+    if timestamp is None:
+        timestamp = config.REPRODUCIBLE_EPOCH
+    print(f"Font dates: {describe_timestamp(timestamp)} ({source})")
+
+    if args.work_dir:
+        os.makedirs(args.work_dir, exist_ok=True)
+        errors = check_reproducible(args.build_args, args.work_dir, args.keep)
+    else:
+        work_dir = tempfile.mkdtemp(prefix='uhm-reproducible-')
+        try:
+            errors = check_reproducible(args.build_args, work_dir, args.keep)
+        finally:
+            if not args.keep:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+    if errors:
+        print(f"\n⚠ {len(errors)} difference(s): the build is not reproducible")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
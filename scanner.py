@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming scanner for invisible and non-renderable codepoints in text files.
+
+UnicodeHexMono shows codepoints that are otherwise invisible or unrenderable
+as hex boxes. This module finds the same codepoints in large files without a
+browser, for triaging text corruption in logs and dumps:
+- Files are memory-mapped and decoded as UTF-8 one block at a time, so
+  multi-GB files are scanned in constant memory
+- Candidates are found by one compiled regular expression per category set;
+  only matches are classified in Python
+- Every finding reports its byte offset, line number, category and the
+  glyph layout UnicodeHexMono renders it with (see glyphs.get_layout)
+- Bytes that are not valid UTF-8 are reported too (browsers show them as
+  U+FFFD)
+
+Categories:
+    control       - C0/C1 control characters (Cc) other than tab, LF and CR
+    format        - Invisible formatting characters (Cf): zero-width spaces
+                    and joiners, bidi marks and overrides, BOM, tags
+    invisible     - Other default-ignorable characters: variation selectors,
+                    Hangul fillers, combining grapheme joiner
+    space         - Whitespace other than U+0020 (Zs, Zl, Zp)
+    private-use   - Private use characters (Co)
+    noncharacter  - U+FDD0-U+FDEF and U+nFFFE/U+nFFFF
+    replacement   - U+FFFD REPLACEMENT CHARACTER
+    invalid-utf8  - Bytes that do not decode as UTF-8
+    unassigned    - Codepoints unassigned in Python's Unicode database
+                    (not scanned unless requested)
+
+Usage:
+    python3 scanner.py app.log [more files...] [--categories format,control]
+    python3 scanner.py dump.txt --summary
+    cat app.log | python3 scanner.py -
+
+Exits with status 1 if anything was reported, like grep with a match.
+"""
+
+import argparse
+import codecs
+import collections
+import functools
+import mmap
+import re
+import sys
+import unicodedata
+
+import config
+import glyphs
+import utils
+
+
+CATEGORY_CONTROL = 'control'
+CATEGORY_FORMAT = 'format'
+CATEGORY_INVISIBLE = 'invisible'
+CATEGORY_SPACE = 'space'
+CATEGORY_PRIVATE_USE = 'private-use'
+CATEGORY_NONCHARACTER = 'noncharacter'
+CATEGORY_REPLACEMENT = 'replacement'
+CATEGORY_INVALID_UTF8 = 'invalid-utf8'
+CATEGORY_UNASSIGNED = 'unassigned'
+
+CATEGORIES = (
+    CATEGORY_CONTROL, CATEGORY_FORMAT, CATEGORY_INVISIBLE, CATEGORY_SPACE,
+    CATEGORY_PRIVATE_USE, CATEGORY_NONCHARACTER, CATEGORY_REPLACEMENT,
+    CATEGORY_INVALID_UTF8, CATEGORY_UNASSIGNED,
+)
+DEFAULT_CATEGORIES = tuple(c for c in CATEGORIES if c != CATEGORY_UNASSIGNED)
+
+# Controls that are expected in text files
+DEFAULT_IGNORED = frozenset({0x09, 0x0A, 0x0D})
+
+# Default-ignorable codepoints that are not Cf (DerivedCoreProperties.txt)
+DEFAULT_IGNORABLE_RANGES = (
+    (0x034F, 0x034F),    # COMBINING GRAPHEME JOINER
+    (0x115F, 0x1160),    # HANGUL CHOSEONG/JUNGSEONG FILLER
+    (0x17B4, 0x17B5),    # KHMER VOWEL INHERENT AQ/AA
+    (0x180B, 0x180D),    # MONGOLIAN FREE VARIATION SELECTORS
+    (0x180F, 0x180F),    # MONGOLIAN FREE VARIATION SELECTOR FOUR
+    (0x3164, 0x3164),    # HANGUL FILLER
+    (0xFE00, 0xFE0F),    # VARIATION SELECTORS
+    (0xFFA0, 0xFFA0),    # HALFWIDTH HANGUL FILLER
+    (0xE0100, 0xE01EF),  # VARIATION SELECTORS SUPPLEMENT
+)
+
+# Undecodable bytes 0x80-0xFF become lone surrogates U+DC80-U+DCFF (PEP 383)
+ESCAPED_BYTE_START = 0xDC80
+ESCAPED_BYTE_END = 0xDCFF
+
+# Bytes decoded per step (mmap slices are not copied until decoded)
+BLOCK_SIZE = 1 << 20
+
+Finding = collections.namedtuple('Finding', 'offset line codepoint category layout name')
+Finding.__doc__ = """
+A reported codepoint.
+
+Fields:
+    offset: Byte offset of the codepoint in the file
+    line: 1-based line number
+    codepoint: Codepoint value (the byte value for invalid-utf8)
+    category: One of CATEGORIES
+    layout: glyphs.LAYOUT_* the font renders it with
+    name: Unicode character name, or a description when it has none
+"""
+
+
+# ============================================================================
+# Classification
+# ============================================================================
+
+def classify(codepoint):
+    """
+    Return the scanner category of a codepoint.
+
+    Args:
+        codepoint: Unicode codepoint value
+
+    Returns:
+        One of CATEGORIES, or None for ordinary visible characters
+    """
+    if codepoint == 0xFFFD:
+        return CATEGORY_REPLACEMENT
+    if config.SURROGATE_START <= codepoint <= config.SURROGATE_END:
+        return CATEGORY_INVALID_UTF8
+    if not utils.is_valid_codepoint(codepoint):
+        return CATEGORY_NONCHARACTER
+
+    category = unicodedata.category(chr(codepoint))
+    if category == 'Cc':
+        return CATEGORY_CONTROL
+    if category == 'Cf':
+        return CATEGORY_FORMAT
+    if category == 'Co':
+        return CATEGORY_PRIVATE_USE
+    if category in ('Zl', 'Zp') or (category == 'Zs' and codepoint != 0x20):
+        return CATEGORY_SPACE
+    if any(start <= codepoint <= end for start, end in DEFAULT_IGNORABLE_RANGES):
+        return CATEGORY_INVISIBLE
+    if category == 'Cn':
+        return CATEGORY_UNASSIGNED
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _category_ranges():
+    """Return {category: [[start, end], ...]} over all codepoints (computed once)."""
+    ranges = collections.defaultdict(list)
+    # Letters, marks, symbols etc. are never reported; skip classify() for them
+    candidates = {'Cc', 'Cf', 'Co', 'Cn', 'Zs', 'Zl', 'Zp', 'Cs'}
+    special = {cp for start, end in DEFAULT_IGNORABLE_RANGES for cp in range(start, end + 1)}
+    special.add(0xFFFD)
+    category_of = unicodedata.category
+    for cp in range(config.UNICODE_MAX + 1):
+        unicode_category = category_of(chr(cp))
+        if unicode_category not in candidates and cp not in special:
+            continue
+        if unicode_category == 'Cn' and (cp & 0xFFFF) < 0xFFFE and not 0xFDD0 <= cp <= 0xFDEF:
+            # Fast path for the ~800K unassigned codepoints
+            category = CATEGORY_UNASSIGNED
+        else:
+            category = classify(cp)
+        if category is None or category == CATEGORY_INVALID_UTF8:
+            continue
+        category_ranges = ranges[category]
+        if category_ranges and category_ranges[-1][1] == cp - 1:
+            category_ranges[-1][1] = cp
+        else:
+            category_ranges.append([cp, cp])
+    return ranges
+
+
+def _char_class_item(start, end):
+    """Return a regex character class item for a codepoint range."""
+    if start == end:
+        return re.escape(chr(start))
+    return f"{re.escape(chr(start))}-{re.escape(chr(end))}"
+
+
+@functools.lru_cache(maxsize=None)
+def compile_patterns(categories=DEFAULT_CATEGORIES, ignored=DEFAULT_IGNORED):
+    """
+    Compile the regular expressions matching every codepoint to report.
+
+    A character class of BMP characters compiles to a constant-time lookup
+    table, while astral characters make re test every range in turn (about
+    6x slower on typical text). The search pattern therefore matches the
+    exact BMP codepoints plus any astral character, and astral candidates are
+    confirmed with the second pattern; they are rare in logs.
+
+    Args:
+        categories: Tuple of categories to report
+        ignored: Frozenset of codepoints never reported (e.g. tab, LF, CR)
+
+    Returns:
+        (search, astral) compiled patterns over str (surrogateescape-decoded
+        text); astral is None if no astral codepoint is reported
+    """
+    unknown = set(categories) - set(CATEGORIES)
+    if unknown:
+        raise ValueError(f"Unknown scanner categories: {', '.join(sorted(unknown))}")
+
+    all_ranges = _category_ranges()
+    ranges = []
+    for category in categories:
+        if category == CATEGORY_INVALID_UTF8:
+            ranges.append((ESCAPED_BYTE_START, ESCAPED_BYTE_END))
+            continue
+        for start, end in all_ranges.get(category, ()):
+            # Split ranges around ignored codepoints
+            for cp in sorted(cp for cp in ignored if start <= cp <= end):
+                if start < cp:
+                    ranges.append((start, cp - 1))
+                start = cp + 1
+            if start <= end:
+                ranges.append((start, end))
+
+    bmp = ''.join(_char_class_item(start, min(end, 0xFFFF)) for start, end in ranges if start <= 0xFFFF)
+    astral = ''.join(_char_class_item(max(start, 0x10000), end) for start, end in ranges if end > 0xFFFF)
+    if astral:
+        return re.compile(f"[{bmp}{_char_class_item(0x10000, config.UNICODE_MAX)}]"), re.compile(f"[{astral}]")
+    if bmp:
+        return re.compile(f"[{bmp}]"), None
+    # Matches nothing
+    return re.compile(r'(?!)'), None
+
+
+def _describe(codepoint, category):
+    """Return the Unicode name of a codepoint, or a description if it has none."""
+    if category == CATEGORY_INVALID_UTF8:
+        return f"invalid UTF-8 byte 0x{codepoint:02X}"
+    name = unicodedata.name(chr(codepoint), None)
+    if name:
+        return name
+    if category == CATEGORY_CONTROL:
+        return "<control>"
+    return f"<{category}>"
+
+
+# ============================================================================
+# Scanning
+# ============================================================================
+
+def scan_blocks(blocks, categories=DEFAULT_CATEGORIES, ignored=DEFAULT_IGNORED):
+    """
+    Scan a stream of UTF-8 byte blocks for reported codepoints.
+
+    Multi-byte sequences may be split across blocks; the incremental decoder
+    carries the partial sequence over.
+
+    Args:
+        blocks: Iterable of bytes-like blocks, in file order
+        categories: Tuple of categories to report
+        ignored: Frozenset of codepoints never reported
+
+    Yields:
+        Finding tuples, in file order
+    """
+    search, astral = compile_patterns(tuple(categories), frozenset(ignored))
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='surrogateescape')
+
+    fed = 0         # Bytes passed to the decoder so far
+    line = 1        # Line number at the start of the decoded text
+    block_start = 0  # Byte offset of the first character of the decoded text
+
+    def scan_text(text):
+        nonlocal line
+        position = 0
+        offset = block_start
+        for match in search.finditer(text):
+            index = match.start()
+            if text[index] > '\uffff' and not astral.match(text, index):
+                continue
+            # Advance byte offset and line count over the text since the last match
+            segment = text[position:index]
+            offset += len(segment.encode('utf-8', 'surrogateescape'))
+            line += segment.count('\n')
+            position = index
+
+            codepoint = ord(text[index])
+            if ESCAPED_BYTE_START <= codepoint <= ESCAPED_BYTE_END:
+                codepoint -= 0xDC00
+                category = CATEGORY_INVALID_UTF8
+                layout = glyphs.LAYOUT_REPLACEMENT
+            else:
+                category = classify(codepoint)
+                layout = glyphs.get_layout(codepoint)
+            yield Finding(offset, line, codepoint, category, layout, _describe(codepoint, category))
+        line += text.count('\n', position)
+
+    for block in blocks:
+        fed += len(block)
+        text = decoder.decode(block)
+        yield from scan_text(text)
+        block_start = fed - len(decoder.getstate()[0])
+
+    yield from scan_text(decoder.decode(b'', final=True))
+
+
+def iter_file_blocks(path, block_size=BLOCK_SIZE):
+    """
+    Yield the contents of a file as blocks of block_size bytes, memory-mapping it.
+
+    The blocks are views of the mapping, released when the next one is
+    requested: decode or copy each block before that.
+    """
+    with open(path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            return
+        with mapped:
+            view = memoryview(mapped)
+            try:
+                for start in range(0, len(view), block_size):
+                    block = view[start:start + block_size]
+                    try:
+                        yield block
+                    finally:
+                        block.release()
+            finally:
+                view.release()
+
+
+def iter_stream_blocks(stream, block_size=BLOCK_SIZE):
+    """Yield the contents of a binary stream (e.g. sys.stdin.buffer) as blocks."""
+    return iter(functools.partial(stream.read, block_size), b'')
+
+
+def scan_file(path, categories=DEFAULT_CATEGORIES, ignored=DEFAULT_IGNORED, block_size=BLOCK_SIZE):
+    """
+    Scan a file for reported codepoints, memory-mapping it.
+
+    Args:
+        path: Path of the file to scan
+        categories: Tuple of categories to report
+        ignored: Frozenset of codepoints never reported
+        block_size: Bytes decoded per step
+
+    Yields:
+        Finding tuples, in file order
+    """
+    yield from scan_blocks(iter_file_blocks(path, block_size), categories, ignored)
+
+
+def scan_stream(stream, categories=DEFAULT_CATEGORIES, ignored=DEFAULT_IGNORED, block_size=BLOCK_SIZE):
+    """
+    Scan a binary stream (e.g. sys.stdin.buffer) for reported codepoints.
+
+    Yields:
+        Finding tuples, in stream order
+    """
+    yield from scan_blocks(iter_stream_blocks(stream, block_size), categories, ignored)
+
+
+def format_finding(finding, source=None):
+    """Format a finding as a 'file:line (byte N): U+XXXX NAME [category] -> layout' line."""
+    if finding.category == CATEGORY_INVALID_UTF8:
+        code = f"0x{finding.codepoint:02X}"
+    else:
+        code = f"U+{finding.codepoint:04X}"
+    prefix = f"{source}:" if source else "line "
+    return (f"{prefix}{finding.line} (byte {finding.offset}): {code} {finding.name} "
+            f"[{finding.category}] -> {finding.layout}")
+
+
+# ============================================================================
+# Command Line
+# ============================================================================
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(
+        description="Report invisible, control, private-use, noncharacter and replacement "
+                    "codepoints in text files."
+    )
+    parser.add_argument("files", nargs='+', metavar="FILE", help="files to scan ('-' for stdin)")
+    parser.add_argument("--categories", default=','.join(DEFAULT_CATEGORIES),
+                        help=f"comma-separated categories to report (available: {', '.join(CATEGORIES)})")
+    parser.add_argument("--include-whitespace", action="store_true",
+                        help="also report tab, LF and CR")
+    parser.add_argument("--summary", action="store_true",
+                        help="print counts per codepoint instead of every finding")
+    parser.add_argument("--limit", type=int, default=0, metavar="N",
+                        help="stop each file after N findings, 0 for no limit (default: 0)")
+    args = parser.parse_args()
+    args.categories = tuple(c.strip() for c in args.categories.split(',') if c.strip())
+    unknown = set(args.categories) - set(CATEGORIES)
+    if unknown:
+        parser.error(f"unknown categories: {', '.join(sorted(unknown))}")
+    return args
+
+
+def main():
+    args = parse_args()
+    ignored = frozenset() if args.include_whitespace else DEFAULT_IGNORED
+    total = 0
+
+    for path in args.files:
+        if path == '-':
+            findings = scan_stream(sys.stdin.buffer, args.categories, ignored)
+            source = '<stdin>'
+        else:
+            findings = scan_file(path, args.categories, ignored)
+            source = path
+
+        counts = collections.Counter()
+        found = 0
+        for finding in findings:
+            found += 1
+            if args.summary:
+                counts[(finding.category, finding.codepoint, finding.name, finding.layout)] += 1
+            else:
+                print(format_finding(finding, source))
+            if found == args.limit:
+                break
+        total += found
+
+        if args.summary:
+            print(f"\n{source}: {sum(counts.values()):,} finding(s)")
+            for (category, codepoint, name, layout), count in counts.most_common():
+                code = f"0x{codepoint:02X}" if category == CATEGORY_INVALID_UTF8 else f"U+{codepoint:04X}"
+                print(f"  {count:>10,}  {code:<8} {name} [{category}] -> {layout}")
+
+    sys.exit(1 if total else 0)
+
+
+if __name__ == "__main__":
+    main()
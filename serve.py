@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Local on-demand subset font server for UnicodeHexMono.
+
+Instead of the 20 static WOFF2 files (several 600 KB chunks for a page with a
+few scattered exotic codepoints), pages load a font built for exactly the
+codepoints they need, usually a few hundred bytes:
+- Each request names codepoints or ranges; the server builds a WOFF2 with
+  exactly those glyphs through the fonttools backend (no FontForge)
+- Built files are kept in an in-memory LRU cache and in an on-disk cache,
+  both evicting the least recently used files beyond a size limit; disk
+  entries survive restarts
+- Cache keys hash the canonical codepoint ranges together with the build
+  cache fingerprint of the glyph pipeline (config values, drawing code,
+  tool versions), so changing the drawing code never serves stale glyphs
+- Responses carry a strong ETag (hash of the WOFF2 bytes) and answer
+  If-None-Match with 304, plus CORS headers for cross-origin pages
+
+Endpoints:
+    GET /font.woff2?range=41-5A,1F600    WOFF2 with exactly these codepoints
+    GET /font.woff2?text=%E2%82%AC       ... the characters of a string
+    GET /font.css?range=...              @font-face rule for the same codepoints,
+                                         pointing at /font.woff2 with its unicode-range
+
+range takes the --range syntax (hex codepoints and ranges, separated by
+commas); '+' is kept literal, so range=U+41-5A works as typed (U%2B is
+accepted too). Surrogates and noncharacters are dropped. Up to GLYPHS_PER_FILE codepoints per request.
+
+Usage:
+    python3 serve.py [--host 127.0.0.1] [--port 8765] [--cache-dir DIR]
+                     [--memory-cache MB] [--disk-cache MB] [--quiet]
+
+Then, in a page: <link rel="stylesheet" href="http://127.0.0.1:8765/font.css?range=1F600,E000-E00F">
+"""
+
+import argparse
+import collections
+import functools
+import hashlib
+import http.server
+import os
+import sys
+import threading
+import urllib.parse
+
+import build_cache
+import config
+from build_journal import atomic_output
+from codepoints import CodepointSet, parse_codepoint_ranges
+from css_generator import format_unicode_range
+
+try:
+    import fonttools_backend
+except ImportError:
+    fonttools_backend = None
+
+
+# Browsers revalidate with If-None-Match after this long
+CACHE_MAX_AGE = 24 * 60 * 60
+
+
+class RequestError(ValueError):
+    """A request the server cannot answer (HTTP 400)."""
+
+
+# ============================================================================
+# Requests
+# ============================================================================
+
+def parse_query(query):
+    """
+    Parse a URL query string into a dict (last value wins).
+
+    Unlike urllib.parse.parse_qs, '+' is kept as a literal plus, so that
+    range=U+41 works when typed into an address bar.
+    """
+    params = {}
+    for part in query.split('&'):
+        if part:
+            name, _, value = part.partition('=')
+            params[urllib.parse.unquote(name)] = urllib.parse.unquote(value)
+    return params
+
+
+def request_codepoints(params):
+    """
+    Return the codepoints a request asks for.
+
+    Args:
+        params: Query parameters from parse_query()
+
+    Returns:
+        CodepointSet of valid codepoints (surrogates and noncharacters dropped)
+
+    Raises:
+        RequestError: Without range/text, for unparsable ranges, when nothing
+                      valid is left, or beyond GLYPHS_PER_FILE codepoints
+    """
+    if 'range' not in params and 'text' not in params:
+        raise RequestError("expected a 'range' or 'text' query parameter")
+    ranges = []
+    if 'range' in params:
+        try:
+            ranges += parse_codepoint_ranges(params['range']).ranges
+        except ValueError as error:
+            raise RequestError(str(error))
+    if 'text' in params:
+        ranges += [(ord(char), ord(char)) for char in params['text']]
+
+    codepoints = CodepointSet(ranges).intersection(CodepointSet.valid_codepoints())
+    if not codepoints:
+        raise RequestError("no valid codepoints requested")
+    if len(codepoints) > config.GLYPHS_PER_FILE:
+        raise RequestError(f"{len(codepoints):,} codepoints requested, at most "
+                           f"{config.GLYPHS_PER_FILE:,} per font")
+    return codepoints
+
+
+def format_range_param(codepoints):
+    """Format codepoints as the canonical 'range' parameter, e.g. '41-5A,1F600'."""
+    return ','.join(f"{start:X}" if start == end else f"{start:X}-{end:X}"
+                    for start, end in codepoints.ranges)
+
+
+@functools.lru_cache(maxsize=None)
+def get_pipeline_fingerprint():
+    """Return the build cache key of the whole glyph pipeline (computed once)."""
+    chunk = {'codepoints': CodepointSet.valid_codepoints(), 'file_name': 'subset'}
+    return build_cache.chunk_cache_key(chunk, composite=False, backend='fonttools')
+
+
+def get_subset_key(codepoints):
+    """Return the cache key of the subset font of a codepoint set."""
+    data = f"{get_pipeline_fingerprint()}\n{format_range_param(codepoints)}"
+    return hashlib.sha256(data.encode('ascii')).hexdigest()
+
+
+def build_subset(codepoints):
+    """Build the WOFF2 bytes of a font with exactly these codepoints."""
+    font = fonttools_backend.build_font(codepoints, composite=False)
+    return fonttools_backend.compress_woff2(fonttools_backend.serialize_font(font))
+
+
+def build_css(codepoints):
+    """Return an @font-face rule that loads the subset of these codepoints."""
+    return (
+        "@font-face {\n"
+        f"  font-family: '{config.FONT_FAMILY}';\n"
+        f"  src: url('/font.woff2?range={format_range_param(codepoints)}') format('woff2');\n"
+        f"  unicode-range: {format_unicode_range(codepoints)};\n"
+        "  font-weight: normal;\n"
+        "  font-style: normal;\n"
+        "  font-display: swap;\n"
+        "}\n"
+    )
+
+
+def get_etag(data):
+    """Strong ETag of response bytes."""
+    return f'"{hashlib.sha256(data).hexdigest()[:32]}"'
+
+
+# ============================================================================
+# Caches
+# ============================================================================
+
+class SubsetCache:
+    """
+    Two-level LRU cache of built subset fonts: memory first, then disk.
+
+    Both levels are bounded by total bytes. Disk entries are files named by
+    key; their modification time records the last use (memory hits included),
+    so the least recently used files are removed first (also across restarts).
+    Counters in `stats` are updated under the lock; use count() from other
+    threads.
+    """
+
+    def __init__(self, cache_dir, memory_bytes, disk_bytes):
+        self.cache_dir = cache_dir
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._memory = collections.OrderedDict()  # key -> (bytes, etag)
+        self._memory_size = 0
+        self._lock = threading.Lock()
+        self.stats = collections.Counter()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._disk_size = sum(entry.stat().st_size for entry in os.scandir(cache_dir)
+                              if entry.name.endswith('.woff2'))
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.woff2")
+
+    def count(self, name):
+        """Increment a counter in stats (thread-safe)."""
+        with self._lock:
+            self.stats[name] += 1
+
+    def get(self, key):
+        """Return (bytes, etag) for a key, or None."""
+        path = self._path(key)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+        if entry is not None:
+            # The disk file's mtime is the eviction order: a subset served from
+            # memory is still recently used and must not be evicted from disk first
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+            return entry
+
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            self.count('misses')
+            return None
+        self.count('disk_hits')
+        entry = (data, get_etag(data))
+        self._remember(key, entry)
+        return entry
+
+    def put(self, key, data):
+        """Store built bytes under a key and return (bytes, etag)."""
+        entry = (data, get_etag(data))
+        self._remember(key, entry)
+
+        path = self._path(key)
+        with atomic_output(path) as tmp_path:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+        with self._lock:
+            self._disk_size += len(data)
+            if self._disk_size > self.disk_bytes:
+                self._evict_disk()
+        return entry
+
+    def _remember(self, key, entry):
+        with self._lock:
+            if key in self._memory or len(entry[0]) > self.memory_bytes:
+                return
+            self._memory[key] = entry
+            self._memory_size += len(entry[0])
+            while self._memory_size > self.memory_bytes:
+                _, (data, _) = self._memory.popitem(last=False)
+                self._memory_size -= len(data)
+
+    def _evict_disk(self):
+        """Remove least recently used files until the disk cache fits (lock held)."""
+        entries = sorted((entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                         for entry in os.scandir(self.cache_dir) if entry.name.endswith('.woff2'))
+        self._disk_size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self._disk_size <= self.disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._disk_size -= size
+            self.stats['evictions'] += 1
+
+
+class SubsetService:
+    """Builds and caches subset fonts; shared by all request handler threads."""
+
+    def __init__(self, cache):
+        self.cache = cache
+        # One build at a time: concurrent requests for the same subset wait for
+        # the first build instead of repeating it
+        self._build_lock = threading.Lock()
+
+    def get_font(self, codepoints):
+        """Return (WOFF2 bytes, etag) of the subset font of a codepoint set."""
+        key = get_subset_key(codepoints)
+        entry = self.cache.get(key)
+        if entry is not None:
+            return entry
+        with self._build_lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                self.cache.count('builds')
+                entry = self.cache.put(key, build_subset(codepoints))
+        return entry
+
+
+# ============================================================================
+# HTTP
+# ============================================================================
+
+class SubsetRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Serves /font.woff2 and /font.css (the service is server.service)."""
+
+    server_version = f"{config.FONT_NAME}Subset/{config.FONT_VERSION}"
+    quiet = False
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def _respond(self, send_body):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path not in ('/font.woff2', '/font.css'):
+            self._send_error(404, f"Unknown path {url.path}; use /font.woff2 or /font.css", send_body)
+            return
+        try:
+            codepoints = request_codepoints(parse_query(url.query))
+        except RequestError as error:
+            self._send_error(400, str(error), send_body)
+            return
+
+        if url.path == '/font.css':
+            data = build_css(codepoints).encode('utf-8')
+            etag = get_etag(data)
+            content_type = 'text/css; charset=utf-8'
+        else:
+            try:
+                data, etag = self.server.service.get_font(codepoints)
+            except Exception as error:
+                self.log_error("building %s failed: %r", format_range_param(codepoints), error)
+                self._send_error(500, "font build failed", send_body)
+                return
+            content_type = 'font/woff2'
+
+        if etag in {tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')}:
+            self.send_response(304)
+            self._send_cache_headers(etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self._send_cache_headers(etag)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(data)
+
+    def _send_cache_headers(self, etag):
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', f'public, max-age={CACHE_MAX_AGE}')
+        self.send_header('Access-Control-Allow-Origin', '*')
+
+    def _send_error(self, status, message, send_body):
+        body = f"{message}\n".encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def create_server(host, port, cache, quiet=False):
+    """Create a threading HTTP server for a cache (call serve_forever() on it)."""
+    handler = type('Handler', (SubsetRequestHandler,), {'quiet': quiet})
+    server = http.server.ThreadingHTTPServer((host, port), handler)
+    server.service = SubsetService(cache)
+    return server
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve UnicodeHexMono subset fonts built on demand.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=config.SUBSET_SERVER_PORT,
+                        help=f"port to listen on (default: {config.SUBSET_SERVER_PORT})")
+    parser.add_argument("--cache-dir", default=config.SUBSET_CACHE_DIR, metavar="DIR",
+                        help=f"on-disk cache of built fonts (default: {config.SUBSET_CACHE_DIR})")
+    parser.add_argument("--memory-cache", type=float, metavar="MB",
+                        default=config.SUBSET_MEMORY_CACHE_BYTES / 2 ** 20,
+                        help="in-memory cache size (default: %(default)g)")
+    parser.add_argument("--disk-cache", type=float, metavar="MB",
+                        default=config.SUBSET_DISK_CACHE_BYTES / 2 ** 20,
+                        help="on-disk cache size (default: %(default)g)")
+    parser.add_argument("--quiet", action="store_true", help="do not log requests")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if fonttools_backend is None:
+        print("ERROR: serve.py builds fonts with fontTools; install fonttools and brotli")
+        sys.exit(1)
+
+    cache = SubsetCache(args.cache_dir, int(args.memory_cache * 2 ** 20), int(args.disk_cache * 2 ** 20))
+    server = create_server(args.host, args.port, cache, quiet=args.quiet)
+    print(f"✓ Serving subset fonts on http://{args.host}:{args.port}/font.css?range=41-5A,1F600")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        stats = cache.stats
+        print(f"\n{stats['builds']} builds, {stats['memory_hits']} memory hits, "
+              f"{stats['disk_hits']} disk hits, {stats['evictions']} evictions")
+
+
+if __name__ == "__main__":
+    main()
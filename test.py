@@ -2,12 +2,14 @@
 """
 Quick test script to generate a comprehensive sample font for verifying hex digit rendering.
 This script tests all hex digits (0-9, A-F) in various combinations across BMP, supplementary planes, and Plane 16.
-"""
 
-import fontforge
+The sample is built through the regular generator path (generator.plan_selection
+and generator.build_chunk) into dist/UnicodeHexMono_TEST.otf/.woff2, which the
+Test Cases tab of index.html loads. For other subsets use main.py --range.
+"""
 
-import config
-import glyphs
+import generator
+from codepoints import CodepointSet
 
 # Test codepoints to systematically verify all hex digits (0-9, A-F) in different positions
 test_codepoints = [
@@ -95,49 +97,14 @@ test_codepoints = [
 ]
 
 print("Creating test font...")
-font = fontforge.font()
-font.fontname = "UnicodeHexMono_Test"
-font.familyname = "UnicodeHexMono Test"
-font.fullname = "UnicodeHexMono Test"
-font.encoding = "UnicodeFull"
-font.em = config.EM_SIZE
-font.ascent = config.ASCENT
-font.descent = config.DESCENT
-
-print(f"\nGenerating {len(test_codepoints)} test glyphs...")
-for cp in test_codepoints:
-    print(f"  Creating glyph U+{cp:05X}")
-    glyphs.create_glyph(font, cp)
-
-# Add .notdef
-print("\nCreating .notdef glyph...")
-glyphs.create_notdef_glyph(font)
-
-# Generate OTF
-output_path_otf = "dist/UnicodeHexMono_TEST.otf"
-print(f"\nGenerating {output_path_otf}...")
-font.generate(output_path_otf, flags=('opentype', 'omit-instructions', 'dummy-dsig'))
-print(f"✓ Generated: {output_path_otf}")
-
-# Generate WOFF2 using fonttools (FontForge's WOFF2 is broken)
-output_path_woff2 = "dist/UnicodeHexMono_TEST.woff2"
-print(f"\nGenerating {output_path_woff2}...")
-print("  Converting OTF to WOFF2 using fonttools...")
-try:
-    from fontTools.ttLib import TTFont
-    otf_font = TTFont(output_path_otf)
-    otf_font.flavor = 'woff2'
-    otf_font.save(output_path_woff2)
-    print(f"✓ Generated: {output_path_woff2}")
-except ImportError:
-    print("⚠ fonttools not installed - skipping WOFF2 generation")
-    print("  Install with: pip3 install --break-system-packages fonttools brotli")
+chunk, = generator.plan_selection(CodepointSet((cp, cp) for cp in test_codepoints), 'dist',
+                                  file_name='UnicodeHexMono_TEST')
+output_files = generator.build_chunk(chunk)
 
 print(f"\n✅ Test fonts generated successfully!")
-print(f"   Formats: OTF + WOFF2")
-print(f"\nTest codepoints included ({len(test_codepoints)} total):")
-for cp in test_codepoints:
+for path in output_files:
+    print(f"   {path}")
+print(f"\nTest codepoints included ({len(chunk['codepoints'])} total):")
+for cp in chunk['codepoints']:
     hex_str = f"{cp:06X}"
     print(f"  U+{hex_str}")
-
-font.close()
@@ -5,13 +5,39 @@ This module provides low-level drawing primitives for creating glyphs:
 - Codepoint validation (excluding surrogates and non-characters)
 - Rounded square path generation using Bézier curves
 - Thick line drawing for X symbols and dividers
-- Hex digit rendering using 3x5 pixel grid patterns
+- Hex digit rendering using 3x5 pixel grid patterns, merged into minimal outlines
 
 All drawing functions use FontForge's pen API to draw vector paths.
 """
 
+import functools
+
 import config
 
+
+# Define 3x5 grid patterns for each hex digit
+# Grid format: list of (col, row) tuples where col is 0-2 (left to right)
+# and row is 0-4 (bottom to top)
+DIGIT_PATTERNS = {
+    '0': [(0,0), (1,0), (2,0), (0,1), (2,1), (0,2), (2,2), (0,3), (2,3), (0,4), (1,4), (2,4)],
+    '1': [(1,0), (1,1), (1,2), (1,3), (1,4)],
+    '2': [(0,0), (1,0), (2,0), (0,1), (0,2), (1,2), (2,2), (2,3), (0,4), (1,4), (2,4)],
+    '3': [(0,0), (1,0), (2,0), (2,1), (0,2), (1,2), (2,2), (2,3), (0,4), (1,4), (2,4)],
+    '4': [(0,4), (0,3), (0,2), (1,2), (2,0), (2,1), (2,2), (2,3), (2,4)],
+    '5': [(0,0), (1,0), (2,0), (2,1), (0,2), (1,2), (2,2), (0,3), (0,4), (1,4), (2,4)],
+    '6': [(0,0), (1,0), (2,0), (0,1), (2,1), (0,2), (1,2), (2,2), (0,3), (0,4), (1,4), (2,4)],
+    '7': [(2,0), (2,1), (2,2), (2,3), (0,4), (1,4), (2,4)],
+    '8': [(0,0), (1,0), (2,0), (0,1), (2,1), (0,2), (1,2), (2,2), (0,3), (2,3), (0,4), (1,4), (2,4)],
+    '9': [(0,0), (1,0), (2,0), (2,1), (0,2), (1,2), (2,2), (0,3), (2,3), (0,4), (1,4), (2,4)],
+    'A': [(0,0), (2,0), (0,1), (2,1), (0,2), (1,2), (2,2), (0,3), (2,3), (0,4), (1,4), (2,4)],
+    'B': [(0,0), (1,0), (0,1), (2,1), (0,2), (1,2), (0,3), (2,3), (0,4), (1,4)],
+    'C': [(0,0), (1,0), (2,0), (0,1), (0,2), (0,3), (0,4), (1,4), (2,4)],
+    'D': [(0,0), (1,0), (0,1), (2,1), (0,2), (2,2), (0,3), (2,3), (0,4), (1,4)],
+    'E': [(0,0), (1,0), (2,0), (0,1), (0,2), (1,2), (2,2), (0,3), (0,4), (1,4), (2,4)],
+    'F': [(0,0), (0,1), (0,2), (1,2), (2,2), (0,3), (0,4), (1,4), (2,4)],
+}
+
+
 def is_valid_codepoint(cp):
     """Check if codepoint is valid and not in surrogate range."""
     if cp < config.UNICODE_MIN or cp > config.UNICODE_MAX:
@@ -124,10 +150,90 @@ def draw_thick_line(pen, x1, y1, x2, y2, width):
     pen.lineTo((x1 - offset_x, y1 - offset_y))
     pen.closePath()
 
+@functools.lru_cache(maxsize=None)
+def get_digit_outline(digit):
+    """
+    Return the merged outline of a hex digit's 3x5 cell pattern.
+    
+    Args:
+        digit: Hex digit character ('0'-'9', 'A'-'F')
+    
+    Returns:
+        Tuple of contours in grid units, each a tuple of (col, row) corner points.
+        Outer contours run counter-clockwise (like the individual cells did) and
+        holes run clockwise, so the filled area is exactly the union of the cells.
+        Example: '8' becomes 1 outer contour + 2 holes (12 points) instead of
+        13 touching rectangles (52 points).
+    
+    The union is traced once per digit: every cell side that does not touch
+    another lit cell becomes a directed edge with the lit cell on its left, the
+    edges are chained into closed loops and collinear points are dropped.
+    """
+    cells = set(DIGIT_PATTERNS.get(digit.upper(), []))
+    
+    # Boundary edges, oriented so the lit cell is on the left (counter-clockwise)
+    edges = {}
+    for col, row in cells:
+        if (col, row - 1) not in cells:
+            edges.setdefault((col, row), []).append((col + 1, row))
+        if (col + 1, row) not in cells:
+            edges.setdefault((col + 1, row), []).append((col + 1, row + 1))
+        if (col, row + 1) not in cells:
+            edges.setdefault((col + 1, row + 1), []).append((col, row + 1))
+        if (col - 1, row) not in cells:
+            edges.setdefault((col, row + 1), []).append((col, row))
+    
+    contours = []
+    while edges:
+        # Start each loop at its lowest, then leftmost, remaining point
+        start = min(edges, key=lambda point: (point[1], point[0]))
+        loop = [start]
+        previous = start
+        current = _take_edge(edges, start, None)
+        while current != start:
+            loop.append(current)
+            direction = (current[0] - previous[0], current[1] - previous[1])
+            previous = current
+            current = _take_edge(edges, current, direction)
+        
+        # Drop points in the middle of straight runs
+        corners = []
+        for i, point in enumerate(loop):
+            before = loop[i - 1]
+            after = loop[(i + 1) % len(loop)]
+            if (point[0] - before[0]) * (after[1] - point[1]) != (point[1] - before[1]) * (after[0] - point[0]):
+                corners.append(point)
+        contours.append(tuple(corners))
+    
+    return tuple(contours)
+
+
+def _take_edge(edges, point, direction):
+    """
+    Remove and return the end of the next boundary edge leaving point.
+    
+    Where two cells touch only at a corner, two edges leave the same point;
+    taking the left turn keeps those cells in separate, simple contours.
+    """
+    targets = edges[point]
+    if len(targets) > 1 and direction is not None:
+        # Left turn of (dx, dy) is (-dy, dx)
+        left = (point[0] - direction[1], point[1] + direction[0])
+        target = left if left in targets else targets[0]
+    else:
+        target = targets[0]
+    
+    targets.remove(target)
+    if not targets:
+        del edges[point]
+    return target
+
+
 def draw_hex_digit(pen, digit, x, y, size):
     """
     Draw a single hexadecimal digit (0-9, A-F) using a 3x5 pixel grid.
     Each digit is defined as a pattern of filled cells in a 3-column by 5-row grid.
+    The lit cells are drawn as their merged outline (see get_digit_outline).
     
     Args:
         pen: FontForge glyph pen
@@ -139,49 +245,14 @@ def draw_hex_digit(pen, digit, x, y, size):
     # Digit dimensions - width is 60% of height for 3:5 aspect ratio
     width = size * 0.6
     
-    # Define 3x5 grid patterns for each hex digit
-    # Grid format: list of (col, row) tuples where col is 0-2 (left to right)
-    # and row is 0-4 (bottom to top)
-    digit_patterns = {
-        '0': [(0,0), (1,0), (2,0), (0,1), (2,1), (0,2), (2,2), (0,3), (2,3), (0,4), (1,4), (2,4)],
-        '1': [(1,0), (1,1), (1,2), (1,3), (1,4)],
-        '2': [(0,0), (1,0), (2,0), (0,1), (0,2), (1,2), (2,2), (2,3), (0,4), (1,4), (2,4)],
-        '3': [(0,0), (1,0), (2,0), (2,1), (0,2), (1,2), (2,2), (2,3), (0,4), (1,4), (2,4)],
-        '4': [(0,4), (0,3), (0,2), (1,2), (2,0), (2,1), (2,2), (2,3), (2,4)],
-        '5': [(0,0), (1,0), (2,0), (2,1), (0,2), (1,2), (2,2), (0,3), (0,4), (1,4), (2,4)],
-        '6': [(0,0), (1,0), (2,0), (0,1), (2,1), (0,2), (1,2), (2,2), (0,3), (0,4), (1,4), (2,4)],
-        '7': [(2,0), (2,1), (2,2), (2,3), (0,4), (1,4), (2,4)],
-        '8': [(0,0), (1,0), (2,0), (0,1), (2,1), (0,2), (1,2), (2,2), (0,3), (2,3), (0,4), (1,4), (2,4)],
-        '9': [(0,0), (1,0), (2,0), (2,1), (0,2), (1,2), (2,2), (0,3), (2,3), (0,4), (1,4), (2,4)],
-        'A': [(0,0), (2,0), (0,1), (2,1), (0,2), (1,2), (2,2), (0,3), (2,3), (0,4), (1,4), (2,4)],
-        'B': [(0,0), (1,0), (0,1), (2,1), (0,2), (1,2), (0,3), (2,3), (0,4), (1,4)],
-        'C': [(0,0), (1,0), (2,0), (0,1), (0,2), (0,3), (0,4), (1,4), (2,4)],
-        'D': [(0,0), (1,0), (0,1), (2,1), (0,2), (2,2), (0,3), (2,3), (0,4), (1,4)],
-        'E': [(0,0), (1,0), (2,0), (0,1), (0,2), (1,2), (2,2), (0,3), (0,4), (1,4), (2,4)],
-        'F': [(0,0), (0,1), (0,2), (1,2), (2,2), (0,3), (0,4), (1,4), (2,4)],
-    }
-    
-    # Get the pattern for this digit
-    digit = digit.upper()
-    pattern = digit_patterns.get(digit, [])
-    
     # Calculate cell dimensions for solid appearance
     cell_height = size / 5  # 5 rows
     cell_width = width / 3  # 3 columns
     
-    # Helper to draw a filled rectangle
-    def draw_rect(x1, y1, x2, y2):
-        pen.moveTo((x1, y1))
-        pen.lineTo((x2, y1))
-        pen.lineTo((x2, y2))
-        pen.lineTo((x1, y2))
+    # Draw each merged contour, scaling grid corners to font units
+    for contour in get_digit_outline(digit):
+        col, row = contour[0]
+        pen.moveTo((x + col * cell_width, y + row * cell_height))
+        for col, row in contour[1:]:
+            pen.lineTo((x + col * cell_width, y + row * cell_height))
         pen.closePath()
-    
-    # Draw each cell in the pattern
-    for col, row in pattern:
-        # Calculate cell position
-        cell_x = x + col * cell_width
-        cell_y = y + row * cell_height
-        
-        # Draw the cell
-        draw_rect(cell_x, cell_y, cell_x + cell_width, cell_y + cell_height)
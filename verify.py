@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Post-build coverage verification for UnicodeHexMono.
+
+glyphs.validate_font_glyphs checks the FontForge glyphs before export; this
+script checks the files that ship. It reads the cmap of every font file in an
+output directory (in parallel worker processes) and reports:
+- Mapped codepoints that are not valid (surrogates, noncharacters)
+- Mapped codepoints outside the range in the file name
+- OTF/TTF and WOFF2 files of the same range that map different codepoints
+- Codepoints mapped by more than one font file (overlaps)
+- Expected codepoints that no file maps (gaps)
+- font.css rules whose unicode-range differs from the cmap of their files,
+  rules pointing to missing files and font files without a rule
+- manifest.json entries whose SHA-256, size or unicode-range do not match
+  their files, and font files the manifest does not list
+
+Only the raw cmap table is read: format 12 groups and format 4 segments are
+already ranges, so no per-codepoint dict is built and a full dist/ verifies in
+a few seconds. The exit status is 1 if any check fails, so the script can gate
+a release.
+
+Usage:
+    python3 verify.py [DIR] [--range RANGES | --codepoints FILE] [--jobs N] [--no-css]
+
+Examples:
+    python3 verify.py                               # dist/, all valid codepoints
+    python3 verify.py dist/web
+    python3 verify.py dist/selection --range U+1F600-1F64F
+"""
+
+import argparse
+import concurrent.futures
+import os
+import re
+import struct
+import sys
+import time
+
+from build_journal import is_partial_file
+from codepoints import CodepointSet, load_codepoints_file, parse_codepoint_ranges
+import config
+from css_generator import (format_unicode_range, hash_file, is_hashed_filename,
+                           load_manifest, parse_font_filename)
+
+
+# cmap subtables in order of preference, as (platformID, encodingID)
+CMAP_SUBTABLES = ((3, 10), (0, 6), (0, 4), (3, 1), (0, 3))
+
+# Codepoints listed per failed check before the rest is summarized
+MAX_LISTED_RANGES = 8
+
+
+# ============================================================================
+# Reading cmaps
+# ============================================================================
+
+def _format4_ranges(data, offset):
+    """Return the (start, end) ranges mapped by a cmap format 4 subtable."""
+    seg_count = struct.unpack_from('>H', data, offset + 6)[0] // 2
+    ends_at = offset + 14
+    starts_at = ends_at + 2 * seg_count + 2  # + reservedPad
+    deltas_at = starts_at + 2 * seg_count
+    range_offsets_at = deltas_at + 2 * seg_count
+
+    ends = struct.unpack_from(f'>{seg_count}H', data, ends_at)
+    starts = struct.unpack_from(f'>{seg_count}H', data, starts_at)
+    deltas = struct.unpack_from(f'>{seg_count}H', data, deltas_at)
+    range_offsets = struct.unpack_from(f'>{seg_count}H', data, range_offsets_at)
+
+    ranges = []
+    for i in range(seg_count):
+        start, end, delta = starts[i], ends[i], deltas[i]
+        if start > end:
+            continue
+        if range_offsets[i] == 0:
+            # glyph = (codepoint + delta) mod 65536; at most one codepoint hits .notdef
+            notdef = -delta & 0xFFFF
+            if start <= notdef <= end:
+                ranges += [(start, notdef - 1), (notdef + 1, end)]
+            else:
+                ranges.append((start, end))
+            continue
+        # idRangeOffset points into glyphIdArray, relative to its own position
+        glyph_ids_at = range_offsets_at + 2 * i + range_offsets[i]
+        glyph_ids = struct.unpack_from(f'>{end - start + 1}H', data, glyph_ids_at)
+        for codepoint, glyph_id in enumerate(glyph_ids, start):
+            if glyph_id and (glyph_id + delta) & 0xFFFF:
+                ranges.append((codepoint, codepoint))
+    return ranges
+
+
+def _format12_ranges(data, offset):
+    """Return the (start, end) ranges mapped by a cmap format 12 subtable."""
+    num_groups = struct.unpack_from('>I', data, offset + 12)[0]
+    groups = data[offset + 16:offset + 16 + 12 * num_groups]
+    return [(start, end) for start, end, _ in struct.iter_unpack('>III', groups)]
+
+
+def read_cmap_ranges(path):
+    """
+    Read the codepoints a font file maps in its cmap table.
+
+    Parses the best Unicode subtable (format 12 or 4) straight from the table
+    data; other subtable formats are decoded by fonttools.
+
+    Args:
+        path: Path to an .otf, .ttf or .woff2 file
+
+    Returns:
+        CodepointSet
+    """
+    from fontTools.ttLib import TTFont
+
+    # lazy=True reads the table directory only; WOFF2 files are decompressed,
+    # but cmap is not one of the transformed tables
+    font = TTFont(path, lazy=True)
+    try:
+        data = font.reader['cmap']
+
+        num_tables = struct.unpack_from('>H', data, 2)[0]
+        subtables = {}
+        for i in range(num_tables):
+            platform_id, encoding_id, offset = struct.unpack_from('>HHI', data, 4 + 8 * i)
+            subtables.setdefault((platform_id, encoding_id), offset)
+
+        for key in CMAP_SUBTABLES:
+            if key not in subtables:
+                continue
+            offset = subtables[key]
+            subtable_format = struct.unpack_from('>H', data, offset)[0]
+            if subtable_format == 12:
+                return CodepointSet(_format12_ranges(data, offset))
+            if subtable_format == 4:
+                return CodepointSet(_format4_ranges(data, offset))
+            break
+
+        return CodepointSet((cp, cp) for cp in font['cmap'].getBestCmap())
+    finally:
+        font.close()
+
+
+def _read_file(path):
+    """Worker: return (path, cmap ranges, error message) for one font file."""
+    try:
+        return path, read_cmap_ranges(path).ranges, None
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+
+def read_all_cmaps(paths, jobs=None):
+    """
+    Read the cmaps of many font files, one worker process per file at a time.
+
+    Args:
+        paths: Font file paths
+        jobs: Worker processes (None = one per CPU, 1 = in this process)
+
+    Returns:
+        Tuple (dict of path -> CodepointSet, dict of path -> error message)
+    """
+    if jobs == 1 or len(paths) <= 1:
+        results = [_read_file(path) for path in paths]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_read_file, paths))
+
+    cmaps = {}
+    errors = {}
+    for path, ranges, error in results:
+        if error:
+            errors[path] = error
+        else:
+            cmaps[path] = CodepointSet(ranges)
+    return cmaps, errors
+
+
+# ============================================================================
+# font.css
+# ============================================================================
+
+def parse_unicode_range(value):
+    """
+    Parse a CSS unicode-range value into a CodepointSet.
+
+    Accepts single codepoints (U+41), ranges (U+0-7F) and wildcards (U+4??).
+
+    Raises:
+        ValueError: For values that are not a unicode-range list
+    """
+    ranges = []
+    for part in value.split(','):
+        match = re.fullmatch(r'\s*U\+([0-9A-F?]{1,6})(?:-([0-9A-F]{1,6}))?\s*', part, re.IGNORECASE)
+        if not match:
+            raise ValueError(f"Invalid unicode-range: {part.strip()!r}")
+        first, last = match.groups()
+        if '?' in first:
+            ranges.append((int(first.replace('?', '0'), 16), int(first.replace('?', 'F'), 16)))
+        else:
+            ranges.append((int(first, 16), int(last or first, 16)))
+    return CodepointSet(ranges)
+
+
+def parse_css_rules(css_path):
+    """
+    Read the @font-face rules of a font.css file.
+
+    Returns:
+        List of (filenames, CodepointSet) tuples, one per rule; the
+        CodepointSet is None for rules without a unicode-range
+    """
+    with open(css_path, 'r', encoding='utf-8') as f:
+        css = re.sub(r'/\*.*?\*/', '', f.read(), flags=re.DOTALL)
+
+    rules = []
+    for body in re.findall(r'@font-face\s*\{([^}]*)\}', css):
+        filenames = [os.path.basename(url) for url in
+                     re.findall(r'url\(\s*[\'"]?([^\'")]+?)[\'"]?\s*\)', body)]
+        match = re.search(r'unicode-range\s*:\s*([^;]+)', body)
+        rules.append((filenames, parse_unicode_range(match.group(1)) if match else None))
+    return rules
+
+
+# ============================================================================
+# Checks
+# ============================================================================
+
+def describe(codepoints):
+    """Format a CodepointSet for a report line, listing its first ranges."""
+    listed = CodepointSet(codepoints.ranges[:MAX_LISTED_RANGES])
+    text = format_unicode_range(listed)
+    if len(codepoints.ranges) > MAX_LISTED_RANGES:
+        text += f", ... ({len(codepoints.ranges) - MAX_LISTED_RANGES} more ranges)"
+    return f"{len(codepoints):,} codepoint(s): {text}"
+
+
+def find_font_files(output_dir):
+    """
+    Find the font files of an output directory, grouped by filename range.
+
+    Returns:
+        Dict of (start_cp, end_cp) -> dict of format -> filename
+    """
+    font_files = {}
+    for filename in sorted(os.listdir(output_dir)):
+        if not filename.endswith(('.otf', '.ttf', '.woff2')) or is_partial_file(filename):
+            continue
+        parsed = parse_font_filename(filename)
+        if parsed:
+            start_cp, end_cp, _, _, file_format = parsed
+            formats = font_files.setdefault((start_cp, end_cp), {})
+            # Like css_generator: the plain name of the latest build wins over a
+            # hashed file left over from an earlier build
+            if file_format in formats and not is_hashed_filename(formats[file_format]):
+                print(f"  Skipping: {filename} (superseded by {formats[file_format]})")
+                continue
+            formats[file_format] = filename
+        else:
+            print(f"  Skipping: {filename} (not a UnicodeHexMono range file)")
+    return font_files
+
+
+def find_overlaps(cmaps):
+    """
+    Find codepoints mapped by more than one file.
+
+    Args:
+        cmaps: Dict of filename -> CodepointSet (one file per range)
+
+    Returns:
+        List of (filename, other filename, CodepointSet) tuples
+    """
+    # Sweep all ranges in start order, remembering the range reaching furthest
+    entries = sorted((start, end, name) for name, codepoints in cmaps.items()
+                     for start, end in codepoints.ranges)
+    overlaps = {}
+    reach_end, reach_name = -1, None
+    for start, end, name in entries:
+        if start <= reach_end:
+            key = (reach_name, name)
+            overlaps.setdefault(key, []).append((start, min(end, reach_end)))
+        if end > reach_end:
+            reach_end, reach_name = end, name
+    return [(first, second, CodepointSet(ranges)) for (first, second), ranges in overlaps.items()]
+
+
+def verify_output(output_dir='dist', expected=None, jobs=None, check_css=True):
+    """
+    Verify the font files (and font.css) of an output directory.
+
+    Args:
+        output_dir: Directory written by a build (dist, dist/web, ...)
+        expected: CodepointSet the files must cover together; None for every
+                  valid codepoint. Invalid codepoints in it are ignored.
+        jobs: Worker processes reading cmaps (None = one per CPU)
+        check_css: Also check font.css and manifest.json against the font files
+
+    Returns:
+        List of error messages (empty if the output is correct)
+    """
+    start_time = time.time()
+    valid = CodepointSet.valid_codepoints()
+    expected = valid if expected is None else expected.intersection(valid)
+    errors = []
+
+    def fail(message):
+        errors.append(message)
+        print(f"ERROR: {message}")
+
+    if not os.path.isdir(output_dir):
+        fail(f"{output_dir}/ does not exist")
+        return errors
+
+    print(f"Verifying {output_dir}/ ...")
+    font_files = find_font_files(output_dir)
+    if not font_files:
+        fail(f"No font files found in {output_dir}/")
+        return errors
+
+    paths = [os.path.join(output_dir, filename)
+             for formats in font_files.values() for filename in formats.values()]
+    cmaps, read_errors = read_all_cmaps(paths, jobs)
+    for path, error in sorted(read_errors.items()):
+        fail(f"{os.path.basename(path)}: cannot read cmap ({error})")
+    file_cmaps = {os.path.basename(path): codepoints for path, codepoints in cmaps.items()}
+    print(f"✓ Read {len(cmaps)} cmaps from {len(font_files)} ranges "
+          f"({sum(len(codepoints) for codepoints in cmaps.values()):,} mappings)")
+
+    # Per file: only valid codepoints, only inside the range in its name
+    # Per range: every format maps the same codepoints
+    range_cmaps = {}
+    for (start_cp, end_cp), formats in sorted(font_files.items()):
+        readable = [filename for filename in formats.values() if filename in file_cmaps]
+        for filename in readable:
+            codepoints = file_cmaps[filename]
+            invalid = codepoints.difference(valid)
+            if invalid:
+                fail(f"{filename}: maps invalid codepoints (surrogates/noncharacters), {describe(invalid)}")
+            outside = codepoints.difference(CodepointSet([(start_cp, end_cp)]))
+            if outside:
+                fail(f"{filename}: maps codepoints outside U+{start_cp:04X}-U+{end_cp:04X}, {describe(outside)}")
+
+        if not readable:
+            continue
+        reference = readable[0]
+        for filename in readable[1:]:
+            if file_cmaps[filename] != file_cmaps[reference]:
+                only_reference = file_cmaps[reference].difference(file_cmaps[filename])
+                only_other = file_cmaps[filename].difference(file_cmaps[reference])
+                if only_reference:
+                    fail(f"{filename}: lacks codepoints of {reference}, {describe(only_reference)}")
+                if only_other:
+                    fail(f"{filename}: maps codepoints {reference} lacks, {describe(only_other)}")
+        range_cmaps[reference] = file_cmaps[reference]
+
+    # Across files: no overlaps, no gaps
+    for first, second, codepoints in find_overlaps(range_cmaps):
+        fail(f"{first} and {second} both map {describe(codepoints)}")
+
+    covered = CodepointSet(r for codepoints in range_cmaps.values() for r in codepoints.ranges)
+    gaps = expected.difference(covered)
+    if gaps:
+        fail(f"No file maps {describe(gaps)}")
+    unexpected = covered.intersection(valid).difference(expected)
+    if unexpected:
+        fail(f"Files map codepoints outside the expected set, {describe(unexpected)}")
+    if not gaps and not unexpected:
+        print(f"✓ Files cover the {len(expected):,} expected codepoints exactly once")
+
+    if check_css:
+        errors += verify_css(output_dir, font_files, file_cmaps)
+        errors += verify_manifest(output_dir, font_files, file_cmaps)
+
+    elapsed = time.time() - start_time
+    if errors:
+        print(f"\n⚠ {len(errors)} problem(s) found in {output_dir}/ ({elapsed:.1f}s)")
+    else:
+        print(f"\n✓ {output_dir}/ verified ({elapsed:.1f}s)")
+    return errors
+
+
+def verify_css(output_dir, font_files, file_cmaps):
+    """
+    Check that font.css has one rule per range whose unicode-range equals the cmap.
+
+    Args:
+        output_dir: Directory of font.css and the font files
+        font_files: Result of find_font_files
+        file_cmaps: Dict of filename -> CodepointSet
+
+    Returns:
+        List of error messages
+    """
+    errors = []
+
+    def fail(message):
+        errors.append(message)
+        print(f"ERROR: {message}")
+
+    css_path = os.path.join(output_dir, 'font.css')
+    if not os.path.exists(css_path):
+        fail(f"{css_path} does not exist")
+        return errors
+    try:
+        rules = parse_css_rules(css_path)
+    except ValueError as e:
+        fail(f"{css_path}: {e}")
+        return errors
+
+    referenced = set()
+    for filenames, unicode_range in rules:
+        for filename in filenames:
+            referenced.add(filename)
+            if not os.path.exists(os.path.join(output_dir, filename)):
+                fail(f"font.css: {filename} does not exist")
+                continue
+            codepoints = file_cmaps.get(filename)
+            if codepoints is None:
+                continue  # Unreadable or not a range file, reported above
+            if unicode_range is None:
+                fail(f"font.css: rule for {filename} has no unicode-range")
+                continue
+            missing = codepoints.difference(unicode_range)
+            if missing:
+                fail(f"font.css: unicode-range of {filename} lacks {describe(missing)}")
+            extra = unicode_range.difference(codepoints)
+            if extra:
+                fail(f"font.css: unicode-range of {filename} claims unmapped {describe(extra)}")
+
+    unreferenced = sorted(filename for formats in font_files.values()
+                          for filename in formats.values() if filename not in referenced)
+    for filename in unreferenced:
+        fail(f"font.css: no @font-face rule for {filename}")
+
+    if not errors:
+        print(f"✓ font.css: {len(rules)} rules match the cmaps of their files")
+    return errors
+
+
+def verify_manifest(output_dir, font_files, file_cmaps):
+    """
+    Check that manifest.json lists every font file with its current hash and size.
+
+    Args:
+        output_dir: Directory of manifest.json and the font files
+        font_files: Result of find_font_files
+        file_cmaps: Dict of filename -> CodepointSet
+
+    Returns:
+        List of error messages
+    """
+    errors = []
+
+    def fail(message):
+        errors.append(message)
+        print(f"ERROR: {message}")
+
+    manifest_path = os.path.join(output_dir, config.MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        fail(f"{manifest_path} does not exist")
+        return errors
+    try:
+        manifest = load_manifest(manifest_path)
+        entries = [(font, entry) for font in manifest['fonts'] for entry in font['files'].values()]
+        listed = {entry['file'] for _, entry in entries}
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        fail(f"{manifest_path}: invalid manifest ({e})")
+        return errors
+
+    for font, entry in entries:
+        filename = entry['file']
+        path = os.path.join(output_dir, filename)
+        if not os.path.exists(path):
+            fail(f"{config.MANIFEST_FILE}: {filename} does not exist")
+            continue
+        digest, size = hash_file(path)
+        if size != entry.get('bytes'):
+            fail(f"{config.MANIFEST_FILE}: {filename} is {size:,} bytes, listed as {entry.get('bytes')}")
+        if digest.hex() != entry.get('sha256'):
+            fail(f"{config.MANIFEST_FILE}: SHA-256 of {filename} does not match")
+        codepoints = file_cmaps.get(filename)
+        if codepoints is not None and font.get('unicode_range') != format_unicode_range(codepoints):
+            fail(f"{config.MANIFEST_FILE}: unicode-range of {filename} differs from its cmap")
+
+    unlisted = sorted(filename for formats in font_files.values()
+                      for filename in formats.values() if filename not in listed)
+    for filename in unlisted:
+        fail(f"{config.MANIFEST_FILE}: {filename} is not listed")
+
+    if not errors:
+        print(f"✓ {config.MANIFEST_FILE}: {len(entries)} files match their hashes and cmaps")
+    return errors
+
+
+# ============================================================================
+# Command Line
+# ============================================================================
+
+def parse_range(value):
+    """Parse a '--range' value into a CodepointSet."""
+    try:
+        return parse_codepoint_ranges(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(
+        description="Verify that the font files of a build cover the valid codepoints "
+                    "exactly once and that font.css matches their cmaps."
+    )
+    parser.add_argument("output_dir", nargs='?', default='dist', metavar="DIR",
+                        help="build output directory (default: dist)")
+    parser.add_argument("--range", type=parse_range, action="append", dest="ranges", metavar="RANGES",
+                        help="expected codepoints, e.g. U+1F600-1F64F (repeatable; default: all valid)")
+    parser.add_argument("--codepoints", metavar="FILE",
+                        help="file of expected codepoints and ranges ('#' starts a comment)")
+    parser.add_argument("--jobs", type=int, default=None, metavar="N",
+                        help="worker processes reading cmaps (default: one per CPU)")
+    parser.add_argument("--no-css", action="store_true",
+                        help="do not check font.css and manifest.json")
+    args = parser.parse_args()
+
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    args.expected = None
+    if args.ranges or args.codepoints:
+        ranges = [r for selection in args.ranges or () for r in selection.ranges]
+        if args.codepoints:
+            try:
+                ranges += load_codepoints_file(args.codepoints).ranges
+            except (OSError, ValueError) as e:
+                parser.error(f"--codepoints: {e}")
+        args.expected = CodepointSet(ranges)
+    return args
+
+
+def main():
+    args = parse_args()
+    errors = verify_output(args.output_dir, args.expected, args.jobs, check_css=not args.no_css)
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()